@@ -0,0 +1,166 @@
+# ai/danger_map.py
+
+from collections import deque
+import heapq
+
+
+def ticks_per_step(speed):
+    """
+    Кількість кроків гри між рухами привида з даною швидкістю. Повторює логіку
+    move_counter у Ghost.update: лічильник накопичує speed і скидається в 0 після руху.
+    """
+    if speed <= 0:
+        return float('inf')
+    counter = 0
+    ticks = 0
+    while counter < 1:
+        counter += speed
+        ticks += 1
+    return ticks
+
+
+def ticks_to_first_step(ghost):
+    # Скільки кроків гри залишилось до наступного руху привида з урахуванням його лічильника
+    if ghost.speed <= 0:
+        return float('inf')
+    counter = ghost.move_counter
+    ticks = 0
+    while counter < 1:
+        counter += ghost.speed
+        ticks += 1
+    return ticks
+
+
+class DangerMap:
+    """
+    Карта небезпеки: для кожної клітинки - за скільки ходів до неї може дістатися найближчий привид.
+    Будується одним BFS з усіх привидів одночасно (multi-source), тому запит для клітинки - O(1)
+    і враховує стіни, на відміну від манхеттенської відстані.
+    weighted=False - відстань у клітинках; weighted=True - у кроках гри з урахуванням швидкості
+    та лічильника руху кожного привида.
+    max_value - далі цього значення карта не будується (клітинки за межею вважаються безпечними).
+    Значення зберігаються в буферах графа (graph.arrival) з міткою graph.next_stamp(), тож побудова
+    коштує лише стільки, скільки клітинок розкрито, а карта дійсна до побудови наступної на тому ж графі.
+    """
+
+    def __init__(self, graph, ghosts, weighted=False, max_value=None):
+        self.graph = graph
+        self.weighted = weighted
+        self.max_value = max_value if max_value is not None else float('inf')
+        # Кількість ходів до прибуття привида за id клітинки (дійсна лише з міткою stamp у seen)
+        self.arrival = graph.arrival
+        self.seen = graph.arrival_seen
+        self.stamp = graph.next_stamp()
+        if weighted:
+            self.build_weighted(ghosts)
+        else:
+            self.build_steps(ghosts)
+
+    def build_steps(self, ghosts):
+        arrival, seen, stamp = self.arrival, self.seen, self.stamp
+        adjacency = self.graph.adjacency
+        queue = deque()
+        for ghost in ghosts:
+            cell = self.graph.cell_id(ghost.position)
+            if cell is not None and seen[cell] != stamp:
+                seen[cell] = stamp
+                arrival[cell] = 0
+                queue.append(cell)
+        while queue:
+            current = queue.popleft()
+            next_value = arrival[current] + 1
+            if next_value > self.max_value:
+                continue
+            for neighbor in adjacency[current]:
+                if seen[neighbor] != stamp:
+                    seen[neighbor] = stamp
+                    arrival[neighbor] = next_value
+                    queue.append(neighbor)
+
+    def build_weighted(self, ghosts):
+        # Після першого руху кожен крок привида коштує ticks_per_step(speed), тому
+        # привиди з однаковою швидкістю обробляються одним пошуком Дейкстри
+        groups = {}
+        for ghost in ghosts:
+            groups.setdefault(ticks_per_step(ghost.speed), []).append(ghost)
+
+        graph = self.graph
+        arrival, seen, stamp = self.arrival, self.seen, self.stamp
+        merged = False  # Чи записано в arrival результат попередньої групи
+        for period, group in groups.items():
+            if period == float('inf'):
+                continue  # Нерухомі привиди небезпечні лише для власної клітинки
+            if not merged:
+                # Перша група (зазвичай єдина: швидкість привидів задається рівнем) пише прямо в arrival
+                self.search_group(group, period, arrival, seen, stamp)
+                merged = True
+                continue
+            # Групи з різним періодом не можна обрізати спільним масивом (повільний привид може
+            # дістатися клітинки раніше, а її сусідів - пізніше), тож мінімум береться після пошуку
+            times, times_seen = graph.group_arrival, graph.group_seen
+            for cell in self.search_group(group, period, times, times_seen, graph.next_stamp()):
+                if seen[cell] != stamp or times[cell] < arrival[cell]:
+                    seen[cell] = stamp
+                    arrival[cell] = times[cell]
+
+        for ghost in ghosts:
+            cell = graph.cell_id(ghost.position)
+            if cell is not None:
+                seen[cell] = stamp
+                arrival[cell] = 0
+
+    def search_group(self, group, period, times, seen, stamp):
+        """
+        Дейкстра від привидів групи з однаковим періодом руху. Результат - у times для клітинок
+        з seen == stamp; повертає список досягнутих клітинок.
+        """
+        adjacency = self.graph.adjacency
+        reached = []
+        queue = []
+        for ghost in group:
+            cell = self.graph.cell_id(ghost.position)
+            if cell is None:
+                continue
+            if seen[cell] != stamp:
+                reached.append(cell)
+            seen[cell] = stamp
+            times[cell] = 0
+            first_step = ticks_to_first_step(ghost)
+            if first_step > self.max_value:
+                continue
+            for neighbor in adjacency[cell]:
+                if seen[neighbor] != stamp:
+                    seen[neighbor] = stamp
+                    times[neighbor] = first_step
+                    reached.append(neighbor)
+                    heapq.heappush(queue, (first_step, neighbor))
+                elif first_step < times[neighbor]:
+                    times[neighbor] = first_step
+                    heapq.heappush(queue, (first_step, neighbor))
+        while queue:
+            value, current = heapq.heappop(queue)
+            if value > times[current]:
+                continue
+            next_value = value + period
+            if next_value > self.max_value:
+                continue
+            for neighbor in adjacency[current]:
+                if seen[neighbor] != stamp:
+                    seen[neighbor] = stamp
+                    times[neighbor] = next_value
+                    reached.append(neighbor)
+                    heapq.heappush(queue, (next_value, neighbor))
+                elif next_value < times[neighbor]:
+                    times[neighbor] = next_value
+                    heapq.heappush(queue, (next_value, neighbor))
+        return reached
+
+    def at(self, position):
+        """
+        Кількість ходів до прибуття найближчого привида в position (float('inf') - не досяжна
+        в межах max_value).
+        """
+        cell = self.graph.cell_id(position)
+        if cell is None or self.seen[cell] != self.stamp:
+            return float('inf')
+        return self.arrival[cell]
@@ -0,0 +1,182 @@
+# ai/ghost_controller.py
+
+from collections import deque
+import numpy as np
+
+from ai.heuristics import attack_offsets
+from pathfinding.distance_table import DIRECTIONS, UNREACHABLE
+
+
+class GhostController:
+    """
+    Пакетний ШІ привидів: за один прохід на крок обчислює, які привиди рухаються, їхні цілі
+    (ті самі правила, що й у GhostHeuristic, масивами NumPy для всіх привидів) та наступні кроки.
+    Замість окремого пошуку для кожного привида:
+    - з повною таблицею відстаней рівня наступні кроки всіх привидів - одна векторна вибірка з неї;
+    - інакше виконується один BFS на кожну різну ціль (їх не більше, ніж клітинок навколо Пакмена,
+      а до 5-го рівня ціль у всіх спільна), що зупиняється, щойно досягнуто всіх її привидів.
+    Наступний крок привида - сусідня клітинка з найменшою відстанню до його цілі.
+    Конфлікти зайнятості розв'язуються в тому ж проході за множиною зайнятих клітинок.
+    """
+
+    def __init__(self, maze, level_number):
+        """
+        maze: лабіринт рівня з побудованим графом (сітка має бути остаточною)
+        """
+        self.maze = maze
+        self.level_number = level_number
+        self.graph = maze.graph
+        table = maze.distance_table
+        self.table = table if table is not None and table.is_full else None
+        self.walls = np.asarray(maze.grid, dtype=bool)  # [y, x]: True - стіна
+        self.directions = np.array(DIRECTIONS, dtype=np.int64)
+        self.searches = 0  # Кількість BFS (для оцінки вартості ШІ привидів)
+
+    def targets(self, ghost_indices, num_ghosts, pacman):
+        """
+        Цілі (x, y) для привидів з індексами ghost_indices (масиви xs, ys).
+        """
+        px, py = pacman.position
+        count = len(ghost_indices)
+        if self.level_number >= 5:
+            # Оточення: зсуви навколо Пакмена, обчислені один раз для кожної кількості привидів
+            offsets = np.array(attack_offsets(num_ghosts), dtype=np.int64)[ghost_indices]
+            xs = px + offsets[:, 0]
+            ys = py + offsets[:, 1]
+            inside = (xs >= 0) & (xs < self.maze.width) & (ys >= 0) & (ys < self.maze.height)
+            valid = inside.copy()
+            valid[inside] = ~self.walls[ys[inside], xs[inside]]
+            xs[~valid] = px
+            ys[~valid] = py
+            return xs, ys
+        if self.level_number >= 3:
+            # Прогноз на два кроки вперед у напрямку руху Пакмена
+            dx, dy = pacman.direction
+            px = max(0, min(px + dx * 2, self.maze.width - 1))
+            py = max(0, min(py + dy * 2, self.maze.height - 1))
+        return np.full(count, px, dtype=np.int64), np.full(count, py, dtype=np.int64)
+
+    def next_positions(self, xs, ys, target_xs, target_ys):
+        """
+        Наступні клітинки для привидів у (xs, ys) до цілей (target_xs, target_ys):
+        список позицій (None - кроку немає: привид у цілі або ціль недосяжна).
+        """
+        if self.table is not None:
+            return self.next_positions_from_table(xs, ys, target_xs, target_ys)
+        return self.next_positions_from_graph(xs.tolist(), ys.tolist(), target_xs.tolist(), target_ys.tolist())
+
+    def next_positions_from_table(self, xs, ys, target_xs, target_ys):
+        table = self.table
+        cells = table.cell_ids[ys, xs]
+        targets = table.cell_ids[target_ys, target_xs]
+        valid = (cells >= 0) & (targets >= 0)
+        cells = np.where(valid, cells, 0)
+        targets = np.where(valid, targets, 0)
+        neighbors = table.neighbors[cells]
+        # Відстань до цілі з кожного сусіда; стіни та межі лабіринту - недосяжні
+        distances = np.where(neighbors >= 0, table.dist[targets[:, None], np.maximum(neighbors, 0)], UNREACHABLE)
+        best = distances.argmin(axis=1)
+        best_distance = distances[np.arange(len(cells)), best]
+        own_distance = table.dist[targets, cells]
+        # Крок є, якщо привид ще не в цілі, ціль досяжна і сусід ближчий до неї
+        moves = valid & (own_distance != UNREACHABLE) & (own_distance > 0) & (best_distance < own_distance)
+        steps = (np.stack([xs, ys], axis=1) + self.directions[best]).tolist()
+        return [tuple(step) if move else None for step, move in zip(steps, moves.tolist())]
+
+    def next_positions_from_graph(self, xs, ys, target_xs, target_ys):
+        graph = self.graph
+        height = graph.height
+        cells = graph.cells
+        # Привиди групуються за ціллю: один пошук на кожну різну ціль
+        groups = {}
+        for i, (x, y, tx, ty) in enumerate(zip(xs, ys, target_xs, target_ys)):
+            cell = graph.cell_id((x, y))
+            if cell is not None and not cells[cell] and not cells[tx * height + ty]:
+                groups.setdefault(tx * height + ty, []).append((i, cell))
+
+        result = [None] * len(xs)
+        adjacency = graph.adjacency
+        positions = graph.positions
+        for target, members in groups.items():
+            stamp = self.distances_to(target, [cell for _, cell in members])
+            seen, cost = graph.seen, graph.cost
+            for i, cell in members:
+                if seen[cell] != stamp or cost[cell] == 0:
+                    continue  # Ціль недосяжна або привид уже в ній
+                best = None
+                best_cost = cost[cell]
+                for neighbor in adjacency[cell]:
+                    if seen[neighbor] == stamp and cost[neighbor] < best_cost:
+                        best = neighbor
+                        best_cost = cost[neighbor]
+                if best is not None:
+                    result[i] = positions[best]
+        return result
+
+    def distances_to(self, target, cells):
+        """
+        BFS від цілі по графу рівня, що зупиняється, щойно досягнуто всі клітинки cells.
+        Сусід на найкоротшому шляху ближчий до цілі, ніж сама клітинка, тож він уже досягнутий.
+        Відстані - у graph.cost для клітинок з graph.seen == поверненій мітці.
+        """
+        graph = self.graph
+        adjacency = graph.adjacency
+        seen, cost = graph.seen, graph.cost
+        stamp = graph.next_stamp()
+        self.searches += 1
+
+        remaining = set(cells)
+        remaining.discard(target)
+        seen[target] = stamp
+        cost[target] = 0
+        queue = deque([target])
+        while queue and remaining:
+            current = queue.popleft()
+            next_cost = cost[current] + 1
+            for neighbor in adjacency[current]:
+                if seen[neighbor] != stamp:
+                    seen[neighbor] = stamp
+                    cost[neighbor] = next_cost
+                    queue.append(neighbor)
+                    remaining.discard(neighbor)
+        return stamp
+
+    def update(self, ghosts, pacman):
+        """
+        Один крок усіх привидів (замість Ghost.update для кожного).
+        Помилка пакетного планування не перехоплюється: до неї жоден привид ще не зрушив,
+        а помилка ходу окремого привида обробляється в resolve, як у Ghost.update.
+        """
+        movers = [ghost for ghost in ghosts if ghost.advance_counter()]
+        if not movers:
+            return
+
+        profiler = self.maze.profiler
+        with profiler.phase('ghosts.plan'):
+            # Позиції читаються прямо з масиву клітинок EntityStore
+            store = self.maze.entities
+            cells = store.cells
+            xs, ys = np.divmod(np.array([cells[ghost.slot] for ghost in movers], dtype=np.int64), store.height)
+            indices = np.array([ghost.index for ghost in movers], dtype=np.int64)
+            target_xs, target_ys = self.targets(indices, len(self.maze.ghosts), pacman)
+            steps = self.next_positions(xs, ys, target_xs, target_ys)
+
+        with profiler.phase('ghosts.resolve'):
+            self.resolve(movers, steps)
+
+    def resolve(self, movers, steps):
+        """
+        Рух привидів у порядку індексів з тими ж правилами, що й у Ghost.update: не повертатися
+        на дві останні позиції і не ставати на зайняту клітинку, інакше - випадковий крок.
+        Зайнятість - лічильники клітинок EntityStore, що оновлюються з кожним ходом.
+        """
+        for ghost, next_position in zip(movers, steps):
+            try:
+                if next_position is not None and not ghost.recently_visited(next_position, 2) \
+                        and not ghost.is_occupied(next_position):
+                    ghost.move_to(next_position)
+                else:
+                    ghost.random_move()
+            except Exception as e:
+                print(f"Помилка при оновленні привида: {e}")
+                ghost.random_move()
@@ -1,5 +1,28 @@
 # ai/heuristics.py
 
+import math
+from ai.danger_map import DangerMap
+
+_attack_offsets = {}  # Кількість привидів -> зсуви цілей навколо Пакмена
+
+
+def offset_from_angle(angle):
+    # Конвертуємо кут у зсув по x та y
+    radians = math.radians(angle)
+    return round(math.cos(radians)), round(math.sin(radians))
+
+
+def attack_offsets(num_ghosts):
+    """
+    Зсуви (dx, dy) цілей навколо Пакмена для кожного індексу привида при num_ghosts привидах.
+    Обчислюються один раз для кожної кількості привидів.
+    """
+    offsets = _attack_offsets.get(num_ghosts)
+    if offsets is None:
+        offsets = _attack_offsets[num_ghosts] = tuple(
+            offset_from_angle((360 / num_ghosts) * index) for index in range(num_ghosts))
+    return offsets
+
 
 class GhostHeuristic:
     def __init__(self, level_number):
@@ -28,10 +51,7 @@ class GhostHeuristic:
 
     def coordinate_attack(self, maze, ghost, pacman):
         # Привидіння розподіляються навколо Пакмена на основі свого індексу
-        index = maze.ghosts.index(ghost)
-        num_ghosts = len(maze.ghosts)
-        angle = (360 / num_ghosts) * index
-        dx, dy = self.get_offset_from_angle(angle)
+        dx, dy = attack_offsets(len(maze.ghosts))[ghost.index]
 
         # Ціль — позиція навколо Пакмена, зсунута на dx, dy
         target = (pacman.position[0] + dx, pacman.position[1] + dy)
@@ -43,37 +63,40 @@ class GhostHeuristic:
             return pacman.position
 
     def get_offset_from_angle(self, angle):
-        # Конвертуємо кут у зсув по x та y
-        import math
-        radians = math.radians(angle)
-        dx = round(math.cos(radians))
-        dy = round(math.sin(radians))
-        return dx, dy
+        return offset_from_angle(angle)
 
 
 class PacManHeuristic:
-    def __init__(self, level_number):
+    def __init__(self, level_number, weighted_danger=False):
         self.level_number = level_number
+        self.weighted_danger = weighted_danger  # Небезпека в кроках гри з урахуванням швидкості привидів
+        self.danger_map = None  # Карта небезпеки останнього кроку
         # self.algorithm = algorithm  # Функція алгоритму пошуку шляху
 
     def get_target(self, maze, pacman):
         # Визначити цільову позицію для Пакмена
         if not maze.dots:
             return pacman.position  # Немає їжі, залишаємося на місці
-        closest_safe_food = None
-        min_distance = float('inf')
-        for dot in maze.dots:
-            distance_to_pacman = self.manhattan_distance(pacman.position, dot)
-            distance_to_ghost = pacman.distance_to_ghosts(dot)
-            if distance_to_ghost >= pacman.safe_distance:
-                if distance_to_pacman < min_distance:
-                    min_distance = distance_to_pacman
-                    closest_safe_food = dot
-        if closest_safe_food:
-            return closest_safe_food
+
+        if maze.graph is not None:
+            # Один multi-source BFS від усіх привидів замість відстані до кожного привида для кожної точки;
+            # клітинки, до яких привиди не дістануться швидше за safe_distance, далі не розглядаються
+            self.danger_map = DangerMap(maze.graph, pacman.ghosts, self.weighted_danger,
+                                        max_value=pacman.safe_distance - 1)
+
+            def is_safe(dot):
+                return self.danger_map.at(dot) >= pacman.safe_distance
         else:
-            # Якщо немає безпечних точок, вибрати найближчу точку
-            return min(maze.dots, key=lambda pos: self.manhattan_distance(pacman.position, pos))
+            def is_safe(dot):
+                return pacman.distance_to_ghosts(dot) >= pacman.safe_distance
 
-    def manhattan_distance(self, pos1, pos2):
-        return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
+        # Найближча безпечна точка за відстанню в лабіринті (BFS з раннім виходом по графу рівня)
+        closest_safe_food = maze.dots.nearest(pacman.position, maze.graph, is_safe)
+        if closest_safe_food:
+            return closest_safe_food
+        # Якщо немає безпечних точок, вибрати найближчу точку
+        closest_food = maze.dots.nearest(pacman.position, maze.graph)
+        if closest_food:
+            return closest_food
+        # Досяжних точок немає (або граф не побудовано) - найближча за манхеттенською відстанню
+        return maze.dots.nearest(pacman.position)
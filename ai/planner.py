@@ -0,0 +1,231 @@
+# ai/planner.py
+
+from collections import deque
+import time
+
+from src.snapshot import GameSnapshot, SearchTimeout, SnapshotContext, unpack_ghosts
+
+WIN_SCORE = 1e6  # Оцінка виграшу (мінус глибина, на якій його досягнуто)
+LOSS_SCORE = -1e6  # Оцінка програшу (плюс глибина: пізніша смерть краща)
+DOT_WEIGHT = 100  # Вартість однієї нез'їденої точки в оцінці позиції
+DANGER_PENALTY = 500  # Штраф за привида в сусідній клітинці (зіткнення за межами глибини пошуку)
+DOT_SEARCH_LIMIT = 256  # Скільки клітинок максимум розкриває пошук найближчої точки в оцінці
+
+
+class PacManPlanner:
+    """
+    Планувальник ходів Пакмена з обмеженням часу на крок (anytime):
+    пошук наперед по GameSnapshot з ітеративним поглибленням і таблицею транспозицій.
+    Привиди в знімках ходять детерміновано за правилами GhostHeuristic, тож вузли випадку
+    expectimax мають один результат, і пошук зводиться до максимізації за ходами Пакмена.
+    Кожна ітерація поглиблення починається з найкращого ходу попередньої; коли настає
+    дедлайн, пошук переривається і повертається хід останньої завершеної ітерації.
+    Таблиця транспозицій зберігається між кроками рівня (стан знімка не залежить від номера кроку),
+    тож оцінки виграшу й програшу в ній записані відносно вузла, а не кореня пошуку.
+    Якщо не завершено жодної ітерації, хід обирається за сталий час: попередній хід, якщо
+    він досі можливий, інакше перший можливий.
+    """
+
+    def __init__(self, budget_ms=5.0, max_depth=64, table_size=200000):
+        """
+        budget_ms: час на вибір ходу за один крок гри (мілісекунди)
+        max_depth: максимальна глибина поглиблення
+        table_size: максимальна кількість записів у таблиці транспозицій (далі вона очищається)
+        """
+        self.budget = budget_ms / 1000
+        self.max_depth = max_depth
+        self.table_size = table_size
+        self.context = None
+        # GameSnapshot.key -> (глибина, оцінка, найкращий хід). Ключі й значення - кортежі чисел,
+        # які збирач сміття не відстежує, тож велика таблиця не додає пауз GC посеред кроку
+        self.table = {}
+        self.deadline = 0.0
+        self.nodes = 0
+        # Статистика останнього кроку
+        self.last_depth = 0
+        self.last_nodes = 0
+        self.last_elapsed = 0.0
+        # Сумарна статистика рівня (див. summary)
+        self.ticks = 0
+        self.total_depth = 0
+        self.total_nodes = 0
+        self.max_depth_reached = 0
+        self.max_elapsed = 0.0
+        self.timeouts = 0
+        self.fallbacks = 0  # Кроків, на яких не завершилася жодна ітерація
+        self.last_move = None  # Останній обраний хід (для ходу без завершеної ітерації)
+
+    def next_move(self, pacman):
+        """
+        Хід (dx, dy) для Пакмена. Якщо за відведений час не завершено жодної ітерації -
+        попередній хід, коли він досі можливий, інакше перший можливий хід знімка.
+        """
+        started = time.perf_counter()
+        maze = pacman.maze
+        if self.context is None or self.context.graph is not maze.graph:
+            # Новий рівень: контекст знімків і таблиця транспозицій створюються заново
+            ghost_speed = pacman.ghosts[0].speed if pacman.ghosts else 0
+            self.context = SnapshotContext(maze.graph, pacman.level_number, ghost_speed, len(pacman.ghosts))
+            self.table = {}
+            self.last_move = None
+        snapshot = GameSnapshot.from_pacman(self.context, pacman)
+        move = self.plan(snapshot, started)
+        if move is None:
+            # Повторний пошук вийшов би за ліміт часу, тож хід обирається за сталий час
+            self.fallbacks += 1
+            moves = snapshot.legal_moves()
+            move = self.last_move if self.last_move in moves else moves[0]
+        self.last_move = move
+        maze.profiler.log(f"Планувальник: глибина {self.last_depth}, вузлів {self.last_nodes}, "
+                          f"{self.last_elapsed * 1000:.2f} мс")
+        return move
+
+    def plan(self, snapshot, started=None):
+        """
+        Ітеративне поглиблення до дедлайну. Повертає найкращий хід останньої завершеної ітерації.
+        started: момент початку кроку (time.perf_counter), від якого відлічується ліміт часу
+        """
+        if started is None:
+            started = time.perf_counter()
+        self.deadline = started + self.budget
+        self.nodes = 0
+        if len(self.table) > self.table_size:
+            self.table = {}
+
+        context = snapshot.context
+        context.deadline = self.deadline
+        best_move = None
+        depth_reached = 0
+        try:
+            for depth in range(1, self.max_depth + 1):
+                value, move = self.search_root(snapshot, depth, best_move)
+                best_move = move
+                depth_reached = depth
+                if value >= WIN_SCORE - self.max_depth or value <= LOSS_SCORE + self.max_depth:
+                    break  # Результат гри в межах глибини вже відомий
+        except SearchTimeout:
+            self.timeouts += 1
+        finally:
+            context.deadline = None
+
+        elapsed = time.perf_counter() - started
+        self.last_depth = depth_reached
+        self.last_nodes = self.nodes
+        self.last_elapsed = elapsed
+        self.ticks += 1
+        self.total_depth += depth_reached
+        self.total_nodes += self.nodes
+        self.max_depth_reached = max(self.max_depth_reached, depth_reached)
+        self.max_elapsed = max(self.max_elapsed, elapsed)
+        return best_move
+
+    def search_root(self, snapshot, depth, first_move):
+        best_value = float('-inf')
+        best_move = None
+        for move in self.ordered_moves(snapshot, first_move):
+            value = self.search(snapshot.apply(move), depth - 1, 1)
+            if value > best_value:
+                best_value = value
+                best_move = move
+        return best_value, best_move
+
+    def search(self, node, depth, ply):
+        self.nodes += 1
+        if time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+        if node.result is not None or depth == 0:
+            return self.evaluate(node, ply)
+
+        key = node.key
+        entry = self.table.get(key)
+        if entry is not None and entry[0] >= depth:
+            return self.value_from_table(entry[1], ply)
+        best_value = float('-inf')
+        best_move = None
+        for move in self.ordered_moves(node, entry[2] if entry is not None else None):
+            value = self.search(node.apply(move), depth - 1, ply + 1)
+            if value > best_value:
+                best_value = value
+                best_move = move
+        self.table[key] = (depth, self.value_to_table(best_value, ply), best_move)
+        return best_value
+
+    def value_to_table(self, value, ply):
+        # Оцінки виграшу/програшу відлічуються від кореня пошуку, а в таблиці - від самого вузла,
+        # бо той самий стан трапляється на іншій глибині та на наступних кроках гри
+        if value >= WIN_SCORE - self.max_depth:
+            return value + ply
+        if value <= LOSS_SCORE + self.max_depth:
+            return value - ply
+        return value
+
+    def value_from_table(self, value, ply):
+        if value >= WIN_SCORE - self.max_depth:
+            return value - ply
+        if value <= LOSS_SCORE + self.max_depth:
+            return value + ply
+        return value
+
+    @staticmethod
+    def ordered_moves(node, first_move):
+        # Найкращий хід з попередньої ітерації (або таблиці транспозицій) розглядається першим
+        moves = node.legal_moves()
+        if first_move is not None and first_move in moves:
+            moves.remove(first_move)
+            moves.insert(0, first_move)
+        return moves
+
+    def evaluate(self, node, ply):
+        """
+        Оцінка позиції: виграш/програш, кількість нез'їдених точок, відстань до найближчої точки
+        та штраф за привида поруч.
+        """
+        if node.result == 'won':
+            return WIN_SCORE - ply
+        if node.result == 'lost':
+            return LOSS_SCORE + ply
+        score = -DOT_WEIGHT * node.dots_left - self.nearest_dot_distance(node)
+        if node.num_ghosts:
+            neighbors = node.context.graph.adjacency[node.pacman]
+            for cell in unpack_ghosts(node.ghosts, node.num_ghosts, node.context.ghost_bits):
+                if cell in neighbors:
+                    score -= DANGER_PENALTY
+        return score
+
+    @staticmethod
+    def nearest_dot_distance(node):
+        """
+        Відстань у лабіринті до найближчої точки (BFS з обмеженням DOT_SEARCH_LIMIT клітинок).
+        """
+        dots = node.dots
+        if not dots:
+            return 0
+        adjacency = node.context.graph.adjacency
+        start = node.pacman
+        distances = {start: 0}
+        queue = deque([start])
+        while queue and len(distances) <= DOT_SEARCH_LIMIT:
+            current = queue.popleft()
+            if dots >> current & 1:
+                return distances[current]
+            next_cost = distances[current] + 1
+            for neighbor in adjacency[current]:
+                if neighbor not in distances:
+                    distances[neighbor] = next_cost
+                    queue.append(neighbor)
+        return DOT_SEARCH_LIMIT
+
+    def summary(self):
+        """
+        Статистика планувальника за рівень: глибина та кількість вузлів на крок, найдовший крок.
+        """
+        ticks = self.ticks or 1
+        return {
+            'ticks': self.ticks,
+            'mean_depth': self.total_depth / ticks,
+            'max_depth': self.max_depth_reached,
+            'mean_nodes': self.total_nodes / ticks,
+            'max_elapsed_ms': self.max_elapsed * 1000,
+            'timeouts': self.timeouts,
+            'fallbacks': self.fallbacks,
+        }
@@ -0,0 +1,62 @@
+# benchmarks/bench_maze_generation.py
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+from src.maze import Maze
+
+
+def time_generator(size, wall_density, generator, seed, repeats):
+    """
+    Найкращий час генерації лабіринту size x size за repeats повторів (секунди).
+    """
+    best = float('inf')
+    for repeat in range(repeats):
+        started = time.perf_counter()
+        if generator == 'vectorized':
+            maze = Maze(size, size, wall_density)
+            maze.generate_maze_vectorized(np.random.default_rng(seed + repeat))
+        else:
+            maze = Maze(size, size, wall_density, random.Random(seed + repeat))
+            maze.generate_maze()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Порівняння генераторів лабіринту")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[51, 101, 201, 501, 1001, 2001])
+    parser.add_argument('--wall-density', type=float, default=0.3)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-backtracker-size', type=int, default=501,
+                        help="Більші лабіринти рекурсивним backtracker-ом не генеруються (надто довго)")
+    parser.add_argument('--output', default=None, help="Файл для результатів у форматі JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'розмір':>7} {'backtracker, с':>15} {'vectorized, с':>14} {'прискорення':>12}")
+    for size in args.sizes:
+        backtracker = None
+        if size <= args.max_backtracker_size:
+            backtracker = time_generator(size, args.wall_density, 'backtracker', args.seed, args.repeats)
+        vectorized = time_generator(size, args.wall_density, 'vectorized', args.seed, args.repeats)
+        speedup = backtracker / vectorized if backtracker is not None else None
+        results.append({'size': size, 'backtracker': backtracker, 'vectorized': vectorized, 'speedup': speedup})
+        print(f"{size:>7} {backtracker if backtracker is not None else float('nan'):>15.4f} "
+              f"{vectorized:>14.4f} {speedup if speedup is not None else float('nan'):>12.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'wall_density': args.wall_density, 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
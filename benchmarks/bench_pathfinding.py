@@ -0,0 +1,249 @@
+# benchmarks/bench_pathfinding.py
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pathfinding.a_star import a_star_search
+from pathfinding.bfs import bfs_search
+from pathfinding.bidirectional_bfs import bidirectional_bfs_search
+from pathfinding.dfs import dfs_search
+from pathfinding.jps import jps_search
+from pathfinding.maze_graph import MazeGraph
+from pathfinding.stats import SearchStats
+from src.maze import Maze
+
+# Назва -> (функція пошуку, чи гарантує найкоротший шлях)
+SEARCHES = {
+    'bfs': (bfs_search, True),
+    'dfs': (dfs_search, False),
+    'a_star': (a_star_search, True),
+    'bidirectional_bfs': (bidirectional_bfs_search, True),
+    'jps': (jps_search, True),
+}
+
+BACKENDS = ('grid', 'graph')
+
+
+def make_maze(size, wall_density, seed):
+    maze = Maze(size, size, wall_density, random.Random(seed))
+    maze.generate_maze()
+    return maze
+
+
+def make_queries(maze, count, seed):
+    """
+    Фіксований набір пар (старт, ціль) серед прохідних клітинок лабіринту.
+    """
+    rng = random.Random(seed)
+    cells = [(x, y) for y in range(maze.height) for x in range(maze.width) if maze.grid[y][x] == 0]
+    return [(rng.choice(cells), rng.choice(cells)) for _ in range(count)]
+
+
+def is_valid_path(grid, path, start, goal):
+    if path[0] != start or path[-1] != goal:
+        return False
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        if abs(x1 - x2) + abs(y1 - y2) != 1 or grid[y2][x2] != 0:
+            return False
+    return True
+
+
+def check_paths(name, search, grid, queries, reference, optimal):
+    """
+    Перевірка результатів пошуку: шлях коректний, а для оптимальних алгоритмів - такої ж довжини, як у BFS.
+    Повертає кількість розбіжностей.
+    """
+    plain_grid = reference_grid(grid)
+    mismatches = 0
+    for (start, goal), expected in zip(queries, reference):
+        path = search(grid, start, goal)
+        if path is None or expected is None:
+            mismatches += (path is None) != (expected is None)
+        elif not is_valid_path(plain_grid, path, start, goal):
+            mismatches += 1
+        elif optimal and len(path) != len(expected):
+            mismatches += 1
+    if mismatches:
+        print(f"  {name}: {mismatches} розбіжностей з bfs_search")
+    return mismatches
+
+
+def reference_grid(grid):
+    # Для MazeGraph перевіряємо шлях по вихідній сітці, відновленій з cells
+    if isinstance(grid, MazeGraph):
+        return [[grid.cells[x * grid.height + y] for x in range(grid.width)] for y in range(grid.height)]
+    return grid
+
+
+def measure(search, grid, queries, repeats):
+    """
+    Час кожного запиту (найкращий з repeats прогонів) і статистика пошуків.
+    """
+    latencies = [float('inf')] * len(queries)
+    for _ in range(repeats):
+        for i, (start, goal) in enumerate(queries):
+            started = time.perf_counter()
+            search(grid, start, goal)
+            latencies[i] = min(latencies[i], time.perf_counter() - started)
+
+    expanded = 0
+    peak_frontier = 0
+    for start, goal in queries:
+        stats = SearchStats()
+        search(grid, start, goal, stats)
+        expanded += stats.nodes_expanded
+        peak_frontier = max(peak_frontier, stats.peak_frontier)
+    return latencies, expanded / len(queries), peak_frontier
+
+
+def measure_memory(search, grid, queries):
+    """
+    Пікове виділення пам'яті (байти) за один запит. Вимірюється окремим прогоном,
+    бо tracemalloc суттєво сповільнює пошук.
+    """
+    peak = 0
+    tracemalloc.start()
+    try:
+        for start, goal in queries:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            search(grid, start, goal)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+def run_case(size, wall_density, args):
+    maze = make_maze(size, wall_density, args.seed)
+    queries = make_queries(maze, args.queries, args.seed + 1)
+    graph = MazeGraph(maze.grid)
+    reference = [bfs_search(graph, start, goal) for start, goal in queries]
+
+    results = []
+    for backend in args.backends:
+        grid = graph if backend == 'graph' else maze.grid
+        for name in args.algorithms:
+            search, optimal = SEARCHES[name]
+            mismatches = check_paths(name, search, grid, queries, reference, optimal)
+            latencies, mean_expanded, peak_frontier = measure(search, grid, queries, args.repeats)
+            memory = measure_memory(search, grid, queries) if args.memory else None
+            total = sum(latencies)
+            latencies.sort()
+            results.append({
+                'size': size,
+                'wall_density': wall_density,
+                'backend': backend,
+                'algorithm': name,
+                'queries': len(queries),
+                'searches_per_second': len(queries) / total if total else None,
+                'mean_ms': total / len(queries) * 1000,
+                'p50_ms': percentile(latencies, 0.5) * 1000,
+                'p95_ms': percentile(latencies, 0.95) * 1000,
+                'p99_ms': percentile(latencies, 0.99) * 1000,
+                'max_ms': latencies[-1] * 1000,
+                'peak_memory_kb': memory / 1024 if memory is not None else None,
+                'mean_nodes_expanded': mean_expanded,
+                'peak_frontier': peak_frontier,
+                'mismatches': mismatches,
+            })
+    return results
+
+
+def result_key(row):
+    return (row['size'], row['wall_density'], row['backend'], row['algorithm'])
+
+
+def compare_with_baseline(results, baseline_path, threshold):
+    """
+    Порівняння з попереднім прогоном: регресія - середній час запиту зріс більше ніж на threshold (частка).
+    Повертає список описів регресій.
+    """
+    try:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = {result_key(row): row for row in json.load(f)['results']}
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Не вдалося прочитати базовий прогін {baseline_path}: {e}")
+        return []
+
+    regressions = []
+    print(f"\nПорівняння з {baseline_path} (поріг {threshold:.0%}):")
+    for row in results:
+        old = baseline.get(result_key(row))
+        if old is None or not old.get('mean_ms'):
+            continue
+        change = row['mean_ms'] / old['mean_ms'] - 1
+        marker = ''
+        if change > threshold:
+            marker = '  <- регресія'
+            regressions.append(f"{row['algorithm']}/{row['backend']} {row['size']}x{row['size']} "
+                               f"щільність {row['wall_density']}: {change:+.1%}")
+        print(f"{row['algorithm']:>17} {row['backend']:>6} {row['size']:>5} {row['wall_density']:>5} "
+              f"{old['mean_ms']:>9.3f} -> {row['mean_ms']:>9.3f} мс ({change:+.1%}){marker}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк алгоритмів пошуку шляху")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[15, 31, 61, 121, 251, 501])
+    parser.add_argument('--wall-densities', type=float, nargs='+', default=[0.1, 0.3, 0.6])
+    parser.add_argument('--algorithms', nargs='+', choices=list(SEARCHES), default=list(SEARCHES))
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS),
+                        help="grid - пошук по 2D списку, graph - по MazeGraph")
+    parser.add_argument('--queries', type=int, default=50, help="Кількість пар (старт, ціль) на лабіринт")
+    parser.add_argument('--repeats', type=int, default=3, help="Для кожного запиту береться найкращий час")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help="Не вимірювати пам'ять через tracemalloc")
+    parser.add_argument('--output', default=None, help="Файл для результатів у форматі JSON")
+    parser.add_argument('--baseline', default=None, help="JSON попереднього прогону для порівняння")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="Допустиме сповільнення відносно базового прогону (0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'алгоритм':>17} {'бекенд':>6} {'розмір':>6} {'щільн.':>6} {'пошуків/с':>10} "
+          f"{'p50, мс':>8} {'p95, мс':>8} {'p99, мс':>8} {'пам., КБ':>9} {'розкрито':>9}")
+    for size in args.sizes:
+        for wall_density in args.wall_densities:
+            for row in run_case(size, wall_density, args):
+                results.append(row)
+                memory = row['peak_memory_kb'] if row['peak_memory_kb'] is not None else float('nan')
+                print(f"{row['algorithm']:>17} {row['backend']:>6} {size:>6} {wall_density:>6} "
+                      f"{row['searches_per_second']:>10.0f} {row['p50_ms']:>8.3f} {row['p95_ms']:>8.3f} "
+                      f"{row['p99_ms']:>8.3f} {memory:>9.1f} {row['mean_nodes_expanded']:>9.1f}")
+
+    if args.output:
+        config = {key: getattr(args, key) for key in ('sizes', 'wall_densities', 'algorithms', 'backends',
+                                                     'queries', 'repeats', 'seed')}
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'config': config, 'results': results}, f, indent=2)
+
+    failed = False
+    mismatches = sum(row['mismatches'] for row in results)
+    if mismatches:
+        print(f"\nЗнайдено {mismatches} некоректних або неоптимальних шляхів")
+        failed = True
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.threshold)
+        if regressions:
+            print("\nРегресії:")
+            for line in regressions:
+                print(f"  {line}")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,23 @@
 # pathfinding/a_star.py
 
 import heapq
+from pathfinding.maze_graph import MazeGraph, a_star_graph, search_graph
+from pathfinding.stats import start_stats, finish_stats
 
 
-def a_star_search(grid, start, goal):
+def a_star_search(grid, start, goal, stats=None):
     """
     Реалізація алгоритму A*.
-    grid: 2D список, де 0 - прохідна клітинка, 1 - стіна
+    grid: 2D список, де 0 - прохідна клітинка, 1 - стіна, або MazeGraph
     start: кортеж (x, y)
     goal: кортеж (x, y)
+    stats: необов'язковий SearchStats, який буде заповнено статистикою пошуку
     """
+    if isinstance(grid, MazeGraph):
+        return search_graph(a_star_graph, grid, start, goal, stats)
+
+    start_stats(stats, 'a_star')
+
     def heuristic(a, b):
         return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
@@ -17,8 +25,12 @@ def a_star_search(grid, start, goal):
     heapq.heappush(open_set, (0 + heuristic(start, goal), 0, start))
     came_from = {}
     g_score = {start: 0}
+    nodes_pushed = 1
+    peak_frontier = 1
 
     while open_set:
+        if len(open_set) > peak_frontier:
+            peak_frontier = len(open_set)
         _, current_cost, current = heapq.heappop(open_set)
 
         if current == goal:
@@ -28,7 +40,7 @@ def a_star_search(grid, start, goal):
                 current = came_from[current]
                 path.append(current)
             path.reverse()
-            return path
+            return finish_stats(stats, path, nodes_pushed - len(open_set), nodes_pushed, peak_frontier)
 
         neighbors = get_neighbors(grid, current)
         for neighbor in neighbors:
@@ -38,8 +50,9 @@ def a_star_search(grid, start, goal):
                 g_score[neighbor] = tentative_g_score
                 f_score = tentative_g_score + heuristic(neighbor, goal)
                 heapq.heappush(open_set, (f_score, tentative_g_score, neighbor))
+                nodes_pushed += 1
 
-    return None  # Шлях не знайдено
+    return finish_stats(stats, None, nodes_pushed, nodes_pushed, peak_frontier)  # Шлях не знайдено
 
 
 def get_neighbors(grid, position):
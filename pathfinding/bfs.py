@@ -2,20 +2,31 @@
 
 from collections import deque
 from pathfinding.a_star import get_neighbors
+from pathfinding.maze_graph import MazeGraph, bfs_graph, search_graph
+from pathfinding.stats import start_stats, finish_stats
 
 
-def bfs_search(grid, start, goal):
+def bfs_search(grid, start, goal, stats=None):
     """
     Реалізація алгоритму BFS.
-    grid: 2D список, де 0 - прохідна клітинка, 1 - стіна
+    grid: 2D список, де 0 - прохідна клітинка, 1 - стіна, або MazeGraph
     start: кортеж (x, y)
     goal: кортеж (x, y)
+    stats: необов'язковий SearchStats, який буде заповнено статистикою пошуку
     """
+    if isinstance(grid, MazeGraph):
+        return search_graph(bfs_graph, grid, start, goal, stats)
+
+    start_stats(stats, 'bfs')
+
     queue = deque()
     queue.append(start)
     came_from = {start: None}
+    peak_frontier = 1
 
     while queue:
+        if len(queue) > peak_frontier:
+            peak_frontier = len(queue)
         current = queue.popleft()
 
         if current == goal:
@@ -25,11 +36,11 @@ def bfs_search(grid, start, goal):
                 current = came_from[current]
                 path.append(current)
             path.reverse()
-            return path
+            return finish_stats(stats, path, len(came_from) - len(queue), len(came_from), peak_frontier)
 
         for neighbor in get_neighbors(grid, current):
             if neighbor not in came_from:
                 came_from[neighbor] = current
                 queue.append(neighbor)
 
-    return None  # Шлях не знайдено
+    return finish_stats(stats, None, len(came_from), len(came_from), peak_frontier)  # Шлях не знайдено
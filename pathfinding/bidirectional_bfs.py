@@ -0,0 +1,70 @@
+# pathfinding/bidirectional_bfs.py
+
+from pathfinding.a_star import get_neighbors
+from pathfinding.maze_graph import MazeGraph, bidirectional_bfs_graph, search_graph
+from pathfinding.stats import start_stats, finish_stats
+
+
+def bidirectional_bfs_search(grid, start, goal, stats=None):
+    """
+    Реалізація двонаправленого BFS: пошук одночасно від старту та від цілі.
+    Шлях має ту саму довжину, що й у bfs_search, але розкривається значно менше клітинок,
+    особливо у відкритих лабіринтах з великою кількістю петель.
+    grid: 2D список, де 0 - прохідна клітинка, 1 - стіна, або MazeGraph
+    start: кортеж (x, y)
+    goal: кортеж (x, y)
+    stats: необов'язковий SearchStats, який буде заповнено статистикою пошуку
+    """
+    if isinstance(grid, MazeGraph):
+        return search_graph(bidirectional_bfs_graph, grid, start, goal, stats)
+
+    start_stats(stats, 'bidirectional_bfs')
+    if start == goal:
+        return finish_stats(stats, [start], 1, 1, 1)
+    gx, gy = goal
+    if not (0 <= gy < len(grid) and 0 <= gx < len(grid[0])) or grid[gy][gx] != 0:
+        return finish_stats(stats, None, 0, 0, 0)  # Ціль - стіна або поза лабіринтом
+
+    came_from = {start: None}
+    came_from_back = {goal: None}
+    forward = [start]
+    backward = [goal]
+    nodes_expanded = 0
+    peak_frontier = 2
+    while forward and backward:
+        if len(forward) + len(backward) > peak_frontier:
+            peak_frontier = len(forward) + len(backward)
+        # Щоразу розширюємо цілим шаром менший фронт
+        is_forward = len(forward) <= len(backward)
+        if is_forward:
+            layer, own, other = forward, came_from, came_from_back
+        else:
+            layer, own, other = backward, came_from_back, came_from
+
+        next_layer = []
+        for current in layer:
+            nodes_expanded += 1
+            for neighbor in get_neighbors(grid, current):
+                if neighbor in other:
+                    # Фронти зустрілись: клітинка іншого фронту лежить на його останньому шарі,
+                    # тому перша зустріч дає найкоротший шлях
+                    near, far = (current, neighbor) if is_forward else (neighbor, current)
+                    path = []
+                    while near is not None:
+                        path.append(near)
+                        near = came_from[near]
+                    path.reverse()
+                    while far is not None:
+                        path.append(far)
+                        far = came_from_back[far]
+                    return finish_stats(stats, path, nodes_expanded, len(came_from) + len(came_from_back),
+                                        peak_frontier)
+                if neighbor not in own:
+                    own[neighbor] = current
+                    next_layer.append(neighbor)
+        if is_forward:
+            forward = next_layer
+        else:
+            backward = next_layer
+
+    return finish_stats(stats, None, nodes_expanded, len(came_from) + len(came_from_back), peak_frontier)
@@ -1,20 +1,31 @@
 # pathfinding/dfs.py
 from pathfinding.a_star import get_neighbors
+from pathfinding.maze_graph import MazeGraph, dfs_graph, search_graph
+from pathfinding.stats import start_stats, finish_stats
 
 
-def dfs_search(grid, start, goal):
+def dfs_search(grid, start, goal, stats=None):
     """
     Реалізація алгоритму DFS.
-    grid: 2D список, де 0 - прохідна клітинка, 1 - стіна
+    grid: 2D список, де 0 - прохідна клітинка, 1 - стіна, або MazeGraph
     start: кортеж (x, y)
     goal: кортеж (x, y)
+    stats: необов'язковий SearchStats, який буде заповнено статистикою пошуку
     """
+    if isinstance(grid, MazeGraph):
+        return search_graph(dfs_graph, grid, start, goal, stats)
+
+    start_stats(stats, 'dfs')
+
     stack = []
     stack.append(start)
     came_from = {start: None}
     visited = set()
+    peak_frontier = 1
 
     while stack:
+        if len(stack) > peak_frontier:
+            peak_frontier = len(stack)
         current = stack.pop()
 
         if current == goal:
@@ -24,7 +35,7 @@ def dfs_search(grid, start, goal):
                 current = came_from[current]
                 path.append(current)
             path.reverse()
-            return path
+            return finish_stats(stats, path, len(visited), len(came_from), peak_frontier)
 
         if current in visited:
             continue
@@ -35,4 +46,4 @@ def dfs_search(grid, start, goal):
                 came_from[neighbor] = current
                 stack.append(neighbor)
 
-    return None  # Шлях не знайдено
+    return finish_stats(stats, None, len(visited), len(came_from), peak_frontier)  # Шлях не знайдено
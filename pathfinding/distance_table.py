@@ -0,0 +1,166 @@
+# pathfinding/distance_table.py
+
+from collections import OrderedDict
+import numpy as np
+
+# Напрямки в тому ж порядку, що й у get_neighbors
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+OPPOSITE = [1, 0, 3, 2]  # Індекс протилежного напрямку
+
+UNREACHABLE = np.iinfo(np.uint16).max  # Відстань до недосяжної клітинки в таблиці uint16
+NO_STEP = 255  # Немає наступного кроку (ціль або недосяжна клітинка)
+
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024  # Бюджет пам'яті на повну таблицю (байти)
+BATCH_MEMORY = 16 * 1024 * 1024  # Пам'ять на одну пачку BFS під час побудови
+
+
+class DistanceTable:
+    """
+    Таблиця відстаней та наступних кроків між усіма парами прохідних клітинок.
+    Будується один раз на рівень пошуком у ширину з кожної прохідної клітинки,
+    після чого "наступний крок з A до B" та "відстань у лабіринті" - це звернення до масиву.
+
+    Рядок t таблиці описує ціль t: dist[t, c] - відстань від клітинки c до t,
+    step[t, c] - індекс напрямку (DIRECTIONS), яким треба рухатися з c, щоб наблизитися до t.
+    Якщо N² клітинок не вміщуються в memory_limit, рядки обчислюються на вимогу
+    та зберігаються в LRU-кеші з cache_rows рядків.
+    Відстані зберігаються як uint16 (недосяжна - UNREACHABLE), поки найдовший можливий шлях
+    (N - 1 кроків) менший за UNREACHABLE; у більших лабіринтах - лише рядки на вимогу в uint32
+    з позначкою недосяжності self.unreachable.
+    """
+
+    def __init__(self, grid, memory_limit=DEFAULT_MEMORY_LIMIT, cache_rows=256):
+        """
+        grid: 2D список, де 0 - прохідна клітинка, 1 - стіна
+        memory_limit: максимальний розмір повної таблиці в байтах
+        cache_rows: кількість рядків у кеші, якщо повна таблиця не вміщується
+        """
+        self.init_topology(grid)
+
+        # 2 байти на відстань + 1 байт на напрямок для кожної пари клітинок; повна таблиця
+        # завжди в uint16, тож лише для лабіринтів, де відстань не сягає UNREACHABLE
+        self.is_full = self.size * self.size * 3 <= memory_limit and self.dist_dtype == np.uint16
+        self.cache_rows = cache_rows
+        self._rows = OrderedDict()
+        if self.is_full:
+            self.dist = np.empty((self.size, self.size), dtype=np.uint16)
+            self.step = np.empty((self.size, self.size), dtype=np.uint8)
+            batch = max(1, BATCH_MEMORY // max(1, self.size * 3))
+            for first in range(0, self.size, batch):
+                sources = np.arange(first, min(first + batch, self.size))
+                self.dist[sources], self.step[sources] = self._bfs_rows(sources)
+        else:
+            self.dist = None
+            self.step = None
+
+    @classmethod
+    def from_arrays(cls, grid, dist, step, cache_rows=256):
+        """
+        Таблиця з уже обчислених масивів dist та step (наприклад, відображених з пакета рівнів
+        через mmap). Обмеження пам'яті не перевіряється: сторінки файлу читаються на вимогу.
+        """
+        table = cls.__new__(cls)
+        table.init_topology(grid)
+        if table.dist_dtype != np.uint16:
+            raise ValueError(f"Лабіринт з {table.size} клітинками не вміщує відстані в uint16")
+        if dist.shape != (table.size, table.size) or step.shape != (table.size, table.size):
+            raise ValueError(f"Розмір таблиці {dist.shape} не відповідає {table.size} клітинкам лабіринту")
+        table.is_full = True
+        table.cache_rows = cache_rows
+        table._rows = OrderedDict()
+        table.dist = dist
+        table.step = step
+        return table
+
+    def init_topology(self, grid):
+        cells = np.asarray(grid, dtype=np.uint8)
+        self.height, self.width = cells.shape
+        ys, xs = np.nonzero(cells == 0)
+        self.positions = list(zip(xs.tolist(), ys.tolist()))  # Позиція (x, y) для кожного id
+        self.index = {position: i for i, position in enumerate(self.positions)}
+        self.size = len(self.positions)
+        # Найдовший шлях має size - 1 кроків: uint16 достатньо, поки він менший за UNREACHABLE
+        self.dist_dtype = np.uint16 if self.size <= UNREACHABLE else np.uint32
+        self.unreachable = np.iinfo(self.dist_dtype).max
+
+        # Сусіди кожної клітинки за напрямками, -1 - стіна або межа лабіринту
+        cell_ids = np.full((self.height + 2, self.width + 2), -1, dtype=np.int32)
+        cell_ids[ys + 1, xs + 1] = np.arange(self.size, dtype=np.int32)
+        self.neighbors = np.empty((self.size, len(DIRECTIONS)), dtype=np.int32)
+        for k, (dx, dy) in enumerate(DIRECTIONS):
+            self.neighbors[:, k] = cell_ids[ys + 1 + dy, xs + 1 + dx]
+        self.cell_ids = cell_ids[1:-1, 1:-1]  # id клітинки за [y, x], -1 - стіна
+
+    def _bfs_rows(self, sources):
+        """
+        Одночасний BFS з кількох клітинок. Фронт зберігається як пари (рядок, клітинка),
+        тому загальна робота пропорційна кількості досягнутих клітинок, а не N на кожному рівні.
+        """
+        batch = len(sources)
+        unreachable = self.unreachable
+        dist = np.full((batch, self.size), unreachable, dtype=self.dist_dtype)
+        step = np.full((batch, self.size), NO_STEP, dtype=np.uint8)
+        flat_dist = dist.reshape(-1)
+        flat_step = step.reshape(-1)
+
+        frontier = np.arange(batch, dtype=np.int64) * self.size + sources
+        flat_dist[frontier] = 0
+        depth = 0
+        while frontier.size:
+            depth += 1
+            rows, cells = np.divmod(frontier, self.size)
+            reached = []
+            for k in range(len(DIRECTIONS)):
+                neighbors = self.neighbors[cells, k]
+                valid = neighbors >= 0
+                candidates = rows[valid] * self.size + neighbors[valid]
+                candidates = candidates[flat_dist[candidates] == unreachable]
+                # Сусід досягнутий кроком у напрямку k, отже з нього до джерела - протилежний напрямок
+                flat_dist[candidates] = depth
+                flat_step[candidates] = OPPOSITE[k]
+                reached.append(candidates)
+            frontier = np.concatenate(reached)
+        return dist, step
+
+    def row(self, target_id):
+        """
+        Повертає (dist, step) для цілі target_id.
+        """
+        if self.is_full:
+            return self.dist[target_id], self.step[target_id]
+        cached = self._rows.get(target_id)
+        if cached is not None:
+            self._rows.move_to_end(target_id)
+            return cached
+        dist, step = self._bfs_rows(np.array([target_id]))
+        cached = (dist[0], step[0])
+        self._rows[target_id] = cached
+        if len(self._rows) > self.cache_rows:
+            self._rows.popitem(last=False)
+        return cached
+
+    def distance(self, start, goal):
+        """
+        Довжина найкоротшого шляху між клітинками (float('inf'), якщо шляху немає).
+        """
+        start_id = self.index.get(start)
+        goal_id = self.index.get(goal)
+        if start_id is None or goal_id is None:
+            return float('inf')
+        value = int(self.row(goal_id)[0][start_id])
+        return value if value != self.unreachable else float('inf')
+
+    def next_step(self, start, goal):
+        """
+        Наступна клітинка на найкоротшому шляху зі start до goal або None,
+        якщо start == goal чи шляху немає.
+        """
+        start_id = self.index.get(start)
+        goal_id = self.index.get(goal)
+        if start_id is None or goal_id is None:
+            return None
+        direction = int(self.row(goal_id)[1][start_id])
+        if direction == NO_STEP:
+            return None
+        dx, dy = DIRECTIONS[direction]
+        return (start[0] + dx, start[1] + dy)
@@ -0,0 +1,97 @@
+# pathfinding/flow_field.py
+
+from array import array
+from collections import deque, OrderedDict
+
+NO_STEP = -1  # Немає наступного кроку (ціль або недосяжна клітинка)
+
+
+class FlowField:
+    """
+    Карта відстаней до однієї цілі на MazeGraph: для кожної клітинки (id x * height + y)
+    зберігається відстань до цілі та id сусідньої клітинки, що є першим кроком до неї.
+    """
+
+    def __init__(self, graph, target):
+        self.graph = graph
+        self.target = target
+        size = graph.size
+        self.dist = array('i', [-1]) * size  # -1 - клітинка недосяжна
+        self.step = array('i', [NO_STEP]) * size
+
+        start = graph.cell_id(target)
+        if start is None or graph.cells[start]:
+            return  # Ціль - стіна або поза лабіринтом: шляху немає ні з якої клітинки
+
+        # BFS від цілі по сусідах графа: з досягнутої клітинки до цілі веде клітинка, з якої її досягнуто
+        dist, step = self.dist, self.step
+        adjacency = graph.adjacency
+        dist[start] = 0
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            next_dist = dist[current] + 1
+            for neighbor in adjacency[current]:
+                if dist[neighbor] < 0:
+                    dist[neighbor] = next_dist
+                    step[neighbor] = current
+                    queue.append(neighbor)
+
+    def distance(self, position):
+        """
+        Відстань від position до цілі (float('inf'), якщо шляху немає).
+        """
+        cell = self.graph.cell_id(position)
+        if cell is None:
+            return float('inf')
+        value = self.dist[cell]
+        return value if value >= 0 else float('inf')
+
+    def next_step(self, position):
+        """
+        Наступна клітинка з position у напрямку цілі або None.
+        """
+        cell = self.graph.cell_id(position)
+        if cell is None:
+            return None
+        next_cell = self.step[cell]
+        if next_cell == NO_STEP:
+            return None
+        return self.graph.positions[next_cell]
+
+
+class FlowFieldCache:
+    """
+    Спільний для всіх привидів сервіс карт відстаней. Лабіринт статичний, тому карта
+    для цілі залишається дійсною, поки ціль не зміниться: на кожному кроці виконується
+    один BFS на кожну нову ціль, а всі привиди з тією ж ціллю читають готовий напрямок.
+    Карти будуються на MazeGraph рівня, тож id клітинок ті самі, що й у решті пошуків.
+    """
+
+    def __init__(self, graph, capacity=32):
+        """
+        graph: MazeGraph рівня
+        capacity: скільки останніх карт тримати в пам'яті
+        """
+        self.graph = graph
+        self.capacity = capacity
+        self.fields = OrderedDict()
+        self.searches = 0  # Кількість виконаних BFS (для оцінки вартості AI привидів)
+
+    def field(self, target):
+        field = self.fields.get(target)
+        if field is not None:
+            self.fields.move_to_end(target)
+            return field
+        field = FlowField(self.graph, target)
+        self.searches += 1
+        self.fields[target] = field
+        if len(self.fields) > self.capacity:
+            self.fields.popitem(last=False)
+        return field
+
+    def next_step(self, position, target):
+        return self.field(target).next_step(position)
+
+    def distance(self, position, target):
+        return self.field(target).distance(position)
@@ -0,0 +1,177 @@
+# pathfinding/incremental.py
+
+import heapq
+from pathfinding.stats import start_stats, finish_stats
+
+
+class IncrementalPlanner:
+    """
+    Інкрементний планувальник шляху до рухомої цілі (адаптація Generalized Fringe-Retrieving A*
+    для графа з одиничними вагами). Дерево пошуку A* росте від того, хто шукає (привида),
+    і зберігається між викликами:
+    - розкриті (закриті) клітинки мають точні відстані від кореня незалежно від цілі, тому рух
+      цілі лише перераховує евристику у фронті; якщо нова ціль уже закрита, шлях читається
+      з дерева без жодного розкриття;
+    - коли привид переходить у клітинку дерева з точною відстанню (зазвичай - наступну клітинку
+      шляху), дерево "перекорінюється": піддерево нового кореня зберігає відстані, відкидається
+      лише решта, а закриті клітинки на межі відкинутої частини повертаються у фронт;
+    - в інших випадках (привида перенесено далеко) пошук починається заново.
+    Працює на MazeGraph; сітка рівня має бути незмінною. Кожному привиду - окремий екземпляр.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.root = None  # id клітинки старту, від якої росте дерево
+        self.goal = None  # id цілі, для якої впорядкований фронт
+        self.g = {}  # id клітинки -> відстань (зі зсувом: відстань від кореня = g - g[root])
+        self.parent = {}  # id клітинки -> батько в дереві (попередній крок шляху), None для кореня
+        self.closed = set()  # Розкриті клітинки (їхні відстані остаточні)
+        self.open = []  # Купа (f, g, id клітинки) для поточної цілі
+        self.nodes_pushed = 0
+        self.reroots = 0  # Скільки разів дерево вдалося перевикористати
+        self.restarts = 0  # Скільки разів пошук починався заново
+
+    def reset(self, root):
+        self.root = root
+        self.goal = None
+        self.g = {root: 0}
+        self.parent = {root: None}
+        self.closed = set()
+        self.open = [(0, 0, root)]
+        self.nodes_pushed += 1
+        self.restarts += 1
+
+    def set_start(self, start):
+        """
+        start: id клітинки, з якої шукається шлях.
+        """
+        if start == self.root:
+            return
+        g = self.g
+        if start in self.closed or (self.root is not None and g.get(start) == g[self.root] + 1):
+            # Відстань до start точна: закрита клітинка або сусід кореня
+            self.reroot(start)
+        else:
+            self.reset(start)
+
+    def reroot(self, new_root):
+        g, parent, closed = self.g, self.parent, self.closed
+        adjacency = self.graph.adjacency
+
+        # Від'єднуємо піддерево нового кореня: відстані в ньому залишаються точними
+        parent[new_root] = None
+
+        # Все, що залишилось під старим коренем, відкидається. Діти клітинки - це сусіди,
+        # чий батько вказує на неї, тому окремі списки дітей не потрібні
+        discarded = []
+        stack = [self.root]
+        while stack:
+            cell = stack.pop()
+            discarded.append(cell)
+            for neighbor in adjacency[cell]:
+                if parent.get(neighbor, -1) == cell:
+                    stack.append(neighbor)
+        for cell in discarded:
+            del g[cell]
+            del parent[cell]
+            closed.discard(cell)
+
+        # Закриті клітинки піддерева, сусідні з відкинутими, знову потрапляють у фронт,
+        # щоб за потреби пошук відновив відкинуту частину вже від нового кореня
+        reopened = {new_root} if new_root not in closed else set()
+        for cell in discarded:
+            for neighbor in adjacency[cell]:
+                if neighbor in closed:
+                    reopened.add(neighbor)
+        closed.difference_update(reopened)
+        self.root = new_root
+        self.reroots += 1
+        self.reorder(self.goal, reopened)
+
+    def reorder(self, goal, extra=()):
+        """
+        Перебудова фронту для цілі goal: застарілі записи відкидаються, f перераховується
+        з новою евристикою. extra - клітинки, які треба додати у фронт.
+        """
+        g, closed = self.g, self.closed
+        positions = self.graph.positions
+        frontier = set(extra)
+        for _, value, cell in self.open:
+            if g.get(cell) == value and cell not in closed:
+                frontier.add(cell)
+        self.nodes_pushed += len(extra)
+        self.goal = goal
+        if goal is None:
+            self.open = [(0, g[cell], cell) for cell in frontier]
+        else:
+            goal_x, goal_y = positions[goal]
+            self.open = []
+            for cell in frontier:
+                x, y = positions[cell]
+                value = g[cell]
+                self.open.append((value + abs(x - goal_x) + abs(y - goal_y), value, cell))
+        heapq.heapify(self.open)
+
+    def grow(self, goal):
+        """
+        Продовження пошуку A*, доки клітинка goal не стане закритою або фронт не вичерпається.
+        Повертає кількість розкритих вершин.
+        """
+        if goal in self.closed:
+            return 0
+        if goal != self.goal:
+            self.reorder(goal)
+        g, parent, closed, open_set = self.g, self.parent, self.closed, self.open
+        adjacency = self.graph.adjacency
+        positions = self.graph.positions
+        goal_x, goal_y = positions[goal]
+        heappop, heappush = heapq.heappop, heapq.heappush
+        expanded = 0
+        pushed = 0
+        while goal not in closed and open_set:
+            _, value, current = heappop(open_set)
+            if current in closed or g.get(current) != value:
+                continue  # Застарілий запис купи
+            closed.add(current)
+            expanded += 1
+            next_value = value + 1
+            for neighbor in adjacency[current]:
+                if neighbor in closed:
+                    continue
+                if next_value < g.get(neighbor, next_value + 1):
+                    g[neighbor] = next_value
+                    parent[neighbor] = current
+                    x, y = positions[neighbor]
+                    heappush(open_set, (next_value + abs(x - goal_x) + abs(y - goal_y), next_value, neighbor))
+                    pushed += 1
+        self.nodes_pushed += pushed
+        return expanded
+
+    def find_path(self, start, goal, stats=None):
+        """
+        Найкоротший шлях від start до goal (позиції (x, y)) як список позицій або None.
+        stats: необов'язковий SearchStats (nodes_expanded - лише вершини, розкриті в цьому виклику)
+        """
+        start_stats(stats, 'incremental')
+        graph = self.graph
+        start_id = graph.cell_id(start)
+        goal_id = graph.cell_id(goal)
+        if start_id is None or goal_id is None or graph.cells[start_id] or graph.cells[goal_id]:
+            # Ціль у стіні чи поза лабіринтом не руйнує збережене дерево
+            return finish_stats(stats, None, 0, 0, 0)
+
+        pushed_before = self.nodes_pushed
+        self.set_start(start_id)
+        expanded = self.grow(goal_id)
+        if goal_id not in self.closed:
+            return finish_stats(stats, None, expanded, self.nodes_pushed - pushed_before, len(self.open))
+
+        positions = graph.positions
+        parent = self.parent
+        path = []
+        cell = goal_id
+        while cell is not None:
+            path.append(positions[cell])
+            cell = parent[cell]
+        path.reverse()
+        return finish_stats(stats, path, expanded, self.nodes_pushed - pushed_before, len(self.open))
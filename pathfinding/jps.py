@@ -0,0 +1,135 @@
+# pathfinding/jps.py
+
+import heapq
+from pathfinding.maze_graph import MazeGraph
+from pathfinding.stats import start_stats, finish_stats
+
+# Напрямки руху зі старту: спершу горизонтальні, потім вертикальні
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+
+def jps_search(grid, start, goal, stats=None):
+    """
+    Jump Point Search для 4-зв'язної сітки.
+    Серед рівних за довжиною шляхів розглядаються лише "канонічні" (спершу вертикальний рух,
+    поворот у горизонтальному русі - лише біля стіни), тому в купу потрапляють не всі клітинки,
+    а тільки точки стрибка:
+    - горизонтальний стрибок зупиняється на цілі або на клітинці з вимушеним сусідом
+      (вертикальний сусід вільний, а той самий сусід попередньої клітинки - стіна);
+    - вертикальний стрибок на кожному кроці запускає горизонтальні стрибки в обидва боки
+      (як діагональний рух у 8-зв'язному JPS) і зупиняється, якщо хоч один з них щось знайшов.
+    Повертає повний шлях (усі клітинки між точками стрибка) тієї ж довжини, що й у bfs_search.
+    grid: 2D список, де 0 - прохідна клітинка, 1 - стіна, або MazeGraph
+    start: кортеж (x, y)
+    goal: кортеж (x, y)
+    stats: необов'язковий SearchStats, який буде заповнено статистикою пошуку
+    """
+    start_stats(stats, 'jps')
+    if isinstance(grid, MazeGraph):
+        width, height, cells = grid.width, grid.height, grid.cells
+        if grid.cell_id(start) is None or grid.cell_id(goal) is None:
+            return finish_stats(stats, None, 0, 0, 0)
+
+        def is_free(x, y):
+            return 0 <= x < width and 0 <= y < height and not cells[x * height + y]
+    else:
+        width, height = len(grid[0]), len(grid)
+
+        def is_free(x, y):
+            return 0 <= x < width and 0 <= y < height and grid[y][x] == 0
+
+    if start == goal:
+        return finish_stats(stats, [start], 1, 1, 1)
+    if not is_free(*goal):
+        return finish_stats(stats, None, 0, 0, 0)  # Ціль - стіна: у неї не веде жоден перехід
+    goal_x, goal_y = goal
+
+    def jump_horizontal(x, y, dx):
+        while True:
+            x += dx
+            if not is_free(x, y):
+                return None
+            if x == goal_x and y == goal_y:
+                return (x, y)
+            if (is_free(x, y - 1) and not is_free(x - dx, y - 1)) or \
+                    (is_free(x, y + 1) and not is_free(x - dx, y + 1)):
+                return (x, y)
+
+    def jump_vertical(x, y, dy):
+        while True:
+            y += dy
+            if not is_free(x, y):
+                return None
+            if x == goal_x and y == goal_y:
+                return (x, y)
+            if jump_horizontal(x, y, 1) is not None or jump_horizontal(x, y, -1) is not None:
+                return (x, y)
+
+    def successor_directions(node, direction):
+        if direction is None:
+            return DIRECTIONS
+        dx, dy = direction
+        if dy:
+            # Після вертикального руху природні сусіди - продовження та обидва горизонтальні
+            return [(0, dy), (1, 0), (-1, 0)]
+        x, y = node
+        directions = [(dx, 0)]
+        for ny in (-1, 1):
+            if is_free(x, y + ny) and not is_free(x - dx, y + ny):
+                directions.append((0, ny))
+        return directions
+
+    open_set = [(abs(start[0] - goal_x) + abs(start[1] - goal_y), 0, start)]
+    came_from = {start: None}
+    g_score = {start: 0}
+    direction_to = {start: None}
+    nodes_pushed = 1
+    nodes_expanded = 0
+    peak_frontier = 1
+    while open_set:
+        if len(open_set) > peak_frontier:
+            peak_frontier = len(open_set)
+        _, cost, current = heapq.heappop(open_set)
+        if cost != g_score[current]:
+            continue  # Застарілий запис купи
+        if current == goal:
+            return finish_stats(stats, expand_path(came_from, goal), nodes_expanded, nodes_pushed, peak_frontier)
+        nodes_expanded += 1
+
+        x, y = current
+        for dx, dy in successor_directions(current, direction_to[current]):
+            jump_point = jump_horizontal(x, y, dx) if dx else jump_vertical(x, y, dy)
+            if jump_point is None:
+                continue
+            tentative = cost + abs(jump_point[0] - x) + abs(jump_point[1] - y)
+            if tentative < g_score.get(jump_point, tentative + 1):
+                g_score[jump_point] = tentative
+                came_from[jump_point] = current
+                direction_to[jump_point] = (dx, dy)
+                heapq.heappush(open_set, (tentative + abs(jump_point[0] - goal_x) + abs(jump_point[1] - goal_y),
+                                          tentative, jump_point))
+                nodes_pushed += 1
+
+    return finish_stats(stats, None, nodes_expanded, nodes_pushed, peak_frontier)  # Шлях не знайдено
+
+
+def expand_path(came_from, goal):
+    """
+    Відновлення повного шляху: точки стрибка лежать на одній прямій, тож проміжні клітинки
+    між ними заповнюються кроками по 1.
+    """
+    jump_points = [goal]
+    while came_from[jump_points[-1]] is not None:
+        jump_points.append(came_from[jump_points[-1]])
+    jump_points.reverse()
+
+    path = [jump_points[0]]
+    for x2, y2 in jump_points[1:]:
+        x, y = path[-1]
+        dx = (x2 > x) - (x2 < x)
+        dy = (y2 > y) - (y2 < y)
+        while (x, y) != (x2, y2):
+            x += dx
+            y += dy
+            path.append((x, y))
+    return path
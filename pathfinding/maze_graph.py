@@ -0,0 +1,311 @@
+# pathfinding/maze_graph.py
+
+from array import array
+from collections import deque
+import heapq
+from pathfinding.stats import start_stats, finish_stats
+
+# Напрямки в тому ж порядку, що й у get_neighbors, щоб пошуки давали ті самі шляхи
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+
+class MazeGraph:
+    """
+    Компактне представлення лабіринту для пошуку шляху.
+    Клітинки мають цілі id = x * height + y (порядок id збігається з порядком кортежів (x, y),
+    тому A* розв'язує нічиї так само, як і кортежна версія). Сітка зберігається в плоскому
+    bytearray, сусіди - в CSR-масивах (offsets, targets), побудованих один раз.
+    Масиви батьків і вартостей виділені заздалегідь і "очищаються" зміною мітки пошуку,
+    тому один екземпляр не можна використовувати з кількох потоків одночасно.
+    """
+
+    def __init__(self, grid):
+        """
+        grid: 2D список, де 0 - прохідна клітинка, 1 - стіна
+        """
+        self.height = len(grid)
+        self.width = len(grid[0])
+        self.size = self.width * self.height
+        height = self.height
+
+        self.cells = bytearray(self.size)  # 0 - прохідна клітинка, 1 - стіна
+        for y, row in enumerate(grid):
+            for x, cell in enumerate(row):
+                self.cells[x * height + y] = 1 if cell != 0 else 0
+
+        # CSR: сусіди клітинки c - це targets[offsets[c]:offsets[c + 1]]
+        self.offsets = array('i', [0])
+        self.targets = array('i')
+        for cell in range(self.size):
+            x, y = divmod(cell, height)
+            for dx, dy in DIRECTIONS:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < self.width and 0 <= ny < height:
+                    neighbor = nx * height + ny
+                    if not self.cells[neighbor]:
+                        self.targets.append(neighbor)
+            self.offsets.append(len(self.targets))
+        self.init_search_arrays()
+
+    @classmethod
+    def from_arrays(cls, width, height, cells, offsets, targets):
+        """
+        Відновлення графа з готових масивів (наприклад, з пакета рівнів) без обходу сітки.
+        cells: послідовність 0/1 довжини width * height у порядку id клітинок
+        offsets, targets: CSR-масиви сусідів
+        """
+        graph = cls.__new__(cls)
+        graph.width = width
+        graph.height = height
+        graph.size = width * height
+        graph.cells = bytearray(cells)
+        graph.offsets = array('i', offsets)
+        graph.targets = array('i', targets)
+        graph.init_search_arrays()
+        return graph
+
+    def init_search_arrays(self):
+        height = self.height
+
+        # Кортежі сусідів, нарізані з CSR один раз: найшвидший доступ з Python-циклу
+        offsets, targets = self.offsets, self.targets
+        self.adjacency = [tuple(targets[offsets[c]:offsets[c + 1]]) for c in range(self.size)]
+        self.positions = [divmod(c, height) for c in range(self.size)]
+
+        # Заздалегідь виділені робочі масиви пошуку
+        self.parent = [-1] * self.size
+        self.cost = [0] * self.size
+        self.seen = [0] * self.size
+        self.closed = [0] * self.size
+        self.parent_back = [-1] * self.size  # Для зворотного напрямку двонаправленого BFS
+        self.seen_back = [0] * self.size
+        # Буфери DangerMap: окремі від масивів пошуку, бо карту читають посеред пошуку точок
+        self.arrival = [0] * self.size
+        self.arrival_seen = [0] * self.size
+        self.group_arrival = [0] * self.size  # Для другої та наступних груп швидкості привидів
+        self.group_seen = [0] * self.size
+        self.stamp = 0
+
+    def cell_id(self, position):
+        """
+        id клітинки для позиції (x, y) або None, якщо позиція поза лабіринтом.
+        """
+        x, y = position
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return x * self.height + y
+        return None
+
+    def is_open(self, position):
+        cell = self.cell_id(position)
+        return cell is not None and not self.cells[cell]
+
+    def next_stamp(self):
+        # Нова мітка робить усі записи попереднього пошуку недійсними без очищення масивів
+        self.stamp += 1
+        return self.stamp
+
+    def build_path(self, goal):
+        """
+        Відновлення шляху як списку позицій (x, y) від старту до goal за масивом батьків.
+        """
+        parent = self.parent
+        positions = self.positions
+        path = [positions[goal]]
+        current = parent[goal]
+        while current >= 0:
+            path.append(positions[current])
+            current = parent[current]
+        path.reverse()
+        return path
+
+
+def bfs_graph(graph, start, goal, stats=None):
+    """
+    BFS на MazeGraph. start, goal: id клітинок. Повертає список позицій або None.
+    stats: необов'язковий SearchStats
+    """
+    start_stats(stats, 'bfs')
+    stamp = graph.next_stamp()
+    seen = graph.seen
+    parent = graph.parent
+    adjacency = graph.adjacency
+
+    seen[start] = stamp
+    parent[start] = -1
+    queue = deque([start])
+    pop = queue.popleft
+    push = queue.append
+    nodes_pushed = 1
+    peak_frontier = 1
+    while queue:
+        if len(queue) > peak_frontier:
+            peak_frontier = len(queue)
+        current = pop()
+        if current == goal:
+            return finish_stats(stats, graph.build_path(goal), nodes_pushed - len(queue), nodes_pushed, peak_frontier)
+        for neighbor in adjacency[current]:
+            if seen[neighbor] != stamp:
+                seen[neighbor] = stamp
+                parent[neighbor] = current
+                push(neighbor)
+                nodes_pushed += 1
+    return finish_stats(stats, None, nodes_pushed, nodes_pushed, peak_frontier)
+
+
+def dfs_graph(graph, start, goal, stats=None):
+    """
+    DFS на MazeGraph з тим самим порядком обходу, що й dfs_search.
+    stats: необов'язковий SearchStats
+    """
+    start_stats(stats, 'dfs')
+    stamp = graph.next_stamp()
+    seen = graph.seen
+    closed = graph.closed
+    parent = graph.parent
+    adjacency = graph.adjacency
+
+    seen[start] = stamp
+    parent[start] = -1
+    stack = [start]
+    pop = stack.pop
+    push = stack.append
+    nodes_expanded = 0
+    nodes_pushed = 1
+    peak_frontier = 1
+    while stack:
+        if len(stack) > peak_frontier:
+            peak_frontier = len(stack)
+        current = pop()
+        if current == goal:
+            return finish_stats(stats, graph.build_path(goal), nodes_expanded, nodes_pushed, peak_frontier)
+        if closed[current] == stamp:
+            continue
+        closed[current] = stamp
+        nodes_expanded += 1
+        for neighbor in adjacency[current]:
+            if seen[neighbor] != stamp:
+                seen[neighbor] = stamp
+                parent[neighbor] = current
+                push(neighbor)
+                nodes_pushed += 1
+    return finish_stats(stats, None, nodes_expanded, nodes_pushed, peak_frontier)
+
+
+def a_star_graph(graph, start, goal, stats=None):
+    """
+    A* на MazeGraph з манхеттенською евристикою.
+    stats: необов'язковий SearchStats
+    """
+    start_stats(stats, 'a_star')
+    stamp = graph.next_stamp()
+    seen = graph.seen
+    cost = graph.cost
+    parent = graph.parent
+    adjacency = graph.adjacency
+    positions = graph.positions
+    goal_x, goal_y = positions[goal]
+
+    seen[start] = stamp
+    cost[start] = 0
+    parent[start] = -1
+    start_x, start_y = positions[start]
+    open_set = [(abs(start_x - goal_x) + abs(start_y - goal_y), 0, start)]
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    nodes_pushed = 1
+    peak_frontier = 1
+    while open_set:
+        if len(open_set) > peak_frontier:
+            peak_frontier = len(open_set)
+        _, current_cost, current = heappop(open_set)
+        if current == goal:
+            return finish_stats(stats, graph.build_path(goal), nodes_pushed - len(open_set), nodes_pushed,
+                                peak_frontier)
+
+        tentative_cost = cost[current] + 1  # Вартість переходу 1
+        for neighbor in adjacency[current]:
+            if seen[neighbor] != stamp or tentative_cost < cost[neighbor]:
+                seen[neighbor] = stamp
+                cost[neighbor] = tentative_cost
+                parent[neighbor] = current
+                nx, ny = positions[neighbor]
+                heappush(open_set, (tentative_cost + abs(nx - goal_x) + abs(ny - goal_y), tentative_cost, neighbor))
+                nodes_pushed += 1
+    return finish_stats(stats, None, nodes_pushed, nodes_pushed, peak_frontier)
+
+
+def bidirectional_bfs_graph(graph, start, goal, stats=None):
+    """
+    Двонаправлений BFS на MazeGraph: пошук одночасно від старту та від цілі, щоразу розширюється
+    цілим шаром менший фронт. Перша зустріч фронтів дає найкоротший шлях: клітинка іншого
+    фронту, знайдена під час розширення шару, завжди лежить на його останньому шарі.
+    stats: необов'язковий SearchStats
+    """
+    start_stats(stats, 'bidirectional_bfs')
+    positions = graph.positions
+    if start == goal:
+        return finish_stats(stats, [positions[start]], 1, 1, 1)
+    if graph.cells[goal]:
+        return finish_stats(stats, None, 0, 0, 0)  # Ціль - стіна: у неї не веде жоден перехід
+
+    stamp = graph.next_stamp()
+    seen, parent = graph.seen, graph.parent
+    seen_back, parent_back = graph.seen_back, graph.parent_back
+    adjacency = graph.adjacency
+    seen[start] = stamp
+    parent[start] = -1
+    seen_back[goal] = stamp
+    parent_back[goal] = -1
+    forward = [start]
+    backward = [goal]
+    nodes_expanded = 0
+    nodes_pushed = 2
+    peak_frontier = 2
+    while forward and backward:
+        if len(forward) + len(backward) > peak_frontier:
+            peak_frontier = len(forward) + len(backward)
+        is_forward = len(forward) <= len(backward)
+        if is_forward:
+            layer, own_seen, own_parent, other_seen = forward, seen, parent, seen_back
+        else:
+            layer, own_seen, own_parent, other_seen = backward, seen_back, parent_back, seen
+
+        next_layer = []
+        for current in layer:
+            nodes_expanded += 1
+            for neighbor in adjacency[current]:
+                if other_seen[neighbor] == stamp:
+                    # Фронти зустрілись: шлях від старту до середини плюс від середини до цілі
+                    near, far = (current, neighbor) if is_forward else (neighbor, current)
+                    path = graph.build_path(near)
+                    while far >= 0:
+                        path.append(positions[far])
+                        far = parent_back[far]
+                    return finish_stats(stats, path, nodes_expanded, nodes_pushed, peak_frontier)
+                if own_seen[neighbor] != stamp:
+                    own_seen[neighbor] = stamp
+                    own_parent[neighbor] = current
+                    next_layer.append(neighbor)
+                    nodes_pushed += 1
+        if is_forward:
+            forward = next_layer
+        else:
+            backward = next_layer
+    return finish_stats(stats, None, nodes_expanded, nodes_pushed, peak_frontier)
+
+
+def search_graph(search, graph, start, goal, stats=None):
+    """
+    Обгортка для кортежного API: перетворює позиції (x, y) на id клітинок і запускає search.
+    """
+    start_id = graph.cell_id(start)
+    goal_id = graph.cell_id(goal)
+    if start_id is None or goal_id is None:
+        # Позиція поза лабіринтом - шляху немає
+        start_stats(stats, SEARCH_NAMES.get(search))
+        return finish_stats(stats, None, 0, 0, 0)
+    return search(graph, start_id, goal_id, stats)
+
+
+SEARCH_NAMES = {bfs_graph: 'bfs', dfs_graph: 'dfs', a_star_graph: 'a_star',
+                bidirectional_bfs_graph: 'bidirectional_bfs'}
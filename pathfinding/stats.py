@@ -0,0 +1,115 @@
+# pathfinding/stats.py
+
+import time
+
+
+class SearchStats:
+    """
+    Статистика одного пошуку шляху. Передається в bfs_search/dfs_search/a_star_search
+    через параметр stats і заповнюється під час пошуку.
+    """
+    __slots__ = ('algorithm', 'nodes_expanded', 'nodes_pushed', 'peak_frontier', 'path_length',
+                 'found', 'elapsed', '_started')
+
+    def __init__(self, algorithm=None):
+        self.algorithm = algorithm
+        self.nodes_expanded = 0  # Скільки вершин знято з фронту та розкрито
+        self.nodes_pushed = 0  # Скільки вершин додано у фронт
+        self.peak_frontier = 0  # Найбільший розмір фронту
+        self.path_length = None  # Кількість кроків знайденого шляху (None - шлях не знайдено)
+        self.found = False
+        self.elapsed = 0.0  # Тривалість пошуку в секундах
+        self._started = 0.0
+
+    def start(self, algorithm):
+        self.algorithm = algorithm
+        self._started = time.perf_counter()
+
+    def finish(self, path, nodes_expanded, nodes_pushed, peak_frontier):
+        self.elapsed = time.perf_counter() - self._started
+        self.nodes_expanded = nodes_expanded
+        self.nodes_pushed = nodes_pushed
+        self.peak_frontier = peak_frontier
+        self.found = path is not None
+        self.path_length = len(path) - 1 if path is not None else None
+        return path
+
+    def as_dict(self):
+        return {
+            'algorithm': self.algorithm,
+            'nodes_expanded': self.nodes_expanded,
+            'nodes_pushed': self.nodes_pushed,
+            'peak_frontier': self.peak_frontier,
+            'path_length': self.path_length,
+            'found': self.found,
+            'elapsed': self.elapsed,
+        }
+
+
+def start_stats(stats, algorithm):
+    if stats is not None:
+        stats.start(algorithm)
+
+
+def finish_stats(stats, path, nodes_expanded, nodes_pushed, peak_frontier):
+    """
+    Заповнення stats (якщо він переданий) і повернення path без змін.
+    """
+    if stats is not None:
+        stats.finish(path, nodes_expanded, nodes_pushed, peak_frontier)
+    return path
+
+
+class SearchStatsAggregator:
+    """
+    Накопичення статистики пошуків по алгоритмах за весь прогін.
+    """
+
+    FIELDS = ('searches', 'found', 'nodes_expanded', 'nodes_pushed', 'path_length', 'elapsed')
+
+    def __init__(self):
+        self.totals = {}  # Алгоритм -> сумарні значення
+        self.peak_frontier = {}  # Алгоритм -> найбільший фронт за прогін
+
+    def add(self, stats):
+        totals = self.totals.get(stats.algorithm)
+        if totals is None:
+            totals = self.totals[stats.algorithm] = dict.fromkeys(self.FIELDS, 0)
+        totals['searches'] += 1
+        totals['nodes_expanded'] += stats.nodes_expanded
+        totals['nodes_pushed'] += stats.nodes_pushed
+        totals['elapsed'] += stats.elapsed
+        if stats.found:
+            totals['found'] += 1
+            totals['path_length'] += stats.path_length
+        self.peak_frontier[stats.algorithm] = max(self.peak_frontier.get(stats.algorithm, 0), stats.peak_frontier)
+
+    def merge(self, other):
+        """
+        Додавання накопиченої статистики іншого агрегатора (наприклад, з іншого процесу).
+        """
+        for algorithm, totals in other.totals.items():
+            own = self.totals.setdefault(algorithm, dict.fromkeys(self.FIELDS, 0))
+            for field in self.FIELDS:
+                own[field] += totals[field]
+            self.peak_frontier[algorithm] = max(self.peak_frontier.get(algorithm, 0), other.peak_frontier[algorithm])
+
+    def summary(self):
+        """
+        Середні значення на пошук для кожного алгоритму.
+        """
+        summary = {}
+        for algorithm, totals in sorted(self.totals.items(), key=lambda item: str(item[0])):
+            searches = totals['searches']
+            elapsed = totals['elapsed']
+            summary[algorithm] = {
+                'searches': searches,
+                'found_rate': totals['found'] / searches,
+                'mean_nodes_expanded': totals['nodes_expanded'] / searches,
+                'mean_nodes_pushed': totals['nodes_pushed'] / searches,
+                'peak_frontier': self.peak_frontier[algorithm],
+                'mean_path_length': totals['path_length'] / totals['found'] if totals['found'] else None,
+                'mean_elapsed_ms': elapsed / searches * 1000,
+                'nodes_expanded_per_second': totals['nodes_expanded'] / elapsed if elapsed else None,
+            }
+        return summary
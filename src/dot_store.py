@@ -0,0 +1,130 @@
+# src/dot_store.py
+
+from collections import deque
+
+
+class DotStore:
+    """
+    Сховище точок (їжі) з O(1) перевіркою наявності, видаленням і підрахунком.
+    Точки зберігаються у впорядкованому словнику (ітерація для відтворення - у порядку розміщення),
+    у бітовій карті з індексами клітинок MazeGraph (x * height + y) та у сітці кошиків
+    bucket_size x bucket_size для швидкого пошуку найближчої точки.
+    """
+
+    def __init__(self, width, height, positions=(), bucket_size=8):
+        self.width = width
+        self.height = height
+        self.bucket_size = bucket_size
+        self.bitmap = bytearray(width * height)  # 1 - у клітинці є точка
+        self._dots = {}
+        self._buckets = {}
+        for position in positions:
+            self.add(position)
+
+    def __len__(self):
+        return len(self._dots)
+
+    def __bool__(self):
+        return bool(self._dots)
+
+    def __iter__(self):
+        return iter(self._dots)
+
+    def __contains__(self, position):
+        return position in self._dots
+
+    def add(self, position):
+        if position in self._dots:
+            return
+        x, y = position
+        self._dots[position] = None
+        self.bitmap[x * self.height + y] = 1
+        bucket = (x // self.bucket_size, y // self.bucket_size)
+        self._buckets.setdefault(bucket, set()).add(position)
+
+    def discard(self, position):
+        """
+        Видалення точки, якщо вона є. Повертає True, якщо точку було видалено.
+        """
+        if position not in self._dots:
+            return False
+        x, y = position
+        del self._dots[position]
+        self.bitmap[x * self.height + y] = 0
+        bucket = (x // self.bucket_size, y // self.bucket_size)
+        points = self._buckets[bucket]
+        points.discard(position)
+        if not points:
+            del self._buckets[bucket]
+        return True
+
+    def remove(self, position):
+        if not self.discard(position):
+            raise ValueError(f"Точки {position} немає в сховищі")
+
+    def nearest(self, position, graph=None, predicate=None):
+        """
+        Найближча точка, що задовольняє predicate (якщо заданий).
+        graph: MazeGraph - пошук за відстанню в лабіринті (BFS з раннім виходом, None,
+               якщо досяжних точок немає); без графа - за манхеттенською відстанню.
+        """
+        if not self._dots:
+            return None
+        if graph is not None:
+            return self.nearest_in_maze(position, graph, predicate)
+        return self.nearest_manhattan(position, predicate)
+
+    def nearest_in_maze(self, position, graph, predicate=None):
+        start = graph.cell_id(position)
+        if start is None:
+            return None
+        bitmap = self.bitmap
+        positions = graph.positions
+        adjacency = graph.adjacency
+        seen = graph.seen
+        stamp = graph.next_stamp()
+
+        seen[start] = stamp
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            if bitmap[current]:
+                dot = positions[current]
+                if predicate is None or predicate(dot):
+                    return dot
+            for neighbor in adjacency[current]:
+                if seen[neighbor] != stamp:
+                    seen[neighbor] = stamp
+                    queue.append(neighbor)
+        return None
+
+    def nearest_manhattan(self, position, predicate=None):
+        px, py = position
+        size = self.bucket_size
+        bx, by = px // size, py // size
+        max_radius = max(self.width, self.height) // size + 1
+        best = None
+        best_distance = float('inf')
+        for radius in range(max_radius + 1):
+            # Будь-яка клітинка в кільці кошиків radius віддалена щонайменше на (radius - 1) * size + 1
+            if best is not None and best_distance <= max(0, (radius - 1) * size + 1):
+                break
+            for bucket in self._ring(bx, by, radius):
+                for dot in self._buckets.get(bucket, ()):
+                    distance = abs(dot[0] - px) + abs(dot[1] - py)
+                    if distance < best_distance and (predicate is None or predicate(dot)):
+                        best_distance = distance
+                        best = dot
+        return best
+
+    @staticmethod
+    def _ring(bx, by, radius):
+        if radius == 0:
+            yield (bx, by)
+            return
+        for cx in range(bx - radius, bx + radius + 1):
+            yield (cx, by - radius)
+            yield (cx, by + radius)
+        for cy in range(by - radius + 1, by + radius):
+            yield (bx - radius, cy)
+            yield (bx + radius, cy)
@@ -0,0 +1,149 @@
+# src/entities.py
+
+HISTORY_SIZE = 5  # Скільки останніх позицій пам'ятає кожна сутність
+NO_CELL = -1  # Позиція поза лабіринтом
+
+
+class EntityStore:
+    """
+    Стан усіх сутностей рівня (Пакмен і привиди) у вигляді структури масивів.
+    Кожна сутність має номер слота; позиції, id клітинок та історія позицій зберігаються
+    в спільних масивах, а лічильники зайнятості для кожної клітинки роблять перевірки
+    "чи є тут привид/Пакмен" та зіткнення O(1) замість обходу списку привидів.
+    Історія - кільцеві буфери фіксованого розміру в одному масиві, тож рух не виділяє пам'ять.
+    """
+
+    def __init__(self, width, height, history_size=HISTORY_SIZE):
+        self.width = width
+        self.height = height
+        self.history_size = history_size
+        # Списки швидші за array('i') для поелементного доступу з Python-коду
+        self.positions = []  # Слот -> позиція (x, y)
+        self.cells = []  # Слот -> id клітинки (x * height + y) або NO_CELL
+        self.is_ghost = []  # Слот -> True для привида, False для Пакмена
+        self.ghost_counts = bytearray(width * height)  # Кількість привидів у кожній клітинці
+        self.pacman_counts = bytearray(width * height)  # 1 - у клітинці Пакмен
+        self.history = []  # Слот -> кільцевий буфер позицій фіксованого розміру (None - порожній запис)
+        self.history_heads = []  # Слот -> індекс наступного запису в буфері
+
+    def cell_id(self, position):
+        x, y = position
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return x * self.height + y
+        return NO_CELL
+
+    def add(self, position, is_ghost):
+        """
+        Реєстрація сутності. Повертає номер її слота.
+        """
+        slot = len(self.positions)
+        self.positions.append(position)
+        self.cells.append(NO_CELL)
+        self.is_ghost.append(bool(is_ghost))
+        self.history.append([None] * self.history_size)
+        self.history_heads.append(0)
+        self.set_position(slot, position)
+        return slot
+
+    def set_position(self, slot, position):
+        """
+        Переміщення без запису в історію (початкова розстановка, телепорт). Повертає id нової клітинки.
+        """
+        x, y = position
+        height = self.height
+        cell = x * height + y if 0 <= x < self.width and 0 <= y < height else NO_CELL
+        counts = self.ghost_counts if self.is_ghost[slot] else self.pacman_counts
+        old = self.cells[slot]
+        if old != NO_CELL:
+            counts[old] -= 1
+        if cell != NO_CELL:
+            counts[cell] += 1
+        self.cells[slot] = cell
+        self.positions[slot] = position
+        return cell
+
+    def move(self, slot, position):
+        """
+        Хід сутності: нова позиція та запис у її кільцевий буфер історії.
+        """
+        self.set_position(slot, position)
+        head = self.history_heads[slot]
+        self.history[slot][head] = position
+        head += 1
+        self.history_heads[slot] = head if head < self.history_size else 0
+
+    def recently_visited(self, slot, position, count):
+        """
+        Чи є position серед останніх count (не більше history_size) записаних позицій сутності.
+        """
+        history = self.history[slot]
+        head = self.history_heads[slot]
+        # Від'ємні індекси списку самі "загортають" кільцевий буфер
+        for i in range(head - 1, head - 1 - count, -1):
+            if history[i] == position:
+                return True
+        return False
+
+    def history_of(self, slot):
+        """
+        Записані позиції сутності від найстарішої до найновішої (список, для налагодження та збереження).
+        """
+        head = self.history_heads[slot]
+        history = self.history[slot]
+        return [position for position in history[head:] + history[:head] if position is not None]
+
+    def ghosts_at(self, position):
+        x, y = position
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.ghost_counts[x * self.height + y]
+        return 0
+
+    def pacman_at(self, position):
+        x, y = position
+        return 0 <= x < self.width and 0 <= y < self.height and self.pacman_counts[x * self.height + y] > 0
+
+    def is_occupied(self, position):
+        # Привид або Пакмен у клітинці
+        x, y = position
+        if 0 <= x < self.width and 0 <= y < self.height:
+            cell = x * self.height + y
+            return self.ghost_counts[cell] > 0 or self.pacman_counts[cell] > 0
+        return False
+
+
+class EntityView:
+    """
+    Сутність як легкий перегляд свого слота в EntityStore лабіринту. Позиція дублюється
+    в атрибуті слота, бо її читають на кожному кроці десятки разів; змінювати її слід лише
+    через place() або move_to(), які оновлюють і спільні масиви, і лічильники зайнятості.
+    """
+    __slots__ = ('store', 'slot', 'position')
+
+    def __init__(self, store, position, is_ghost):
+        self.store = store
+        self.slot = store.add(position, is_ghost)
+        self.position = position
+
+    def place(self, position):
+        # Переміщення без запису в історію (початкова розстановка, телепорт)
+        self.position = position
+        self.store.set_position(self.slot, position)
+
+    def move_to(self, position):
+        # Лічильники зайнятості та історію оновлює лише EntityStore.move
+        self.position = position
+        self.store.move(self.slot, position)
+
+    def recently_visited(self, position, count):
+        store = self.store
+        history = store.history[self.slot]
+        head = store.history_heads[self.slot]
+        for i in range(head - 1, head - 1 - count, -1):
+            if history[i] == position:
+                return True
+        return False
+
+    @property
+    def previous_positions(self):
+        # Історія останніх позицій (копія кільцевого буфера)
+        return self.store.history_of(self.slot)
@@ -1,17 +1,51 @@
 import pygame
-from src.level_generator import LevelGenerator
-from src.pacman import PacMan
-from src.ghost import Ghost
+from concurrent.futures import ThreadPoolExecutor
+from src.simulation import Simulation, derive_seed
+from src.replay import ReplayWriter
+from src.level_pack import LevelPack
+from src.profiler import FrameProfiler
 from src.utils import load_assets
-import sys
+import os
 import random
+import sys
+import time
 
 
 class Game:
     TILE_SIZE = 30
-
-    def __init__(self, level_number=1):
+    TICK_RATE = 60  # Кроків симуляції за секунду при швидкості 1x
+    FRAME_RATE = 60  # Максимальна частота відтворення кадрів
+    SPEED_MULTIPLIERS = [1, 4, 16, None]  # Клавіші 1-4; None - без обмеження швидкості
+    MAX_BACKLOG = 0.25  # Скільки секунд ігрового часу можна накопичити, якщо симуляція не встигає
+    MAX_RENDER_INTERVAL = 0.25  # Навіть при пропуску кадрів екран оновлюється хоча б так часто (секунди)
+
+    def __init__(self, level_number=1, profiler=None, profile_output=None, speed=1, seed=None, record=None,
+                 level_pack=None, planner_budget_ms=None, ai_budget_ms=None, weighted_danger=False):
+        """
+        profiler: FrameProfiler для вимірювання фаз кадру (None - вимкнений)
+        profile_output: файл (.json або .csv), куди зберегти статистику фаз після завершення гри
+        speed: початковий множник швидкості з SPEED_MULTIPLIERS (None - без обмеження)
+        seed: зерно гри; зерно кожного рівня виводиться з нього (None - випадкове, друкується на старті)
+        record: шлях до файлу повтору; для кожного рівня створюється окремий файл з номером рівня
+        level_pack: шлях до пакета рівнів (python -m src.level_pack build ... --game-seeds)
+        planner_budget_ms: ліміт часу планувальника Пакмена на крок (None - жадібна евристика)
+        ai_budget_ms: бюджет часу ШІ на крок; перепланування привидів розносяться по кроках (None - без ліміту)
+        weighted_danger: небезпека для Пакмена в кроках гри з урахуванням швидкості привидів
+        """
         self.level_number = level_number
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.record = record
+        self.profiler = profiler if profiler is not None else FrameProfiler()
+        self.profile_output = profile_output
+        self.speed_index = self.SPEED_MULTIPLIERS.index(speed) if speed in self.SPEED_MULTIPLIERS else 0
+
+        # Фіксований крок симуляції: накопичений ігровий час (у кроках) та розклад кадрів
+        self.accumulator = 0.0
+        self.last_time = 0.0
+        self.next_frame_time = 0.0
+        self.last_render_time = 0.0
+        self.frames_rendered = 0
+        self.frames_dropped = 0
 
         # Ініціалізація Pygame
         pygame.init()
@@ -20,7 +54,7 @@ class Game:
         self.screen_width = 800
         self.screen_height = 600
         self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
-        pygame.display.set_caption("Pac-Man")
+        self.set_speed(self.speed_index)  # Заголовок вікна показує поточну швидкість
 
         # Завантаження асетів
         self.assets = load_assets()
@@ -37,28 +71,100 @@ class Game:
         # Ініціалізація стану гри
         self.state = 'start'  # Можливі стани: 'start', 'playing', 'game_over'
 
-        # Ініціалізація змінних, які будуть встановлені при запуску гри
-        self.maze = None
-        self.pacman = None
-        self.ghosts = []
+        # Headless-симуляція, що володіє лабіринтом, Пакменом та привидами
+        pack = None
+        if level_pack is not None:
+            try:
+                pack = LevelPack(level_pack)
+            except (OSError, ValueError) as e:
+                print(f"Не вдалося відкрити пакет рівнів {level_pack}: {e}")
+        self.simulation = Simulation(level_number, self.assets, profiler=self.profiler, level_pack=pack,
+                                     planner_budget_ms=planner_budget_ms, ai_budget_ms=ai_budget_ms,
+                                     weighted_danger=weighted_danger)
         self.scale = 1  # Масштаб лабіринту
         self.running = True
 
+        # Наступний рівень готується у фоновому потоці, поки грається поточний
+        self.level_executor = ThreadPoolExecutor(max_workers=1)
+        self.next_level = None  # (номер рівня, Future з підготовленою Simulation)
+
     def run(self):
         while self.running:
             if self.state == 'start':
                 self.show_start_screen()
             elif self.state == 'playing':
                 self.handle_events()
-                self.update()
-                self.draw()
-                self.clock.tick(60)  # Обмеження до 60 FPS
+                self.advance()
             elif self.state == 'game_over':
                 self.show_game_over_screen()
 
+        self.simulation.close_recorder()  # Повтор незавершеного рівня теж зберігається
+        self.level_executor.shutdown(wait=False, cancel_futures=True)
+        if self.profile_output:
+            self.profiler.dump(self.profile_output)
         pygame.quit()
         sys.exit()
 
+    @property
+    def speed(self):
+        return self.SPEED_MULTIPLIERS[self.speed_index]
+
+    def set_speed(self, index):
+        self.speed_index = index
+        self.accumulator = 0.0
+        label = f"{self.speed}x" if self.speed is not None else "без обмеження"
+        pygame.display.set_caption(f"Pac-Man ({label})")
+
+    def reset_timing(self):
+        now = time.perf_counter()
+        self.accumulator = 0.0
+        self.last_time = now
+        self.next_frame_time = now
+        self.last_render_time = now
+
+    def advance(self):
+        """
+        Одна ітерація ігрового циклу з фіксованим кроком симуляції: виконуються всі кроки,
+        що накопичились за реальний час (TICK_RATE * множник на секунду), а кадр відтворюється,
+        лише коли настав його час. Якщо симуляція відстає, кадр пропускається, щоб не гальмувати її.
+        """
+        frame_interval = 1 / self.FRAME_RATE
+        now = time.perf_counter()
+        multiplier = self.speed
+        if multiplier is None:
+            # Без обмеження: кроки виконуються, доки не настане час наступного кадру
+            while self.state == 'playing' and time.perf_counter() < self.next_frame_time:
+                self.update()
+        else:
+            ticks_per_second = self.TICK_RATE * multiplier
+            self.accumulator = min(self.accumulator + (now - self.last_time) * ticks_per_second,
+                                   self.MAX_BACKLOG * ticks_per_second)
+            # Не більше одного інтервалу кадру поспіль, щоб події клавіатури оброблялись вчасно
+            deadline = now + frame_interval
+            while self.accumulator >= 1 and self.state == 'playing':
+                self.update()
+                self.accumulator -= 1
+                if time.perf_counter() >= deadline:
+                    break
+        self.last_time = now
+
+        now = time.perf_counter()
+        if now >= self.next_frame_time:
+            behind = multiplier is not None and self.accumulator >= 1
+            if self.state == 'playing' and (not behind or now - self.last_render_time >= self.MAX_RENDER_INTERVAL):
+                self.draw()
+                self.frames_rendered += 1
+                self.last_render_time = now
+            else:
+                self.frames_dropped += 1
+            self.next_frame_time = max(self.next_frame_time + frame_interval, now)
+        elif multiplier is not None:
+            # Чекаємо до наступного кроку або кадру, що настане раніше
+            next_tick = self.last_time + (1 - self.accumulator) / (self.TICK_RATE * multiplier)
+            delay = min(next_tick, self.next_frame_time) - now
+            if delay > 0:
+                time.sleep(delay)
+
     def show_start_screen(self):
         self.screen.fill((0, 0, 0))  # Чорний фон
         font = pygame.font.SysFont(None, 48)
@@ -108,12 +214,13 @@ class Game:
             # Ініціалізація або скидання ігрових об'єктів для нового рівня
             self.state = 'playing'
 
-            # Генерація рівня
-            level_generator = LevelGenerator(self.level_number)
-            self.maze, ghost_speed, ghost_behaviour, number_of_ghosts = level_generator.generate_level()
-
-            # Забезпечуємо, що позиція привидів вільна
-            self.maze.grid[self.maze.ghost_start_position[1]][self.maze.ghost_start_position[0]] = 0
+            # Генерація рівня та розміщення сутностей відбувається в headless-симуляції
+            self.simulation.close_recorder()
+            if self.record:
+                self.simulation.recorder = ReplayWriter(self.replay_path(self.level_number))
+            self.simulation.install(self.take_prepared_level(self.level_number))
+            print(f"Рівень {self.level_number}, зерно гри {self.seed}")
+            self.prepare_next_level(self.level_number + 1)
 
             # Обмеження масштабу лабіринту
             maze_width = self.maze.width
@@ -121,93 +228,68 @@ class Game:
             scale_x = self.screen_width / (maze_width * self.TILE_SIZE)
             scale_y = self.screen_height / (maze_height * self.TILE_SIZE)
             self.scale = min(scale_x, scale_y, 1)
-
-            # Розміщення точок (їжі) в лабіринті
-            self.maze.place_dots()
-
-            # Створення Пакмена
-            self.pacman = PacMan(self.maze, self.assets['pacman'], self.level_number, self.ghosts)
-            self.maze.pacman = self.pacman  # Зв'язуємо Пакмена з лабіринтом для перевірки зайнятості
-
-            # Визначення кольорів привидів
-            ghost_colors = ['red', 'pink', 'blue', 'orange']
-
-            # Визначення стартових позицій привидів
-            base_x, base_y = self.maze.ghost_start_position
-            offset_positions = [
-                (base_x, base_y),
-                (base_x + 1, base_y),
-                (base_x, base_y + 1),
-                (base_x + 1, base_y + 1)
-            ]
-
-            # Створення привидів
-            self.ghosts = []
-            self.maze.ghosts = []  # Очищення списку привидів в лабіринті перед додаванням
-            for i in range(number_of_ghosts):
-                color = ghost_colors[i % len(ghost_colors)]
-                ghost_image_key = f'ghost_{color}'
-                if ghost_image_key not in self.assets:
-                    print(f"Відсутній асет для {ghost_image_key}, пропускаємо створення цього привида.")
-                    continue  # Пропустити створення, якщо асет відсутній
-
-                # Отримання унікальної позиції для кожного привида
-                if i < len(offset_positions):
-                    position = offset_positions[i]
-                else:
-                    # Якщо привидів більше, ніж визначено позицій, генеруємо випадкові
-                    position = self.get_random_ghost_position()
-
-                # Перевірка, що позиція не зайнята стіною та знаходиться в межах лабіринту
-                if self.maze.is_path(position) and not self.is_position_occupied(position):
-                    ghost = Ghost(self.maze, self.assets[ghost_image_key], ghost_speed, self.level_number, position)
-                    self.ghosts.append(ghost)
-                    self.maze.ghosts.append(ghost)
-                else:
-                    print(f"Недопустима або зайнята позиція для привида: {position}")
-                    # Спробувати знайти іншу позицію
-                    position = self.get_random_ghost_position()
-                    if self.maze.is_path(position) and not self.is_position_occupied(position):
-                        ghost = Ghost(self.maze, self.assets[ghost_image_key], ghost_speed, self.level_number, position)
-                        self.ghosts.append(ghost)
-                        self.maze.ghosts.append(ghost)
-                    else:
-                        print(f"Не вдалося розмістити привида на позиції: {position}")
+            self.maze.invalidate_background()  # Фон лабіринту перебудується під новий масштаб
+            self.reset_timing()
 
             print(f"Створено привидів: {len(self.ghosts)}")  # Відлагоджувальне повідомлення
 
-            # Призначення списку привидів Пакмену для обчислення відстаней
-            self.pacman.ghosts = self.ghosts
-
         except Exception as e:
             print(f"Помилка при запуску гри: {e}")
             self.running = False
 
-    def get_random_ghost_position(self):
-        # Генеруємо випадкову позицію для привида, уникаючи стартових позицій
-        attempts = 0
-        max_attempts = 100
-        while attempts < max_attempts:
-            x = random.randint(1, self.maze.width - 2)
-            y = random.randint(1, self.maze.height - 2)
-            if (x, y) != self.maze.start_position and (x, y) != self.maze.ghost_start_position and self.maze.is_path((x, y)):
-                return (x, y)
-            attempts += 1
-        return self.maze.ghost_start_position  # У крайньому випадку
-
-    def is_position_occupied(self, position):
-        # Перевіряємо, чи зайнята позиція іншим привидом або Пакменом
-        if self.pacman and self.pacman.position == position:
-            return True
-        for ghost in self.ghosts:
-            if ghost.position == position:
-                return True
-        return False
+    def prepare_next_level(self, level_number):
+        """
+        Запуск підготовки рівня level_number у фоновому потоці: генерація лабіринту, точок
+        і розміщення привидів не змінюють поточну гру, тож перехід на рівень буде миттєвим.
+        """
+        future = self.level_executor.submit(self.simulation.prepare, level_number,
+                                            derive_seed(self.seed, level_number))
+        self.next_level = (level_number, future)
+
+    def take_prepared_level(self, level_number):
+        """
+        Підготовлений рівень level_number: результат фонової підготовки (якщо вона ще триває -
+        очікування її завершення) або, якщо готувався інший рівень, синхронна генерація.
+        """
+        seed = derive_seed(self.seed, level_number)
+        if self.next_level is not None:
+            prepared_number, future = self.next_level
+            self.next_level = None
+            if prepared_number == level_number:
+                try:
+                    return future.result()
+                except Exception as e:
+                    print(f"Помилка фонової підготовки рівня {level_number}: {e}")
+            else:
+                future.cancel()
+        return self.simulation.prepare(level_number, seed)
+
+    def replay_path(self, level_number):
+        root, ext = os.path.splitext(self.record)
+        return f"{root}_level{level_number}{ext or '.pmr'}"
+
+    @property
+    def maze(self):
+        return self.simulation.maze
+
+    @property
+    def pacman(self):
+        return self.simulation.pacman
+
+    @property
+    def ghosts(self):
+        return self.simulation.ghosts
 
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                # F3 - показати/сховати таблицю часу фаз
+                self.profiler.show_overlay = not self.profiler.show_overlay
+            elif event.type == pygame.KEYDOWN and pygame.K_1 <= event.key < pygame.K_1 + len(self.SPEED_MULTIPLIERS):
+                # 1-4 - швидкість гри 1x / 4x / 16x / без обмеження
+                self.set_speed(event.key - pygame.K_1)
             elif event.type == pygame.KEYDOWN:
                 try:
                     self.pacman.handle_key_event(event)  # Припускається, що PacMan обробляє події клавіатури
@@ -216,46 +298,43 @@ class Game:
 
     def update(self):
         try:
-            # Оновлення Пакмена
-            self.pacman.update()
-
-            # Оновлення привидів
-            for ghost in self.ghosts:
-                ghost.update(self.pacman)
-
-            # Перевірка зіткнень між Пакменом та привидами
-            for ghost in self.ghosts:
-                if ghost.position == self.pacman.position:
-                    self.state = 'game_over'
-                    break
-
-            # Перевірка, чи зібрані всі точки (їжа)
-            if not self.maze.dots:
-                self.state = 'game_over'  # Або перехід на наступний рівень автоматично
+            # Крок симуляції: рух Пакмена і привидів, зіткнення, перевірка зібраних точок
+            self.simulation.step()
+            if self.simulation.is_over:
+                self.state = 'game_over'
         except Exception as e:
             print(f"Помилка при оновленні гри: {e}")
             self.state = 'game_over'
 
     def draw(self):
         try:
+            profiler = self.profiler
+
             # Очищення екрану
             self.screen.fill((0, 0, 0))  # Чорний фон
 
             # Відтворення лабіринту з урахуванням масштабу
-            self.maze.draw(self.screen, self.scale)
+            with profiler.phase('draw.maze'):
+                self.maze.draw(self.screen, self.scale, self.assets.scaled('maze_tiles', self.TILE_SIZE * self.scale))
 
             # Відтворення точок (їжі)
-            self.draw_dots()
+            with profiler.phase('draw.dots'):
+                self.draw_dots()
 
             # Відтворення Пакмена
-            self.pacman.draw(self.screen, self.scale)
+            with profiler.phase('draw.pacman'):
+                self.pacman.draw(self.screen, self.scale, self.assets)
 
             # Відтворення привидів
-            for ghost in self.ghosts:
-                ghost.draw(self.screen, self.scale)
+            with profiler.phase('draw.ghosts'):
+                for ghost in self.ghosts:
+                    ghost.draw(self.screen, self.scale, self.assets)
+
+            profiler.draw_overlay(self.screen)
 
             # Оновлення дисплею
-            pygame.display.flip()
+            with profiler.phase('draw.flip'):
+                pygame.display.flip()
         except Exception as e:
             print(f"Помилка при відтворенні гри: {e}")
             self.state = 'game_over'
@@ -1,87 +1,151 @@
 # src/ghost.py
 
+from collections import deque
 import pygame
 from ai.heuristics import GhostHeuristic
 from pathfinding.a_star import a_star_search
 from pathfinding.bfs import bfs_search
 from pathfinding.dfs import dfs_search
-import random
+from pathfinding.stats import SearchStats
+from src.entities import EntityView
 
 
-class Ghost:
+class Ghost(EntityView):
+    __slots__ = ('maze', 'image', 'image_key', 'speed', 'level_number', 'move_counter', 'index', 'rng',
+                 'planner', 'heuristic', 'planned_path')
+
     def __init__(self, maze, image, speed, level_number, position):
+        # Позиція та історія позицій зберігаються в maze.entities
+        super().__init__(maze.entities, position, is_ghost=True)
         self.maze = maze
         self.image = image
-        self.position = position  # Позиція в сітці лабіринту
+        self.image_key = None  # Ім'я зображення в AssetManager (для кешованого масштабування)
         self.speed = speed
         self.level_number = level_number
         self.move_counter = 0
-        self.previous_positions = []  # Історія останніх позицій
+        self.index = 0  # Номер привида в рівні (позиція в maze.ghosts, назви фаз профілювання)
+        self.rng = maze.rng  # Джерело випадковості рівня (для відтворюваних ігор)
+        self.planner = None  # IncrementalPlanner, що зберігає дерево пошуку між ходами (None - пошук щоразу заново)
         self.heuristic = GhostHeuristic(level_number)
+        self.planned_path = None  # Решта шляху останнього плану (deque позицій) для ходів без перепланування
 
     def update(self, pacman):
-        self.move_counter += self.speed
-        if self.move_counter >= 1:
-            self.move_counter = 0
+        if self.advance_counter():
             try:
-                # Використовуємо евристику для отримання цільової позиції
-                target = self.heuristic.get_target(self.maze, self, pacman)
-                algorithm_choice = random.randint(1, 3)
-                if algorithm_choice == 1:
-                    path = dfs_search(self.maze.grid, self.position, target)
-                    print("Алгоритм: DFS")
-                elif algorithm_choice == 2:
-                    path = bfs_search(self.maze.grid, self.position, target)
-                    print("Алгоритм: BFS")
-                else:
-                    path = a_star_search(self.maze.grid, self.position, target)
-                    print("Алгоритм: A*")
-
-                if path and len(path) > 1:
-                    next_position = path[1]
-                    # Перевіряємо, чи не зациклився привид на двох клітинках
-                    if next_position not in self.previous_positions[-2:]:  # Уникаємо останніх двох позицій
-                        if not self.is_occupied(next_position):
-                            self.position = next_position
-                            self.previous_positions.append(self.position)
-                            if len(self.previous_positions) > 5:
-                                self.previous_positions.pop(0)
-                        else:
-                            # Якщо позиція зайнята, рухаємось випадково
-                            self.random_move()
-                    else:
-                        # Якщо привид зациклився, рухаємось випадково
-                        self.random_move()
-                else:
-                    # Якщо немає шляху, рухаємось випадково
-                    self.random_move()
+                self.take_turn(self.plan_next_position(pacman))
             except Exception as e:
                 print(f"Помилка при оновленні привида: {e}")
                 self.random_move()
 
+    def advance_counter(self):
+        """
+        Накопичення швидкості: True, якщо на цьому кроці привид ходить (лічильник скидається).
+        """
+        self.move_counter += self.speed
+        if self.move_counter >= 1:
+            self.move_counter = 0
+            return True
+        return False
+
+    def plan_next_position(self, pacman):
+        """
+        Новий план: ціль за евристикою та наступна клітинка шляху до неї (або None).
+        Решта знайденого шляху зберігається в planned_path для ходів без перепланування.
+        """
+        profiler = self.maze.profiler
+        # Використовуємо евристику для отримання цільової позиції
+        with profiler.phase(f'ghost{self.index}.heuristic'):
+            target = self.heuristic.get_target(self.maze, self, pacman)
+        with profiler.phase(f'ghost{self.index}.search'):
+            return self.find_next_position(target)
+
+    def follow_planned_path(self):
+        """
+        Наступна клітинка з попереднього плану або None, якщо план вичерпано
+        чи привид зійшов із нього (наприклад, після випадкового кроку).
+        """
+        path = self.planned_path
+        if path:
+            next_position = path.popleft()
+            x, y = self.position
+            if abs(next_position[0] - x) + abs(next_position[1] - y) == 1:
+                return next_position
+        self.planned_path = None
+        return None
+
+    def take_turn(self, next_position):
+        """
+        Хід до next_position за правилами привида: не повертатися на дві останні позиції
+        і не ставати на зайняту клітинку, інакше (або без next_position) - випадковий крок.
+        """
+        if next_position is not None and not self.recently_visited(next_position, 2) \
+                and not self.is_occupied(next_position):
+            self.move_to(next_position)
+            return
+        # Немає шляху, привид зациклився на двох останніх позиціях або клітинка зайнята - рухаємось випадково
+        self.planned_path = None
+        self.random_move()
+
+    def find_next_position(self, target):
+        # Якщо для рівня побудована таблиця відстаней, наступний крок - це звернення до масиву
+        self.planned_path = None
+        if self.maze.distance_table is not None:
+            return self.maze.distance_table.next_step(self.position, target)
+        # Спільна карта відстаней: один BFS на ціль замість окремого пошуку для кожного привида
+        if self.maze.flow_fields is not None:
+            return self.maze.flow_fields.next_step(self.position, target)
+
+        search_grid = self.maze.search_grid()
+        # Статистика пошуку збирається лише тоді, коли для рівня задано агрегатор
+        stats = SearchStats() if self.maze.search_stats is not None else None
+        if self.planner is not None:
+            # Дерево пошуку від привида перевикористовується: рух цілі та крок привида його лише доповнюють
+            path = self.planner.find_path(self.position, target, stats)
+        else:
+            algorithm_choice = self.rng.randint(1, 3)
+            if algorithm_choice == 1:
+                path = dfs_search(search_grid, self.position, target, stats)
+                self.maze.profiler.log("Алгоритм: DFS")
+            elif algorithm_choice == 2:
+                path = bfs_search(search_grid, self.position, target, stats)
+                self.maze.profiler.log("Алгоритм: BFS")
+            else:
+                path = a_star_search(search_grid, self.position, target, stats)
+                self.maze.profiler.log("Алгоритм: A*")
+        if stats is not None:
+            self.maze.search_stats.add(stats)
+
+        if path and len(path) > 1:
+            self.planned_path = deque(path[2:])
+            return path[1]
+        self.planned_path = None
+        return None
+
     def random_move(self):
         # Рухаємося у випадковому доступному напрямку
         directions = [(0, -1), (0, 1), (-1, 0), (1, 0)]
-        random.shuffle(directions)
+        self.rng.shuffle(directions)
         for dx, dy in directions:
             new_position = (self.position[0] + dx, self.position[1] + dy)
             if self.maze.is_path(new_position) and not self.is_occupied(new_position):
-                self.position = new_position
-                self.previous_positions.append(self.position)
-                if len(self.previous_positions) > 5:
-                    self.previous_positions.pop(0)
+                self.move_to(new_position)
                 break  # Виходимо з циклу після успішного руху
 
     def is_occupied(self, position):
-        # Перевіряємо, чи зайнята позиція іншим привидом
-        for ghost in self.maze.ghosts:
-            if ghost.position == position and ghost != self:
-                return True
+        # Перевіряємо, чи зайнята позиція іншим привидом (лічильник привидів у клітинці, без себе)
+        store = self.store
+        x, y = position
+        if 0 <= x < store.width and 0 <= y < store.height:
+            return store.ghost_counts[x * store.height + y] > (position == self.position)
         return False
 
-    def draw(self, screen, scale=1):
+    def draw(self, screen, scale=1, assets=None):
         tile_size = 30 * scale
         x_pixel = self.position[0] * tile_size
         y_pixel = self.position[1] * tile_size
-        scaled_image = pygame.transform.scale(self.image, (int(tile_size), int(tile_size)))
+        if assets is not None and self.image_key is not None:
+            # Масштабована копія з кешу AssetManager замість нового масштабування щокадру
+            scaled_image = assets.scaled(self.image_key, tile_size)
+        else:
+            scaled_image = pygame.transform.scale(self.image, (int(tile_size), int(tile_size)))
         screen.blit(scaled_image, (x_pixel, y_pixel))
@@ -4,8 +4,10 @@ from src.maze import Maze
 
 
 class LevelGenerator:
-    def __init__(self, level_number):
+    def __init__(self, level_number, rng=None, maze_generator=None):
         self.level_number = level_number
+        self.rng = rng  # Генератор випадкових чисел для відтворюваної генерації (None - глобальний random)
+        self.maze_generator = maze_generator  # 'backtracker' або 'vectorized' (None - з конфігурації рівня)
         self.config = self.load_config()
 
     def load_config(self):
@@ -39,9 +41,20 @@ class LevelGenerator:
         level_params = self.get_level_params()
         width, height = level_params.get('maze_size', [15, 15])
         wall_density = level_params.get('wall_density', 0.3)
-        maze = Maze(width, height, wall_density)
-        maze.generate_maze()
+        maze = Maze(width, height, wall_density, self.rng)
+        maze_generator = self.maze_generator or level_params.get('maze_generator', 'backtracker')
+        if maze_generator == 'vectorized':
+            maze.generate_maze_vectorized(self.make_np_rng())
+        else:
+            maze.generate_maze()
         ghost_speed = level_params.get('ghost_speed', 0.5)
         ghost_behaviour = level_params.get('ghost_behaviour', 'simple_chase')
         number_of_ghosts = level_params.get('number_of_ghosts', 4)
         return maze, ghost_speed, ghost_behaviour, number_of_ghosts
+
+    def make_np_rng(self):
+        # Генератор NumPy виводиться з генератора рівня, тож одне зерно відтворює весь рівень
+        import numpy as np
+        if self.rng is None:
+            return np.random.default_rng()
+        return np.random.default_rng(self.rng.getrandbits(64))
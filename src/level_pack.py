@@ -0,0 +1,356 @@
+# src/level_pack.py
+
+import argparse
+import mmap
+import struct
+import time
+
+import numpy as np
+
+from pathfinding.distance_table import DistanceTable
+from pathfinding.maze_graph import MazeGraph
+
+# Формат пакета рівнів (усі числа little-endian):
+#   заголовок  HEADER: magic, версія
+#   записи     для кожного (рівень, зерно, генератор) - ENTRY, поведінка привидів (u8 довжина + utf-8),
+#              позиції привидів, стан генератора випадкових чисел після старту рівня
+#              та вирівняні масиви: сітка і карта точок (по біту на клітинку), CSR-масиви графа,
+#              за наявності - таблиця відстаней (dist u16 та step u8, N x N)
+#   індекс     u32 кількість + INDEX_RECORD для кожного запису
+#   кінець     FOOTER: зміщення індексу, magic
+# Масиви вирівняні на ALIGNMENT байтів, тож читаються з mmap без копіювання (np.frombuffer).
+
+MAGIC = b'PMLP'
+END_MAGIC = b'PMLE'
+VERSION = 1
+HEADER = struct.Struct('<4sB')
+ENTRY = struct.Struct('<HHddHHHHHHBII')
+GHOST = struct.Struct('<HHB')
+RNG_STATE = struct.Struct('<625IBd')
+ARRAY = struct.Struct('<Q')
+INDEX_RECORD = struct.Struct('<HqBQ')
+FOOTER = struct.Struct('<Q4s')
+ALIGNMENT = 64
+
+GENERATOR_CODES = {None: 0, 'backtracker': 1, 'vectorized': 2}
+DEFAULT_MAX_TABLE_MB = 1024  # Більші таблиці відстаней не зберігаються в пакет
+
+
+class PackedLevel:
+    """
+    Рівень, прочитаний з пакета: масиви - це перегляди відображеного у пам'ять файлу.
+    """
+
+    def __init__(self, level_number, seed, maze_generator):
+        self.level_number = level_number
+        self.seed = seed
+        self.maze_generator = maze_generator
+        self.width = 0
+        self.height = 0
+        self.wall_density = 0.0
+        self.ghost_speed = 0.0
+        self.ghost_behaviour = None
+        self.number_of_ghosts = 0
+        self.dots_total = 0
+        self.start_position = None
+        self.ghost_start_position = None
+        self.ghosts = []  # (x, y, індекс кольору) для кожного розміщеного привида
+        self.rng_state = None  # Стан random.Random після старту рівня
+        self.grid = None  # np.uint8 (height, width): 1 - стіна
+        self.dots = None  # np.uint8: 1 - точка, у порядку id клітинок MazeGraph (x * height + y)
+        self.offsets = None
+        self.targets = None
+        self.dist = None  # Таблиця відстаней або None, якщо її не зберігали
+        self.step = None
+
+    @property
+    def has_distance_table(self):
+        return self.dist is not None
+
+    def grid_rows(self):
+        # Сітка у вигляді 2D списку, як Maze.grid
+        return self.grid.tolist()
+
+    def dot_positions(self):
+        # Точки в тому ж порядку, що й у Maze.place_dots (рядок за рядком)
+        ys, xs = np.nonzero(self.dots.reshape(self.width, self.height).T)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def build_graph(self):
+        cells = self.grid.T.tobytes()  # Порядок id клітинок: x * height + y
+        return MazeGraph.from_arrays(self.width, self.height, cells,
+                                     self.offsets.tobytes(), self.targets.tobytes())
+
+    def build_distance_table(self):
+        if self.dist is None:
+            return None
+        return DistanceTable.from_arrays(self.grid, self.dist, self.step)
+
+
+def pad(f):
+    padding = -f.tell() % ALIGNMENT
+    if padding:
+        f.write(bytes(padding))
+
+
+def write_array(f, data):
+    data = np.ascontiguousarray(data)
+    f.write(ARRAY.pack(data.nbytes))
+    pad(f)
+    f.write(data.tobytes())
+
+
+def read_array(buffer, offset, dtype):
+    """
+    Масив, що починається з offset (довжина, вирівнювання, дані). Повертає (масив, зміщення після нього).
+    """
+    nbytes, = ARRAY.unpack_from(buffer, offset)
+    offset += ARRAY.size
+    offset += -offset % ALIGNMENT
+    array = np.frombuffer(buffer, dtype=dtype, count=nbytes // np.dtype(dtype).itemsize, offset=offset)
+    return array, offset + nbytes
+
+
+class LevelPackWriter:
+    """
+    Запис пакета рівнів. Кожен рівень знімається з уже запущеної Simulation, тож завантажена
+    з пакета гра продовжується так само, як і щойно згенерована з того ж зерна.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION))
+        self.index = []
+
+    def add(self, simulation, distance_table=None):
+        """
+        simulation: Simulation після start(seed=...) (до першого кроку)
+        distance_table: повна DistanceTable для цього лабіринту або None
+        """
+        if simulation.seed is None:
+            raise ValueError("До пакета можна додати лише рівень, запущений з відомим зерном")
+        maze = simulation.maze
+        f = self.file
+        pad(f)
+        self.index.append((simulation.level_number, simulation.seed,
+                           GENERATOR_CODES[simulation.maze_generator], f.tell()))
+
+        graph = maze.graph
+        f.write(ENTRY.pack(maze.width, maze.height, maze.wall_density, simulation.ghost_speed,
+                           simulation.number_of_ghosts, *maze.start_position, *maze.ghost_start_position,
+                           len(simulation.ghosts), distance_table is not None, len(graph.targets),
+                           simulation.dots_total))
+        behaviour = (simulation.ghost_behaviour or '').encode('utf-8')
+        f.write(struct.pack('<B', len(behaviour)) + behaviour)
+        colors = simulation.GHOST_COLORS
+        for ghost in simulation.ghosts:
+            color = ghost.image_key[len('ghost_'):]
+            f.write(GHOST.pack(*ghost.position, colors.index(color)))
+        _, state, gauss_next = simulation.rng.getstate()
+        f.write(RNG_STATE.pack(*state, gauss_next is not None, gauss_next or 0.0))
+
+        write_array(f, np.packbits(np.asarray(maze.grid, dtype=np.uint8)))
+        write_array(f, np.packbits(np.frombuffer(bytes(maze.dots.bitmap), dtype=np.uint8)))
+        write_array(f, np.frombuffer(graph.offsets, dtype=np.int32))
+        write_array(f, np.frombuffer(graph.targets, dtype=np.int32))
+        if distance_table is not None:
+            write_array(f, distance_table.dist)
+            write_array(f, distance_table.step)
+
+    def close(self):
+        f = self.file
+        pad(f)
+        index_offset = f.tell()
+        f.write(struct.pack('<I', len(self.index)))
+        for record in self.index:
+            f.write(INDEX_RECORD.pack(*record))
+        f.write(FOOTER.pack(index_offset, END_MAGIC))
+        f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+class LevelPack:
+    """
+    Пакет рівнів, відображений у пам'ять: відкриття читає лише індекс, а get() розбирає
+    заголовок запису та повертає перегляди масивів без копіювання і без генерації лабіринту.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = HEADER.unpack_from(self.buffer, 0)
+        index_offset, end_magic = FOOTER.unpack_from(self.buffer, len(self.buffer) - FOOTER.size)
+        if magic != MAGIC or version != VERSION or end_magic != END_MAGIC:
+            raise ValueError(f"{path} не є пакетом рівнів підтримуваної версії")
+        count, = struct.unpack_from('<I', self.buffer, index_offset)
+        self.index = {}  # (рівень, зерно, код генератора) -> зміщення запису
+        offset = index_offset + 4
+        for _ in range(count):
+            level_number, seed, generator, entry_offset = INDEX_RECORD.unpack_from(self.buffer, offset)
+            self.index[(level_number, seed, generator)] = entry_offset
+            offset += INDEX_RECORD.size
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        level_number, seed, maze_generator = key
+        return (level_number, seed, GENERATOR_CODES.get(maze_generator)) in self.index
+
+    def get(self, level_number, seed, maze_generator=None):
+        """
+        Рівень для (level_number, seed, maze_generator) або None, якщо його немає в пакеті.
+        """
+        if seed is None:
+            return None
+        offset = self.index.get((level_number, seed, GENERATOR_CODES.get(maze_generator)))
+        if offset is None:
+            return None
+        buffer = self.buffer
+        level = PackedLevel(level_number, seed, maze_generator)
+        (level.width, level.height, level.wall_density, level.ghost_speed, level.number_of_ghosts,
+         start_x, start_y, ghost_x, ghost_y, ghost_count, has_table, _, level.dots_total) = \
+            ENTRY.unpack_from(buffer, offset)
+        level.start_position = (start_x, start_y)
+        level.ghost_start_position = (ghost_x, ghost_y)
+        offset += ENTRY.size
+
+        length = buffer[offset]
+        level.ghost_behaviour = bytes(buffer[offset + 1:offset + 1 + length]).decode('utf-8') or None
+        offset += 1 + length
+        for _ in range(ghost_count):
+            level.ghosts.append(GHOST.unpack_from(buffer, offset))
+            offset += GHOST.size
+        *state, has_gauss, gauss_next = RNG_STATE.unpack_from(buffer, offset)
+        level.rng_state = (3, tuple(state), gauss_next if has_gauss else None)
+        offset += RNG_STATE.size
+
+        cells = level.width * level.height
+        grid, offset = read_array(buffer, offset, np.uint8)
+        level.grid = np.unpackbits(grid, count=cells).reshape(level.height, level.width)
+        dots, offset = read_array(buffer, offset, np.uint8)
+        level.dots = np.unpackbits(dots, count=cells)
+        level.offsets, offset = read_array(buffer, offset, np.int32)
+        level.targets, offset = read_array(buffer, offset, np.int32)
+        if has_table:
+            dist, offset = read_array(buffer, offset, np.uint16)
+            step, offset = read_array(buffer, offset, np.uint8)
+            size = int(np.count_nonzero(level.grid == 0))
+            level.dist = dist.reshape(size, size)
+            level.step = step.reshape(size, size)
+        return level
+
+    def close(self):
+        # Масиви, отримані через get(), посилаються на відображення, тож закривати його
+        # можна лише тоді, коли вони більше не використовуються
+        try:
+            self.buffer.close()
+        except BufferError as e:
+            print(f"Пакет рівнів {self.path} ще використовується: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def pack_keys(args):
+    """
+    Пари (рівень, зерно) для побудови: явні зерна, зерна рівнів ігор (як у Game)
+    та зерна епізодів турніру (як у src.tournament).
+    """
+    from src.simulation import derive_seed
+    from src.tournament import episode_seed
+    keys = []
+    for level_number in args.levels:
+        keys.extend((level_number, seed) for seed in args.seeds)
+        keys.extend((level_number, derive_seed(seed, level_number)) for seed in args.game_seeds)
+        if args.tournament_seed is not None:
+            keys.extend((level_number, episode_seed(args.tournament_seed, level_number, episode))
+                        for episode in range(args.episodes))
+    return list(dict.fromkeys(keys))
+
+
+def build(args):
+    from src.simulation import Simulation
+    keys = pack_keys(args)
+    if not keys:
+        print("Не задано жодного зерна (--seeds, --game-seeds або --tournament-seed)")
+        return
+    max_table_bytes = args.max_table_mb * 1024 * 1024
+    started = time.perf_counter()
+    with LevelPackWriter(args.path) as writer:
+        for level_number, seed in keys:
+            simulation = Simulation(level_number, maze_generator=args.maze_generator)
+            simulation.start(seed=seed)
+            distance_table = None
+            if args.distance_tables:
+                # Таблиця будується окремо, щоб не змінювати стан генератора рівня
+                distance_table = DistanceTable(simulation.maze.grid, max_table_bytes)
+                if not distance_table.is_full:
+                    print(f"Рівень {level_number}: таблиця відстаней перевищує {args.max_table_mb} МБ, пропускаємо")
+                    distance_table = None
+            writer.add(simulation, distance_table)
+            print(f"Рівень {level_number}, зерно {seed}: {simulation.maze.width}x{simulation.maze.height}"
+                  f"{', таблиця відстаней' if distance_table is not None else ''}")
+    print(f"Збережено {len(keys)} рівнів у {args.path} за {time.perf_counter() - started:.1f} с")
+
+
+def info(args):
+    with LevelPack(args.path) as pack:
+        print(f"{args.path}: {len(pack)} рівнів")
+        generators = {code: name for name, code in GENERATOR_CODES.items()}
+        for level_number, seed, generator in sorted(pack.index):
+            level = pack.get(level_number, seed, generators[generator])
+            print(f"  рівень {level_number}, зерно {seed}, генератор {generators[generator] or 'конфігурація'}: "
+                  f"{level.width}x{level.height}, привидів {len(level.ghosts)}, точок {level.dots_total}"
+                  f"{', таблиця відстаней' if level.has_distance_table else ''}")
+            del level
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакети попередньо згенерованих рівнів Pac-Man")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help="Згенерувати рівні та зберегти їх у пакет")
+    build_parser.add_argument('path')
+    build_parser.add_argument('--levels', type=int, nargs='+', required=True, help="Номери рівнів")
+    build_parser.add_argument('--seeds', type=int, nargs='*', default=[], help="Зерна рівнів (Simulation.start)")
+    build_parser.add_argument('--game-seeds', type=int, nargs='*', default=[],
+                              help="Зерна гри (python -m src.main --seed): зерно рівня виводиться з них")
+    build_parser.add_argument('--tournament-seed', type=int, default=None,
+                              help="Базове зерно турніру: додаються зерна епізодів 0..episodes-1")
+    build_parser.add_argument('--episodes', type=int, default=100, help="Кількість епізодів турніру на рівень")
+    build_parser.add_argument('--maze-generator', choices=['backtracker', 'vectorized'], default=None,
+                              help="Генератор лабіринту (за замовчуванням - з конфігурації рівня)")
+    build_parser.add_argument('--distance-tables', action='store_true',
+                              help="Зберігати повні таблиці відстаней (читаються через mmap без побудови)")
+    build_parser.add_argument('--max-table-mb', type=int, default=DEFAULT_MAX_TABLE_MB,
+                              help="Найбільший розмір таблиці відстаней одного рівня")
+    info_parser = subparsers.add_parser('info', help="Вміст пакета")
+    info_parser.add_argument('path')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        if args.tournament_seed is not None:
+            from src.tournament import check_episode_seeds
+            try:
+                check_episode_seeds(args.tournament_seed, args.levels, args.episodes)
+            except ValueError as e:
+                build_parser.error(str(e))
+        build(args)
+    else:
+        info(args)
+
+
+if __name__ == "__main__":
+    main()
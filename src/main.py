@@ -1,11 +1,36 @@
 # src/main.py
 
+import argparse
 from src.game import Game
+from src.profiler import FrameProfiler
 
 
 def main():
-    level_number = 1
-    game = Game(level_number)
+    parser = argparse.ArgumentParser(description="Pac-Man")
+    parser.add_argument('--level', type=int, default=1, help="Початковий рівень")
+    parser.add_argument('--profile', action='store_true', help="Вимірювати час фаз кадру (F3 - таблиця на екрані)")
+    parser.add_argument('--profile-output', default=None, help="Файл (.json або .csv) для статистики фаз")
+    parser.add_argument('--speed', type=int, choices=[1, 4, 16, 0], default=1,
+                        help="Початкова швидкість гри (0 - без обмеження); під час гри - клавіші 1-4")
+    parser.add_argument('--seed', type=int, default=None, help="Зерно гри (за замовчуванням - випадкове)")
+    parser.add_argument('--record', default=None,
+                        help="Записувати повтори рівнів (файли <шлях>_level<N>.pmr; перегляд: python -m src.replay play)")
+    parser.add_argument('--level-pack', default=None,
+                        help="Пакет попередньо згенерованих рівнів (python -m src.level_pack build ... --game-seeds)")
+    parser.add_argument('--planner-budget-ms', type=float, default=None,
+                        help="Пакмен обирає хід пошуком наперед з цим лімітом часу на крок (мс)")
+    parser.add_argument('--ai-budget-ms', type=float, default=None,
+                        help="Бюджет часу ШІ на крок (мс): перепланування привидів розносяться по кроках")
+    parser.add_argument('--weighted-danger', action='store_true',
+                        help="Пакмен оцінює небезпеку в кроках гри з урахуванням швидкості привидів")
+    parser.add_argument('--log-moves', action='store_true', help="Друкувати обраний алгоритм пошуку для кожного ходу")
+    args = parser.parse_args()
+
+    level_number = args.level
+    profiler = FrameProfiler(enabled=args.profile or args.profile_output is not None,
+                             log_moves=args.log_moves, echo=args.log_moves)
+    game = Game(level_number, profiler, args.profile_output, args.speed or None, args.seed, args.record,
+                args.level_pack, args.planner_budget_ms, args.ai_budget_ms, args.weighted_danger)
     game.run()
 
 
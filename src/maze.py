@@ -1,23 +1,36 @@
 import pygame
 import random
 import os
+from src.dot_store import DotStore
+from src.entities import EntityStore
+from src.profiler import FrameProfiler
 
 
 class Maze:
-    def __init__(self, width, height, wall_density=0.3):
+    def __init__(self, width, height, wall_density=0.3, rng=None):
         """
         width, height: розміри лабіринту (мають бути непарними числами)
         wall_density: щільність стін (від 0 до 1), визначає ймовірність появи стіни
+        rng: генератор випадкових чисел (random.Random); за замовчуванням - глобальний random
         """
         # Переконуємось, що розміри лабіринту непарні
         self.width = width if width % 2 != 0 else width + 1
         self.height = height if height % 2 != 0 else height + 1
         self.wall_density = wall_density
+        self.rng = rng if rng is not None else random  # Спільне джерело випадковості для рівня
         self.grid = [[1 for _ in range(self.width)] for _ in range(self.height)]  # 1 - стіна, 0 - шлях
         self.start_position = (1, 1)  # Стартова позиція Пакмена
         self.ghost_start_position = (self.width - 2, self.height - 2)  # Стартова позиція привидів
-        self.dots = []  # Список позицій точок (їжі)
+        self.dots = DotStore(self.width, self.height)  # Позиції точок (їжі)
         self.ghosts = []  # Список привидів
+        self.entities = EntityStore(self.width, self.height)  # Позиції та зайнятість клітинок сутностями
+        self.profiler = FrameProfiler()  # Вимірювання фаз та журнал ходів (за замовчуванням вимкнені)
+        self.search_stats = None  # Необов'язковий SearchStatsAggregator для статистики пошуків
+        self.background = None  # Кешована поверхня зі стінами (див. draw)
+        self.background_scale = None
+        self.graph = None  # Компактний граф для пошуку шляху (див. build_graph)
+        self.distance_table = None  # Необов'язкова таблиця відстаней (див. build_distance_table)
+        self.flow_fields = None  # Необов'язкові спільні карти відстаней для привидів (див. build_flow_fields)
 
     def generate_maze(self):
         """
@@ -35,7 +48,7 @@ class Maze:
 
             # Можливі напрямки: вгору, вниз, вліво, вправо
             directions = [(-2, 0), (2, 0), (0, -2), (0, 2)]
-            random.shuffle(directions)  # Перемішуємо напрямки для випадковості
+            self.rng.shuffle(directions)  # Перемішуємо напрямки для випадковості
 
             for dx, dy in directions:
                 nx, ny = x + dx, y + dy
@@ -45,7 +58,7 @@ class Maze:
 
             if neighbors:
                 # Обираємо випадкового сусіда
-                next_cell = random.choice(neighbors)
+                next_cell = self.rng.choice(neighbors)
                 nx, ny = next_cell
 
                 # Видаляємо стіну між поточною та сусідньою клітинкою
@@ -81,42 +94,134 @@ class Maze:
                     if (self.grid[y][x - 1] == 0 and self.grid[y][x + 1] == 0) or \
                             (self.grid[y - 1][x] == 0 and self.grid[y + 1][x] == 0):
                         # З ймовірністю wall_density видаляємо стіну
-                        if random.random() < self.wall_density:
+                        if self.rng.random() < self.wall_density:
                             self.grid[y][x] = 0
 
+    def generate_maze_vectorized(self, np_rng=None):
+        """
+        Генерація лабіринту пакетними операціями NumPy для дуже великих лабіринтів.
+        Остов будується алгоритмом Sidewinder: у кожному рядку клітинки об'єднуються в
+        горизонтальні відрізки випадкової довжини, і з кожного відрізка прорізається один
+        прохід угору. Усі рядки обробляються одночасно.
+        np_rng: numpy.random.Generator; за замовчуванням - новий генератор з випадковим зерном
+        """
+        import numpy as np
+        if np_rng is None:
+            np_rng = np.random.default_rng()
+
+        rows = (self.height - 1) // 2
+        cols = (self.width - 1) // 2
+        grid = np.ones((self.height, self.width), dtype=np.uint8)
+        grid[1:self.height - 1:2, 1:self.width - 1:2] = 0  # Клітинки на непарних координатах
+
+        # Верхній рядок - суцільний коридор
+        grid[1, 2:self.width - 2:2] = 0
+
+        if rows > 1:
+            # Для решти рядків: закривати відрізок після клітинки чи продовжувати його на схід
+            close = np_rng.random((rows - 1, cols)) < 0.5
+            close[:, -1] = True
+            east_rows, east_cols = np.nonzero(~close)
+            grid[2 * east_rows + 3, 2 * east_cols + 2] = 0
+
+            # Початок відрізка для кожної клітинки: перша клітинка рядка або наступна після закритої
+            column = np.arange(cols)
+            is_start = np.zeros_like(close)
+            is_start[:, 0] = True
+            is_start[:, 1:] = close[:, :-1]
+            run_start = np.maximum.accumulate(np.where(is_start, column, 0), axis=1)
+
+            # З кожного закритого відрізка прорізаємо прохід угору з випадкової клітинки
+            end_rows, end_cols = np.nonzero(close)
+            starts = run_start[end_rows, end_cols]
+            lengths = end_cols - starts + 1
+            chosen = starts + (np_rng.random(len(starts)) * lengths).astype(np.int64)
+            grid[2 * end_rows + 2, 2 * chosen + 1] = 0
+
+        # Забезпечуємо, що позиції Пакмена та привидів вільні
+        grid[self.start_position[1], self.start_position[0]] = 0
+        grid[self.ghost_start_position[1], self.ghost_start_position[0]] = 0
+
+        self.add_loops_vectorized(grid, np_rng)
+        self.grid = grid.tolist()
+
+    def add_loops_vectorized(self, grid, np_rng):
+        """
+        Пакетний аналог add_loops: стіни між двома проходами видаляються з ймовірністю wall_density.
+        На відміну від послідовного варіанту, умова перевіряється для всіх стін за початковим
+        станом сітки (стіна, видалена в цьому ж проході, не створює нових кандидатів).
+        """
+        import numpy as np
+        passage = grid == 0
+        inner = grid[1:-1, 1:-1]
+        between_horizontal = passage[1:-1, :-2] & passage[1:-1, 2:]
+        between_vertical = passage[:-2, 1:-1] & passage[2:, 1:-1]
+
+        # Пропускаємо клітинки, розташовані на перехрестях шляхів (обидві координати непарні)
+        ys, xs = np.indices(inner.shape)
+        crossing = (xs % 2 == 0) & (ys % 2 == 0)
+
+        candidates = (inner == 1) & ~crossing & (between_horizontal | between_vertical)
+        remove = candidates & (np_rng.random(inner.shape) < self.wall_density)
+        inner[remove] = 0
+
     def place_dots(self):
         """
         Розміщення точок (їжі) на всіх прохідних клітинках, крім стартових позицій.
         """
-        self.dots = []
+        self.dots = DotStore(self.width, self.height)
         for y in range(1, self.height - 1):
             for x in range(1, self.width - 1):
                 if self.grid[y][x] == 0 and (x, y) != self.start_position and (x, y) != self.ghost_start_position:
-                    self.dots.append((x, y))
+                    self.dots.add((x, y))
 
-    def draw(self, screen, scale=1):
+    def draw(self, screen, scale=1, tile_image=None):
         """
         Відтворення лабіринту на екрані з урахуванням масштабу.
+        Лабіринт статичний, тому стіни малюються один раз у фонову поверхню, яка
+        перебудовується лише при зміні масштабу, а кожен кадр - це один blit.
+        tile_image: вже завантажене зображення стіни (assets['maze_tiles'] або assets.scaled(...))
         """
+        if self.background is None or self.background_scale != scale:
+            self.build_background(scale, tile_image)
+        screen.blit(self.background, (0, 0))
+
+    def build_background(self, scale=1, tile_image=None):
         tile_size = self.TILE_SIZE = 30 * scale  # Масштабуємо розмір плитки
-        base_path = os.path.dirname(os.path.abspath(__file__))
-        assets_path = os.path.join(base_path, '..', 'assets', 'images')
 
-        # Завантаження зображення стіни
-        maze_tile_image_path = os.path.join(assets_path, 'maze_tiles.png')
-        try:
-            maze_tile = pygame.image.load(maze_tile_image_path).convert_alpha()
-            maze_tile = pygame.transform.scale(maze_tile, (int(tile_size), int(tile_size)))
-        except pygame.error as e:
-            print(f"Помилка завантаження maze_tiles.png: {e}")
-            maze_tile = pygame.Surface((int(tile_size), int(tile_size)))
-            maze_tile.fill((0, 0, 255))  # Синій колір для стін
-
-        # Відтворення лабіринту
+        if tile_image is None:
+            # Зображення стіни не передано - завантажуємо його з диска (один раз на побудову фону)
+            base_path = os.path.dirname(os.path.abspath(__file__))
+            assets_path = os.path.join(base_path, '..', 'assets', 'images')
+            maze_tile_image_path = os.path.join(assets_path, 'maze_tiles.png')
+            try:
+                tile_image = pygame.image.load(maze_tile_image_path).convert_alpha()
+            except pygame.error as e:
+                print(f"Помилка завантаження maze_tiles.png: {e}")
+                tile_image = pygame.Surface((int(tile_size), int(tile_size)))
+                tile_image.fill((0, 0, 255))  # Синій колір для стін
+        if tile_image.get_size() == (int(tile_size), int(tile_size)):
+            maze_tile = tile_image
+        else:
+            maze_tile = pygame.transform.scale(tile_image, (int(tile_size), int(tile_size)))
+
+        # Відтворення лабіринту у фонову поверхню
+        background = pygame.Surface((int(self.width * tile_size) + 1, int(self.height * tile_size) + 1))
+        background.fill((0, 0, 0))  # Чорний фон
         for y, row in enumerate(self.grid):
             for x, cell in enumerate(row):
                 if cell == 1:
-                    screen.blit(maze_tile, (x * tile_size, y * tile_size))
+                    background.blit(maze_tile, (x * tile_size, y * tile_size))
+
+        self.background = background.convert() if pygame.display.get_surface() else background
+        self.background_scale = scale
+
+    def invalidate_background(self):
+        """
+        Скидання кешованого фону (наприклад, після зміни сітки чи масштабу).
+        """
+        self.background = None
+        self.background_scale = None
 
     def get_pixel_position(self, position, scale=1):
         """
@@ -138,9 +243,54 @@ class Maze:
             print(f"Помилка при перевірці шляху: {e}")
             return False
 
+    def build_graph(self):
+        """
+        Побудова компактного графа (MazeGraph) для швидкого пошуку шляху.
+        Викликається один раз після того, як сітка рівня остаточно сформована.
+        """
+        from pathfinding.maze_graph import MazeGraph
+        self.graph = MazeGraph(self.grid)
+        return self.graph
+
+    def search_grid(self):
+        """
+        Представлення лабіринту для bfs_search/dfs_search/a_star_search:
+        MazeGraph, якщо він побудований, інакше звичайна сітка.
+        """
+        return self.graph if self.graph is not None else self.grid
+
+    def build_distance_table(self, memory_limit=None):
+        """
+        Побудова таблиці відстаней та наступних кроків для всіх пар прохідних клітинок.
+        Викликається один раз після того, як сітка рівня остаточно сформована.
+        """
+        from pathfinding.distance_table import DistanceTable, DEFAULT_MEMORY_LIMIT
+        if memory_limit is None:
+            memory_limit = DEFAULT_MEMORY_LIMIT
+        self.distance_table = DistanceTable(self.grid, memory_limit)
+        return self.distance_table
+
+    def build_flow_fields(self, capacity=32):
+        """
+        Створення спільного сервісу карт відстаней до цілей привидів.
+        """
+        from pathfinding.flow_field import FlowFieldCache
+        if self.graph is None:
+            self.build_graph()
+        self.flow_fields = FlowFieldCache(self.graph, capacity)
+        return self.flow_fields
+
+    def distance(self, pos1, pos2):
+        """
+        Відстань між клітинками: справжня довжина шляху, якщо побудована таблиця відстаней,
+        інакше манхеттенська відстань.
+        """
+        if self.distance_table is not None:
+            return self.distance_table.distance(pos1, pos2)
+        return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
+
     def remove_dot(self, position):
         """
         Видалення точки (їжі) з даної позиції.
         """
-        if position in self.dots:
-            self.dots.remove(position)
+        self.dots.discard(position)
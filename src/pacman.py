@@ -6,20 +6,27 @@ from ai.heuristics import PacManHeuristic
 from pathfinding.a_star import a_star_search
 from pathfinding.bfs import bfs_search
 from pathfinding.dfs import dfs_search
-import random
+from pathfinding.stats import SearchStats
+from src.entities import EntityView
 
 
-class PacMan:
+class PacMan(EntityView):
+    __slots__ = ('maze', 'image', 'image_key', 'direction', 'level_number', 'ghosts', 'safe_distance', 'rng',
+                 'heuristic', 'planner')
+
     def __init__(self, maze, image, level_number, ghosts):
+        # Позиція та історія позицій зберігаються в maze.entities
+        super().__init__(maze.entities, maze.start_position, is_ghost=False)
         self.maze = maze
         self.image = image
-        self.position = maze.start_position
+        self.image_key = None  # Ім'я зображення в AssetManager (для кешованого масштабування)
         self.direction = (0, 0)  # Поточний напрямок руху
         self.level_number = level_number
         self.ghosts = ghosts
         self.safe_distance = 3  # Мінімальна безпечна відстань до привидів
-        self.previous_positions = []  # Історія останніх позицій
+        self.rng = maze.rng  # Джерело випадковості рівня (для відтворюваних ігор)
         self.heuristic = PacManHeuristic(level_number)
+        self.planner = None  # PacManPlanner для пошуку наперед з лімітом часу (None - жадібна евристика)
 
     def handle_key_event(self, event):
         # Порожня реалізація, щоб ігнорувати всі натискання клавіш
@@ -27,9 +34,20 @@ class PacMan:
 
     def update(self):
         # Автоматичний рух Пакмена
-        target = self.get_target()
+        profiler = self.maze.profiler
+        if self.planner is not None:
+            with profiler.phase('pacman.plan'):
+                move = self.planner.next_move(self)
+            self.direction = move
+            if move != (0, 0):
+                self.move_to((self.position[0] + move[0], self.position[1] + move[1]))
+                self.collect_dot()
+            return
+        with profiler.phase('pacman.target'):
+            target = self.get_target()
         if target:
-            self.direction = self.calculate_direction(target)
+            with profiler.phase('pacman.search'):
+                self.direction = self.calculate_direction(target)
             if self.direction != (0, 0):
                 new_position = (self.position[0] + self.direction[0], self.position[1] + self.direction[1])
             else:
@@ -38,30 +56,20 @@ class PacMan:
 
             # Перевіряємо можливість руху
             if self.maze.is_path(new_position):
-                self.position = new_position
+                self.move_to(new_position)
                 self.collect_dot()
-                self.previous_positions.append(self.position)
-                # Обмежуємо розмір історії позицій
-                if len(self.previous_positions) > 5:
-                    self.previous_positions.pop(0)
             else:
                 # Якщо рух неможливий, намагаємося рухатися випадково
                 new_position = self.random_move()
                 if new_position != self.position:
-                    self.position = new_position
+                    self.move_to(new_position)
                     self.collect_dot()
-                    self.previous_positions.append(self.position)
-                    if len(self.previous_positions) > 5:
-                        self.previous_positions.pop(0)
         else:
             # Якщо немає цілі, стоїмо на місці або рухаємося випадково
             new_position = self.random_move()
             if new_position != self.position:
-                self.position = new_position
+                self.move_to(new_position)
                 self.collect_dot()
-                self.previous_positions.append(self.position)
-                if len(self.previous_positions) > 5:
-                    self.previous_positions.pop(0)
 
     def get_target(self):
         # Використовуємо евристику для отримання цільової позиції
@@ -89,45 +97,63 @@ class PacMan:
             return None  # Немає точок для збору'''
 
     def calculate_direction(self, target):
-        algorithm_choice = random.randint(1, 3)
-        if algorithm_choice == 1:
-            path = dfs_search(self.maze.grid, self.position, target)
-            print("Алгоритм: DFS")
-        elif algorithm_choice == 2:
-            path = bfs_search(self.maze.grid, self.position, target)
-            print("Алгоритм: BFS")
-        else:
-            path = a_star_search(self.maze.grid, self.position, target)
-            print("Алгоритм: A*")
+        next_step = self.find_next_position(target)
 
         # Перевіряємо шлях і повертаємо наступний крок
-        if path and len(path) > 1:
-            next_step = path[1]
+        if next_step is not None:
             dx = next_step[0] - self.position[0]
             dy = next_step[1] - self.position[1]
             return (dx, dy)
         else:
             return (0, 0)
 
+    def find_next_position(self, target):
+        # Якщо для рівня побудована таблиця відстаней, наступний крок - це звернення до масиву
+        if self.maze.distance_table is not None:
+            return self.maze.distance_table.next_step(self.position, target)
+
+        search_grid = self.maze.search_grid()
+        # Статистика пошуку збирається лише тоді, коли для рівня задано агрегатор
+        stats = SearchStats() if self.maze.search_stats is not None else None
+        algorithm_choice = self.rng.randint(1, 3)
+        if algorithm_choice == 1:
+            path = dfs_search(search_grid, self.position, target, stats)
+            self.maze.profiler.log("Алгоритм: DFS")
+        elif algorithm_choice == 2:
+            path = bfs_search(search_grid, self.position, target, stats)
+            self.maze.profiler.log("Алгоритм: BFS")
+        else:
+            path = a_star_search(search_grid, self.position, target, stats)
+            self.maze.profiler.log("Алгоритм: A*")
+        if stats is not None:
+            self.maze.search_stats.add(stats)
+
+        if path and len(path) > 1:
+            return path[1]
+        return None
+
     def distance_to_ghosts(self, position):
         # Рахуємо мінімальну відстань до всіх привидів
         min_distance = float('inf')
         for ghost in self.ghosts:
-            distance = abs(position[0] - ghost.position[0]) + abs(position[1] - ghost.position[1])
+            distance = self.maze.distance(position, ghost.position)
             if distance < min_distance:
                 min_distance = distance
         return min_distance
 
     def collect_dot(self):
-        if self.position in self.maze.dots:
-            self.maze.dots.remove(self.position)
-            # Тут можна додати збільшення балів
+        self.maze.remove_dot(self.position)
+        # Тут можна додати збільшення балів
 
-    def draw(self, screen, scale=1):
+    def draw(self, screen, scale=1, assets=None):
         tile_size = 30 * scale
         x_pixel = self.position[0] * tile_size
         y_pixel = self.position[1] * tile_size
-        scaled_image = pygame.transform.scale(self.image, (int(tile_size), int(tile_size)))
+        if assets is not None and self.image_key is not None:
+            # Масштабована копія з кешу AssetManager замість нового масштабування щокадру
+            scaled_image = assets.scaled(self.image_key, tile_size)
+        else:
+            scaled_image = pygame.transform.scale(self.image, (int(tile_size), int(tile_size)))
         screen.blit(scaled_image, (x_pixel, y_pixel))
 
     def manhattan_distance(self, pos1, pos2):
@@ -136,7 +162,7 @@ class PacMan:
     def random_move(self):
         # Рухаємось у випадковому доступному напрямку
         directions = [(0, -1), (0, 1), (-1, 0), (1, 0)]
-        random.shuffle(directions)
+        self.rng.shuffle(directions)
         for dx, dy in directions:
             new_position = (self.position[0] + dx, self.position[1] + dy)
             if self.maze.is_path(new_position):
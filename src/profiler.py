@@ -0,0 +1,156 @@
+# src/profiler.py
+
+import csv
+import json
+import time
+from collections import deque
+
+
+class _NullPhase:
+    # Порожній контекст для вимкненого профілювальника: жодних вимірювань
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class FrameProfiler:
+    """
+    Вимірювання часу фаз кроку гри (вибір цілі та пошук Пакмена, евристика і пошук кожного
+    привида, зіткнення, кроки відтворення) з ковзним вікном для перцентилів.
+    Також збирає повідомлення про ходи (вибір алгоритму тощо) замість виводу в stdout.
+    За замовчуванням вимкнений і нічого не вимірює.
+    """
+    OVERLAY_PHASES = 12  # Скільки найдорожчих фаз показувати на екрані
+
+    def __init__(self, enabled=False, window=600, log_moves=False, echo=False, max_messages=1000):
+        """
+        enabled: вимірювати час фаз
+        window: кількість останніх вимірювань на фазу для перцентилів
+        log_moves: зберігати повідомлення про ходи
+        echo: додатково друкувати повідомлення про ходи в stdout (як раніше)
+        max_messages: скільки останніх повідомлень зберігати
+        """
+        self.enabled = enabled
+        self.window = window
+        self.log_moves = log_moves
+        self.echo = echo
+        self.samples = {}
+        self.totals = {}  # Назва фази -> (кількість, сумарний час) за весь прогін
+        self.messages = deque(maxlen=max_messages)
+        self.message_count = 0
+        self.show_overlay = False
+        self.font = None
+
+    def phase(self, name):
+        """
+        Контекстний менеджер, що вимірює час виконання фази name.
+        """
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def record(self, name, seconds):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append(seconds)
+        count, total = self.totals.get(name, (0, 0.0))
+        self.totals[name] = (count + 1, total + seconds)
+
+    def log(self, message):
+        """
+        Повідомлення про хід (наприклад, обраний алгоритм пошуку).
+        """
+        if not self.log_moves:
+            return
+        self.message_count += 1
+        self.messages.append(message)
+        if self.echo:
+            print(message)
+
+    def stats(self, name):
+        """
+        Статистика фази: кількість, середнє та перцентилі (мілісекунди) по ковзному вікну.
+        """
+        samples = sorted(self.samples.get(name, ()))
+        count, total = self.totals.get(name, (0, 0.0))
+        if not samples:
+            return {'count': count, 'mean_ms': None, 'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'max_ms': None}
+
+        def percentile(fraction):
+            return samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000
+
+        return {
+            'count': count,
+            'mean_ms': total / count * 1000,
+            'p50_ms': percentile(0.5),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'max_ms': samples[-1] * 1000,
+        }
+
+    def summary(self):
+        return {name: self.stats(name) for name in sorted(self.samples)}
+
+    def dump(self, path):
+        """
+        Збереження статистики у JSON або CSV (за розширенням файлу).
+        """
+        summary = self.summary()
+        if path.endswith('.csv'):
+            fields = ['phase', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                for name, row in summary.items():
+                    writer.writerow(dict(row, phase=name))
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'window': self.window,
+                    'phases': summary,
+                    'message_count': self.message_count,
+                    'messages': list(self.messages),
+                }, f, indent=2, ensure_ascii=False)
+
+    def draw_overlay(self, screen):
+        """
+        Відтворення таблиці найдорожчих фаз (p50 / p95) поверх кадру.
+        """
+        if not (self.enabled and self.show_overlay):
+            return
+        import pygame
+        if self.font is None:
+            self.font = pygame.font.SysFont(None, 18)
+
+        rows = [(name, self.stats(name)) for name in self.samples]
+        rows.sort(key=lambda row: row[1]['p95_ms'] or 0, reverse=True)
+        lines = ["фаза: p50 / p95 мс"]
+        lines += [f"{name}: {row['p50_ms']:.2f} / {row['p95_ms']:.2f}" for name, row in rows[:self.OVERLAY_PHASES]]
+
+        line_height = self.font.get_linesize()
+        panel = pygame.Surface((260, line_height * len(lines) + 8), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 180))
+        for i, line in enumerate(lines):
+            panel.blit(self.font.render(line, True, (0, 255, 0)), (4, 4 + i * line_height))
+        screen.blit(panel, (0, 0))
@@ -0,0 +1,368 @@
+# src/replay.py
+
+import argparse
+import struct
+import zlib
+
+# Формат файлу повтору (усі числа little-endian):
+#   заголовок  HEADER: magic, версія, рівень, зерно (-1 - невідоме), ширина, висота,
+#              кількість сутностей (Пакмен + привиди), інтервал ключових кадрів
+#   сітка      u32 довжина + zlib(байт на клітинку, рядок за рядком)
+#   блоки      для кожних keyframe_interval кроків:
+#              CHUNK (перший крок блоку, кількість кроків), ключовий кадр - позиції всіх сутностей
+#              та zlib(карта точок), потім zlib(ходи по 3 біти) і список "стрибків" (ESCAPE)
+#   індекс     u32 кількість + (u32 крок, u64 зміщення блоку) для кожного блоку
+#   кінець     FOOTER: зміщення індексу, кількість кроків, результат, magic
+# Хід сутності за крок - 3-бітний код: 0 - на місці, 1-4 - крок у напрямку DIRECTIONS[code - 1],
+# ESCAPE - довільне переміщення, нова позиція якого зберігається окремо.
+
+MAGIC = b'PMRP'
+END_MAGIC = b'PMRE'
+VERSION = 1
+HEADER = struct.Struct('<4sBHqHHBI')
+CHUNK = struct.Struct('<II')
+POSITION = struct.Struct('<HH')
+ESCAPE_RECORD = struct.Struct('<IHH')
+INDEX_RECORD = struct.Struct('<IQ')
+FOOTER = struct.Struct('<QIB4s')
+
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+MOVE_CODES = {direction: code for code, direction in enumerate(DIRECTIONS, 1)}
+ESCAPE = 7
+RESULT_CODES = {None: 0, 'won': 1, 'lost': 2}
+RESULTS = {code: result for result, code in RESULT_CODES.items()}
+
+
+def pack_codes(codes):
+    """
+    Пакування 3-бітних кодів: кожні 8 кодів займають 3 байти.
+    """
+    padded = codes + bytes(-len(codes) % 8)
+    out = bytearray()
+    for i in range(0, len(padded), 8):
+        c = padded[i:i + 8]
+        value = c[0] | c[1] << 3 | c[2] << 6 | c[3] << 9 | c[4] << 12 | c[5] << 15 | c[6] << 18 | c[7] << 21
+        out += value.to_bytes(3, 'little')
+    return bytes(out)
+
+
+def unpack_codes(data, count):
+    codes = bytearray()
+    for i in range(0, len(data), 3):
+        value = int.from_bytes(data[i:i + 3], 'little')
+        codes += bytes((value >> shift) & 7 for shift in range(0, 24, 3))
+    return codes[:count]
+
+
+def write_blob(f, data):
+    data = zlib.compress(data)
+    f.write(struct.pack('<I', len(data)))
+    f.write(data)
+
+
+def read_blob(f):
+    length, = struct.unpack('<I', f.read(4))
+    return zlib.decompress(f.read(length))
+
+
+class ReplayWriter:
+    """
+    Запис повтору під час гри. Simulation викликає begin() після старту рівня, record() після
+    кожного кроку та close() після завершення гри; на крок припадає лише порівняння позицій
+    і кілька байтів у буфері, а стиснення виконується раз на keyframe_interval кроків.
+    """
+
+    def __init__(self, path, keyframe_interval=1024):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.file = None
+        self.index = []
+        self.codes = bytearray()  # Коди ходів поточного блоку: entity_count на крок
+        self.escapes = []  # (номер коду в блоці, x, y)
+        self.chunk_tick = 0
+        self.chunk_ticks = 0
+        self.chunk_positions = b''  # Ключовий кадр поточного блоку: позиції та стиснута карта точок
+        self.chunk_dots = b''
+        self.positions = []
+        self.tick = 0
+
+    @staticmethod
+    def entity_positions(simulation):
+        return [simulation.pacman.position] + [ghost.position for ghost in simulation.ghosts]
+
+    def begin(self, simulation):
+        maze = simulation.maze
+        self.positions = self.entity_positions(simulation)
+        try:
+            self.file = open(self.path, 'wb')
+            seed = simulation.seed if simulation.seed is not None else -1
+            self.file.write(HEADER.pack(MAGIC, VERSION, simulation.level_number, seed, maze.width, maze.height,
+                                        len(self.positions), self.keyframe_interval))
+            write_blob(self.file, bytes(cell for row in maze.grid for cell in row))
+        except OSError as e:
+            print(f"Не вдалося створити файл повтору {self.path}: {e}")
+            self.file = None
+            return
+        self.tick = simulation.tick
+        self.start_chunk(simulation)
+
+    def start_chunk(self, simulation):
+        self.chunk_tick = self.tick
+        self.chunk_ticks = 0
+        self.codes = bytearray()
+        self.escapes = []
+        self.chunk_positions = b''.join(POSITION.pack(*position) for position in self.positions)
+        self.chunk_dots = zlib.compress(bytes(simulation.maze.dots.bitmap))
+
+    def record(self, simulation):
+        if self.file is None:
+            return
+        codes = self.codes
+        new_positions = self.entity_positions(simulation)
+        for old, new in zip(self.positions, new_positions):
+            if old == new:
+                codes.append(0)
+            else:
+                code = MOVE_CODES.get((new[0] - old[0], new[1] - old[1]))
+                if code is None:
+                    self.escapes.append((len(codes), new[0], new[1]))
+                    code = ESCAPE
+                codes.append(code)
+        self.positions = new_positions
+        self.tick = simulation.tick
+        self.chunk_ticks += 1
+        if self.chunk_ticks >= self.keyframe_interval:
+            self.flush_chunk()
+            self.start_chunk(simulation)
+
+    def flush_chunk(self):
+        f = self.file
+        self.index.append((self.chunk_tick, f.tell()))
+        f.write(CHUNK.pack(self.chunk_tick, self.chunk_ticks))
+        f.write(self.chunk_positions)
+        f.write(struct.pack('<I', len(self.chunk_dots)))
+        f.write(self.chunk_dots)
+        write_blob(f, pack_codes(self.codes))
+        f.write(struct.pack('<I', len(self.escapes)))
+        for escape in self.escapes:
+            f.write(ESCAPE_RECORD.pack(*escape))
+
+    def close(self, result=None):
+        if self.file is None:
+            return
+        try:
+            if self.chunk_ticks or not self.index:
+                self.flush_chunk()
+            index_offset = self.file.tell()
+            self.file.write(struct.pack('<I', len(self.index)))
+            for tick, offset in self.index:
+                self.file.write(INDEX_RECORD.pack(tick, offset))
+            self.file.write(FOOTER.pack(index_offset, self.tick, RESULT_CODES.get(result, 0), END_MAGIC))
+        except OSError as e:
+            print(f"Помилка при записі повтору {self.path}: {e}")
+        finally:
+            self.file.close()
+            self.file = None
+
+
+class ReplayFrame:
+    """
+    Стан гри на кроці tick: позиції сутностей (спершу Пакмен) і карта точок
+    (bytearray з індексами x * height + y, як у DotStore.bitmap). Кадри з frames()
+    ділять одну карту точок, яка змінюється з кожним наступним кроком.
+    """
+
+    def __init__(self, tick, positions, dots):
+        self.tick = tick
+        self.positions = positions
+        self.dots = dots
+
+    @property
+    def pacman(self):
+        return self.positions[0]
+
+    @property
+    def ghosts(self):
+        return self.positions[1:]
+
+
+class ReplayPlayer:
+    """
+    Відтворення повтору без запуску ШІ: стан відновлюється з найближчого попереднього
+    ключового кадру та записаних ходів, тому перехід до будь-якого кроку читає один блок.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        (magic, version, self.level_number, seed, self.width, self.height, self.entity_count,
+         self.keyframe_interval) = HEADER.unpack(self.file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            self.file.close()
+            raise ValueError(f"{path} не є файлом повтору підтримуваної версії")
+        self.seed = seed if seed >= 0 else None
+        cells = read_blob(self.file)
+        self.grid = [list(cells[y * self.width:(y + 1) * self.width]) for y in range(self.height)]
+
+        self.file.seek(-FOOTER.size, 2)
+        index_offset, self.total_ticks, result, end_magic = FOOTER.unpack(self.file.read(FOOTER.size))
+        if end_magic != END_MAGIC:
+            self.file.close()
+            raise ValueError(f"Повтор {path} не завершено (немає індексу)")
+        self.result = RESULTS.get(result)
+        self.file.seek(index_offset)
+        count, = struct.unpack('<I', self.file.read(4))
+        self.index = [INDEX_RECORD.unpack(self.file.read(INDEX_RECORD.size)) for _ in range(count)]
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def read_chunk(self, number):
+        """
+        Блок number: (перший крок, кількість кроків, ключовий кадр, коди ходів, стрибки).
+        """
+        self.file.seek(self.index[number][1])
+        chunk_tick, chunk_ticks = CHUNK.unpack(self.file.read(CHUNK.size))
+        positions = [POSITION.unpack(self.file.read(POSITION.size)) for _ in range(self.entity_count)]
+        dots = bytearray(read_blob(self.file))
+        codes = unpack_codes(read_blob(self.file), chunk_ticks * self.entity_count)
+        count, = struct.unpack('<I', self.file.read(4))
+        escapes = {}
+        for _ in range(count):
+            position, x, y = ESCAPE_RECORD.unpack(self.file.read(ESCAPE_RECORD.size))
+            escapes[position] = (x, y)
+        return ReplayFrame(chunk_tick, positions, dots), chunk_ticks, codes, escapes
+
+    def chunk_for(self, tick):
+        # Останній блок, що починається не пізніше tick (двійковий пошук по індексу)
+        low, high = 0, len(self.index) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.index[middle][0] <= tick:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    def frames(self, start_tick=0):
+        """
+        Генератор станів для кроків start_tick..total_ticks.
+        """
+        start_tick = max(0, min(start_tick, self.total_ticks))
+        height = self.height
+        entity_count = self.entity_count
+        first = self.chunk_for(start_tick)
+        for number in range(first, len(self.index)):
+            frame, chunk_ticks, codes, escapes = self.read_chunk(number)
+            positions = frame.positions
+            dots = frame.dots
+            # Ключовий кадр наступного блоку збігається з останнім кроком попереднього
+            if number == first and frame.tick >= start_tick:
+                yield ReplayFrame(frame.tick, list(positions), dots)
+            for step in range(chunk_ticks):
+                base = step * entity_count
+                for entity in range(entity_count):
+                    code = codes[base + entity]
+                    if code == ESCAPE:
+                        positions[entity] = escapes[base + entity]
+                    elif code:
+                        dx, dy = DIRECTIONS[code - 1]
+                        x, y = positions[entity]
+                        positions[entity] = (x + dx, y + dy)
+                # Пакмен з'їдає точку, на яку ступив
+                x, y = positions[0]
+                dots[x * height + y] = 0
+                tick = frame.tick + step + 1
+                if tick >= start_tick:
+                    yield ReplayFrame(tick, list(positions), dots)
+
+    def seek(self, tick):
+        """
+        Стан на кроці tick (не далі за останній записаний крок).
+        """
+        for frame in self.frames(tick):
+            return ReplayFrame(frame.tick, frame.positions, bytearray(frame.dots))
+        return None
+
+
+def play(path, start_tick=0, speed=1):
+    # Перегляд повтору: пробіл - пауза, стрілки вліво/вправо - перемотування, 1-4 - швидкість
+    import pygame
+    from src.maze import Maze
+    from src.utils import load_assets
+
+    with ReplayPlayer(path) as player:
+        pygame.init()
+        screen = pygame.display.set_mode((800, 600))
+        pygame.display.set_caption(f"Повтор: рівень {player.level_number}, зерно {player.seed}")
+        assets = load_assets()
+        maze = Maze(player.width, player.height)
+        maze.grid = player.grid
+        tile_size = 30
+        scale = min(800 / (player.width * tile_size), 600 / (player.height * tile_size), 1)
+        size = tile_size * scale
+        ghost_keys = ['ghost_red', 'ghost_pink', 'ghost_blue', 'ghost_orange']
+        clock = pygame.time.Clock()
+        speeds = [1, 4, 16, 64]
+        frames = player.frames(start_tick)
+        frame = next(frames, None)
+        paused = False
+        running = frame is not None
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE:
+                        paused = not paused
+                    elif event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                        step = 600 if event.key == pygame.K_RIGHT else -600
+                        frames = player.frames(max(0, frame.tick + step))
+                        frame = next(frames, frame)
+                    elif pygame.K_1 <= event.key <= pygame.K_4:
+                        speed = speeds[event.key - pygame.K_1]
+
+            screen.fill((0, 0, 0))
+            maze.draw(screen, scale, assets.scaled('maze_tiles', size))
+            for x in range(player.width):
+                for y in range(player.height):
+                    if frame.dots[x * player.height + y]:
+                        center = (int(x * size + size / 2), int(y * size + size / 2))
+                        pygame.draw.circle(screen, (255, 255, 0), center, int(5 * scale))
+            screen.blit(assets.scaled('pacman', size), (frame.pacman[0] * size, frame.pacman[1] * size))
+            for i, (x, y) in enumerate(frame.ghosts):
+                screen.blit(assets.scaled(ghost_keys[i % len(ghost_keys)], size), (x * size, y * size))
+            pygame.display.flip()
+
+            if not paused:
+                for _ in range(speed):
+                    frame = next(frames, frame)
+            clock.tick(60)
+        pygame.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Повтори ігор Pac-Man")
+    parser.add_argument('command', choices=['info', 'play'])
+    parser.add_argument('path')
+    parser.add_argument('--start-tick', type=int, default=0)
+    parser.add_argument('--speed', type=int, default=1, help="Кроків повтору на кадр")
+    args = parser.parse_args(argv)
+
+    if args.command == 'play':
+        play(args.path, args.start_tick, args.speed)
+        return
+    with ReplayPlayer(args.path) as player:
+        print(f"Рівень {player.level_number}, зерно {player.seed}, лабіринт {player.width}x{player.height}, "
+              f"сутностей {player.entity_count}")
+        print(f"Кроків {player.total_ticks}, результат {player.result}, ключових кадрів {len(player.index)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# src/scheduler.py
+
+import time
+
+
+class AIScheduler:
+    """
+    Розподіл роботи ШІ в межах бюджету часу на крок гри.
+    Пакмен оновлюється завжди, далі для привидів, що ходять на цьому кроці (move_counter),
+    вирішується, хто перепланує шлях. Черга перепланування настає:
+    - близькі привиди (не далі near_distance) - на кожному ході;
+    - дальні - раз на replan_interval ходів, зі зсувом за індексом, тож їхні перепланування
+      рознесені по різних кроках.
+    Бюджет (за середнім часом плану) отримують спершу найближчі до Пакмена привиди; решті
+    перепланування відкладається, і привид іде наступною клітинкою попереднього шляху.
+    Без придатного шляху привид планує навіть понад бюджет, щоб не стояти.
+    Ходи виконуються як у Ghost.update: у порядку індексів, кожен привид планує і ходить
+    після ходів попередніх.
+    З таблицею відстаней або картами відстаней крок привида - звернення до масиву, тож
+    планувальник не розносить і не відкладає плани, а лише рахує такі ходи окремо (lookups).
+    """
+
+    def __init__(self, budget_ms=8.0, replan_interval=4, near_distance=6):
+        """
+        budget_ms: час на ШІ за один крок гри (мілісекунди)
+        replan_interval: дальній привид перепланує щонайменше раз на стільки своїх ходів
+        near_distance: манхеттенська відстань до Пакмена, ближче за яку привид перепланує щоходу
+        """
+        self.budget = budget_ms / 1000
+        self.replan_interval = max(1, replan_interval)
+        self.near_distance = near_distance
+        self.moves = {}  # Індекс привида -> кількість його ходів (для рознесення перепланувань)
+        self.due = set()  # Індекси привидів, яким на поточному кроці настала черга перепланування
+        self.plan_cost = 0.0  # Середній час одного плану (секунди), за яким резервується бюджет
+        self.plan_samples = 0
+        # Статистика останнього кроку
+        self.last_elapsed = 0.0
+        self.last_replans = 0
+        self.last_deferred = 0
+        # Сумарна статистика (див. summary)
+        self.ticks = 0
+        self.total_elapsed = 0.0
+        self.max_elapsed = 0.0
+        self.over_budget_ticks = 0
+        self.replans = 0  # Нових планів
+        self.reused = 0  # Ходів за попереднім шляхом
+        self.deferred = 0  # Перепланувань, відкладених через бюджет
+        self.forced = 0  # Планів понад бюджет (привиду не було куди йти за старим шляхом)
+        self.lookups = 0  # Ходів за таблицею або картами відстаней (поза бюджетом перепланувань)
+
+    def update(self, pacman, ghosts):
+        started = time.perf_counter()
+        maze = pacman.maze
+        profiler = maze.profiler
+        pacman.update()
+
+        movers = [ghost for ghost in ghosts if ghost.advance_counter()]
+        if maze.distance_table is not None or maze.flow_fields is not None:
+            # Крок - звернення до масиву, старий шлях не зберігається, тож діємо як Ghost.update
+            for ghost in movers:
+                try:
+                    ghost.take_turn(ghost.plan_next_position(pacman))
+                except Exception as e:
+                    print(f"Помилка при оновленні привида: {e}")
+                    ghost.random_move()
+            self.lookups += len(movers)
+            self.record_tick(time.perf_counter() - started, 0, 0, profiler)
+            return
+
+        granted = self.grant_replans(movers, pacman, started + self.budget)
+        replans = deferred = 0
+        # Як і в Ghost.update: кожен привид планує вже після ходів попередніх за індексом
+        for ghost in movers:
+            try:
+                if ghost.index in granted:
+                    plan_started = time.perf_counter()
+                    next_position = ghost.plan_next_position(pacman)
+                    self.record_plan_cost(time.perf_counter() - plan_started)
+                    replans += 1
+                else:
+                    next_position = ghost.follow_planned_path()
+                    if next_position is not None:
+                        self.reused += 1
+                        if ghost.index in self.due:
+                            deferred += 1
+                    else:
+                        # Старого шляху немає або привид з нього зійшов - планувати доводиться зараз
+                        if time.perf_counter() >= started + self.budget:
+                            self.forced += 1
+                        next_position = ghost.plan_next_position(pacman)
+                        replans += 1
+                ghost.take_turn(next_position)
+            except Exception as e:
+                print(f"Помилка при оновленні привида: {e}")
+                ghost.random_move()
+
+        self.record_tick(time.perf_counter() - started, replans, deferred, profiler)
+
+    def record_tick(self, elapsed, replans, deferred, profiler):
+        self.last_elapsed = elapsed
+        self.last_replans = replans
+        self.last_deferred = deferred
+        self.ticks += 1
+        self.total_elapsed += elapsed
+        self.max_elapsed = max(self.max_elapsed, elapsed)
+        self.replans += replans
+        self.deferred += deferred
+        if elapsed > self.budget:
+            self.over_budget_ticks += 1
+        if deferred or elapsed > self.budget:
+            profiler.log(f"ШІ: {elapsed * 1000:.2f} мс, перепланувань {replans}, відкладено {deferred}")
+
+    def grant_replans(self, movers, pacman, deadline):
+        """
+        Індекси привидів, яким на цьому кроці дозволено перепланувати. Привиди, яким настала черга,
+        розглядаються від найближчого до Пакмена, і кожному резервується середній час плану,
+        доки він вміщується в залишок бюджету. Порядок самих ходів від цього не залежить.
+        """
+        px, py = pacman.position
+        self.due = set()
+        due = []
+        for ghost in movers:
+            moves = self.moves.get(ghost.index, 0)
+            self.moves[ghost.index] = moves + 1
+            distance = abs(ghost.position[0] - px) + abs(ghost.position[1] - py)
+            if distance <= self.near_distance or (moves + ghost.index) % self.replan_interval == 0 \
+                    or not ghost.planned_path:
+                self.due.add(ghost.index)
+                due.append((distance, ghost.index))
+        due.sort()
+
+        granted = set()
+        reserved = time.perf_counter()
+        for _, index in due:
+            if reserved >= deadline:
+                break
+            granted.add(index)
+            reserved += self.plan_cost
+        return granted
+
+    def record_plan_cost(self, elapsed):
+        # Ковзне середнє часу одного плану
+        self.plan_cost = elapsed if not self.plan_samples else 0.8 * self.plan_cost + 0.2 * elapsed
+        self.plan_samples += 1
+
+    def summary(self):
+        """
+        Статистика планувальника: час ШІ на крок, кроки понад бюджет, нові, повторно використані
+        та відкладені плани привидів.
+        """
+        ticks = self.ticks or 1
+        return {
+            'ticks': self.ticks,
+            'mean_ms': self.total_elapsed / ticks * 1000,
+            'max_ms': self.max_elapsed * 1000,
+            'over_budget_ticks': self.over_budget_ticks,
+            'replans': self.replans,
+            'reused': self.reused,
+            'deferred': self.deferred,
+            'forced': self.forced,
+            'lookups': self.lookups,
+        }
@@ -0,0 +1,353 @@
+# src/simulation.py
+
+from src.level_generator import LevelGenerator
+from src.maze import Maze
+from src.dot_store import DotStore
+from src.pacman import PacMan
+from src.ghost import Ghost
+from src.profiler import FrameProfiler
+from src.scheduler import AIScheduler
+from pathfinding.incremental import IncrementalPlanner
+from ai.ghost_controller import GhostController
+from ai.planner import PacManPlanner
+import random
+
+
+def derive_seed(seed, level_number):
+    """
+    Зерно окремого рівня, виведене з зерна гри: рівні однієї гри не повторюють один одного,
+    а вся гра відтворюється за одним числом.
+    """
+    return random.Random(f"{seed}/{level_number}").getrandbits(63)
+
+
+class Simulation:
+    """
+    Headless-ядро гри: володіє лабіринтом, Пакменом та привидами, перевіряє зіткнення
+    та умови перемоги/поразки. Не створює вікна, поверхонь чи годинника, тому
+    може виконувати кроки настільки швидко, наскільки дозволяє процесор.
+    """
+    GHOST_COLORS = ['red', 'pink', 'blue', 'orange']
+
+    def __init__(self, level_number=1, assets=None, use_distance_table=False, use_flow_field=False,
+                 maze_generator=None, profiler=None, search_stats=None, use_incremental_planner=False,
+                 level_pack=None, use_batched_ghosts=False, planner_budget_ms=None, ai_budget_ms=None,
+                 weighted_danger=False):
+        """
+        level_number: номер рівня
+        assets: словник зображень для сутностей (None - headless-режим без зображень)
+        use_distance_table: будувати для кожного рівня таблицю відстаней між усіма парами клітинок
+        use_flow_field: привиди читають наступний крок зі спільних карт відстаней до цілей
+        maze_generator: 'backtracker' або 'vectorized' (None - як задано в конфігурації рівня)
+        profiler: FrameProfiler для вимірювання фаз кроку (None - вимкнений)
+        search_stats: SearchStatsAggregator, куди збирати статистику кожного пошуку шляху
+        use_incremental_planner: кожен привид зберігає дерево пошуку між ходами (IncrementalPlanner)
+        level_pack: LevelPack з попередньо згенерованими рівнями; рівні з відомим зерном,
+                    що є в пакеті, завантажуються з нього замість генерації
+        use_batched_ghosts: усі привиди рухаються одним пакетним проходом GhostController
+        planner_budget_ms: Пакмен обирає хід пошуком наперед (PacManPlanner) з цим лімітом часу
+                           на крок у мілісекундах (None - жадібна евристика)
+        ai_budget_ms: бюджет часу ШІ на крок (мс): AIScheduler розносить перепланування привидів
+                      по кроках (None - усі привиди планують щоходу; не діє з use_batched_ghosts)
+        weighted_danger: жадібна евристика Пакмена оцінює небезпеку в кроках гри з урахуванням
+                         швидкості привидів, а не в клітинках
+        """
+        self.level_number = level_number
+        self.assets = assets
+        self.use_distance_table = use_distance_table
+        self.use_flow_field = use_flow_field
+        self.maze_generator = maze_generator
+        self.profiler = profiler if profiler is not None else FrameProfiler()
+        self.search_stats = search_stats
+        self.use_incremental_planner = use_incremental_planner
+        self.level_pack = level_pack
+        self.use_batched_ghosts = use_batched_ghosts
+        self.planner_budget_ms = planner_budget_ms
+        self.ai_budget_ms = ai_budget_ms
+        self.weighted_danger = weighted_danger
+        # Планувальник належить грі, а не рівню: статистика накопичується між рівнями
+        self.scheduler = AIScheduler(ai_budget_ms) if ai_budget_ms is not None else None
+        self.ghost_controller = None  # GhostController рівня (None - кожен привид оновлюється окремо)
+        self.recorder = None  # ReplayWriter, що записує кожен крок рівня (None - без запису)
+        self.maze = None
+        self.pacman = None
+        self.ghosts = []
+        self.ghost_speed = 0
+        self.ghost_behaviour = None
+        self.number_of_ghosts = 0
+        self.seed = None
+        self.rng = random
+        self.tick = 0
+        self.dots_total = 0
+        self.state = 'idle'  # Можливі стани: 'idle', 'playing', 'game_over'
+        self.result = None  # Результат завершеної гри: 'won' або 'lost'
+
+    # Стан рівня, який install() переносить з підготовленої симуляції
+    LEVEL_FIELDS = ('level_number', 'seed', 'rng', 'maze', 'pacman', 'ghosts', 'ghost_speed', 'ghost_behaviour',
+                    'number_of_ghosts', 'dots_total', 'ghost_controller')
+
+    def start(self, level_number=None, seed=None):
+        """
+        Генерація рівня та розміщення Пакмена і привидів.
+        seed: зерно для генерації лабіринту, випадкових рухів та вибору алгоритму пошуку
+              (None - глобальний random, як і раніше)
+        """
+        self.install(self.prepare(level_number, seed))
+
+    def prepare(self, level_number=None, seed=None):
+        """
+        Підготовка рівня в окремій Simulation з тими самими параметрами: поточна гра не змінюється,
+        тож рівень можна готувати у фоновому потоці, поки триває попередній.
+        Повертає підготовлену Simulation, яку потім передають в install().
+        """
+        prepared = Simulation(level_number if level_number is not None else self.level_number, assets=self.assets,
+                              use_distance_table=self.use_distance_table, use_flow_field=self.use_flow_field,
+                              maze_generator=self.maze_generator, profiler=self.profiler,
+                              search_stats=self.search_stats, use_incremental_planner=self.use_incremental_planner,
+                              level_pack=self.level_pack, use_batched_ghosts=self.use_batched_ghosts,
+                              planner_budget_ms=self.planner_budget_ms, ai_budget_ms=self.ai_budget_ms,
+                              weighted_danger=self.weighted_danger)
+        prepared.seed = seed
+        prepared.rng = random.Random(seed) if seed is not None else random
+
+        packed_level = None
+        if self.level_pack is not None:
+            packed_level = self.level_pack.get(prepared.level_number, seed, self.maze_generator)
+        if packed_level is not None:
+            prepared.load_level(packed_level)
+        else:
+            prepared.generate_level()
+        if self.use_batched_ghosts:
+            prepared.ghost_controller = GhostController(prepared.maze, prepared.level_number)
+        return prepared
+
+    def install(self, prepared):
+        """
+        Заміна поточного рівня підготовленим (результатом prepare()) і початок гри на ньому.
+        """
+        for field in self.LEVEL_FIELDS:
+            setattr(self, field, getattr(prepared, field))
+        self.tick = 0
+        self.result = None
+        self.state = 'playing'
+        if self.recorder is not None:
+            self.recorder.begin(self)
+
+    def generate_level(self):
+        # Генерація рівня
+        level_generator = LevelGenerator(self.level_number, self.rng, self.maze_generator)
+        self.maze, self.ghost_speed, self.ghost_behaviour, self.number_of_ghosts = level_generator.generate_level()
+        self.maze.profiler = self.profiler
+        self.maze.search_stats = self.search_stats
+
+        # Забезпечуємо, що позиція привидів вільна
+        self.maze.grid[self.maze.ghost_start_position[1]][self.maze.ghost_start_position[0]] = 0
+
+        # Сітка рівня більше не змінюється, тож структури для пошуку шляху будуються один раз
+        self.maze.build_graph()
+        if self.use_distance_table:
+            self.maze.build_distance_table()
+        if self.use_flow_field:
+            self.maze.build_flow_fields()
+
+        # Розміщення точок (їжі) в лабіринті
+        self.maze.place_dots()
+        self.dots_total = len(self.maze.dots)
+
+        # Створення Пакмена
+        self.ghosts = []
+        self.pacman = self.create_pacman()
+        self.maze.pacman = self.pacman  # Зв'язуємо Пакмена з лабіринтом для перевірки зайнятості
+
+        self.place_ghosts(self.number_of_ghosts)
+
+        # Призначення списку привидів Пакмену для обчислення відстаней
+        self.pacman.ghosts = self.ghosts
+
+    def load_level(self, packed_level):
+        """
+        Відновлення рівня з пакета (PackedLevel): сітка, точки, граф і таблиця відстаней читаються
+        з файлу, привиди стають на збережені позиції, а генератор випадкових чисел отримує стан,
+        який він мав після генерації, тож гра триває так само, як після generate_level.
+        """
+        self.maze = Maze(packed_level.width, packed_level.height, packed_level.wall_density, self.rng)
+        self.maze.grid = packed_level.grid_rows()
+        self.maze.start_position = packed_level.start_position
+        self.maze.ghost_start_position = packed_level.ghost_start_position
+        self.maze.profiler = self.profiler
+        self.maze.search_stats = self.search_stats
+        self.ghost_speed = packed_level.ghost_speed
+        self.ghost_behaviour = packed_level.ghost_behaviour
+        self.number_of_ghosts = packed_level.number_of_ghosts
+
+        self.maze.graph = packed_level.build_graph()
+        if self.use_distance_table:
+            self.maze.distance_table = packed_level.build_distance_table()
+            if self.maze.distance_table is None:
+                self.maze.build_distance_table()
+        if self.use_flow_field:
+            self.maze.build_flow_fields()
+
+        self.maze.dots = DotStore(self.maze.width, self.maze.height, packed_level.dot_positions())
+        self.dots_total = len(self.maze.dots)
+
+        self.ghosts = []
+        self.pacman = self.create_pacman()
+        self.maze.pacman = self.pacman
+
+        self.maze.ghosts = []
+        for x, y, color_index in packed_level.ghosts:
+            ghost_image_key = f'ghost_{self.GHOST_COLORS[color_index]}'
+            if self.assets is not None and ghost_image_key not in self.assets:
+                print(f"Відсутній асет для {ghost_image_key}, пропускаємо створення цього привида.")
+                continue
+            self.add_ghost(ghost_image_key, (x, y))
+        self.pacman.ghosts = self.ghosts
+        self.rng.setstate(packed_level.rng_state)
+
+    def create_pacman(self):
+        pacman = PacMan(self.maze, self.get_image('pacman'), self.level_number, self.ghosts)
+        pacman.image_key = 'pacman'
+        if self.planner_budget_ms is not None:
+            pacman.planner = PacManPlanner(self.planner_budget_ms)
+        pacman.heuristic.weighted_danger = self.weighted_danger
+        return pacman
+
+    def place_ghosts(self, number_of_ghosts):
+        # Визначення стартових позицій привидів
+        base_x, base_y = self.maze.ghost_start_position
+        offset_positions = [
+            (base_x, base_y),
+            (base_x + 1, base_y),
+            (base_x, base_y + 1),
+            (base_x + 1, base_y + 1)
+        ]
+
+        self.maze.ghosts = []  # Очищення списку привидів в лабіринті перед додаванням
+        for i in range(number_of_ghosts):
+            color = self.GHOST_COLORS[i % len(self.GHOST_COLORS)]
+            ghost_image_key = f'ghost_{color}'
+            if self.assets is not None and ghost_image_key not in self.assets:
+                print(f"Відсутній асет для {ghost_image_key}, пропускаємо створення цього привида.")
+                continue  # Пропустити створення, якщо асет відсутній
+
+            # Отримання унікальної позиції для кожного привида
+            if i < len(offset_positions):
+                position = offset_positions[i]
+            else:
+                # Якщо привидів більше, ніж визначено позицій, генеруємо випадкові
+                position = self.get_random_ghost_position()
+
+            # Перевірка, що позиція не зайнята стіною та знаходиться в межах лабіринту
+            if not (self.maze.is_path(position) and not self.is_position_occupied(position)):
+                print(f"Недопустима або зайнята позиція для привида: {position}")
+                # Спробувати знайти іншу позицію
+                position = self.get_random_ghost_position()
+                if not (self.maze.is_path(position) and not self.is_position_occupied(position)):
+                    print(f"Не вдалося розмістити привида на позиції: {position}")
+                    continue
+
+            self.add_ghost(ghost_image_key, position)
+
+    def add_ghost(self, ghost_image_key, position):
+        ghost = Ghost(self.maze, self.get_image(ghost_image_key), self.ghost_speed, self.level_number, position)
+        ghost.image_key = ghost_image_key
+        ghost.index = len(self.ghosts)
+        if self.use_incremental_planner:
+            ghost.planner = IncrementalPlanner(self.maze.graph)
+        self.ghosts.append(ghost)
+        self.maze.ghosts.append(ghost)
+        return ghost
+
+    def get_image(self, key):
+        if self.assets is None:
+            return None
+        return self.assets.get(key)
+
+    def get_random_ghost_position(self):
+        # Генеруємо випадкову позицію для привида, уникаючи стартових позицій
+        attempts = 0
+        max_attempts = 100
+        while attempts < max_attempts:
+            x = self.rng.randint(1, self.maze.width - 2)
+            y = self.rng.randint(1, self.maze.height - 2)
+            if (x, y) != self.maze.start_position and (x, y) != self.maze.ghost_start_position and self.maze.is_path((x, y)):
+                return (x, y)
+            attempts += 1
+        return self.maze.ghost_start_position  # У крайньому випадку
+
+    def is_position_occupied(self, position):
+        # Перевіряємо, чи зайнята позиція іншим привидом або Пакменом (лічильники клітинок maze.entities)
+        return self.maze.entities.is_occupied(position)
+
+    def step(self):
+        """
+        Один крок симуляції. Повертає поточний стан ('playing' або 'game_over').
+        """
+        if self.state != 'playing':
+            return self.state
+
+        self.tick += 1
+        with self.profiler.phase('tick'):
+            if self.scheduler is not None and self.ghost_controller is None:
+                # Пакмен і привиди в межах бюджету часу ШІ на крок
+                self.scheduler.update(self.pacman, self.ghosts)
+            else:
+                # Оновлення Пакмена
+                self.pacman.update()
+
+                # Оновлення привидів
+                if self.ghost_controller is not None:
+                    self.ghost_controller.update(self.ghosts, self.pacman)
+                else:
+                    for ghost in self.ghosts:
+                        ghost.update(self.pacman)
+
+            with self.profiler.phase('collision'):
+                self.check_game_over()
+        if self.recorder is not None:
+            self.recorder.record(self)
+            if self.state == 'game_over':
+                self.close_recorder()
+        return self.state
+
+    def check_game_over(self):
+        # Перевірка зіткнень між Пакменом та привидами
+        if self.maze.entities.ghosts_at(self.pacman.position):
+            self.finish('lost')
+            return
+
+        # Перевірка, чи зібрані всі точки (їжа)
+        if not self.maze.dots:
+            self.finish('won')
+
+    def run(self, max_ticks=None):
+        """
+        Виконує кроки до завершення гри або до max_ticks. Повертає результат гри
+        ('won', 'lost' або None, якщо ліміт кроків вичерпано).
+        """
+        while self.state == 'playing':
+            if max_ticks is not None and self.tick >= max_ticks:
+                break
+            self.step()
+        return self.result
+
+    def finish(self, result):
+        self.result = result
+        self.state = 'game_over'
+
+    def close_recorder(self):
+        """
+        Завершення запису повтору (також при виході з гри посеред рівня).
+        """
+        if self.recorder is not None:
+            self.recorder.close(self.result)
+            self.recorder = None
+
+    @property
+    def is_over(self):
+        return self.state == 'game_over'
+
+    @property
+    def dots_eaten(self):
+        return self.dots_total - len(self.maze.dots)
@@ -0,0 +1,313 @@
+# src/snapshot.py
+
+from array import array
+from collections import OrderedDict, deque
+import time
+
+from ai.heuristics import attack_offsets
+from pathfinding.maze_graph import DIRECTIONS, MazeGraph
+
+STAY = (0, 0)
+BITMAP_DIGITS = bytes.maketrans(b'\x00\x01', b'01')  # Байти бітової карти DotStore -> цифри '0'/'1'
+UNREACHABLE = -1  # Відстань до недосяжної (або ще не досягнутої) клітинки в рядках SnapshotContext
+DEADLINE_CHECK = 64  # Як часто (у розкритих клітинках) BFS рядка перевіряє дедлайн
+
+try:
+    popcount = int.bit_count  # Python 3.10+
+except AttributeError:
+    def popcount(value):
+        return bin(value).count('1')
+
+
+class SearchTimeout(Exception):
+    """
+    Вичерпано час, відведений на пошук (SnapshotContext.deadline).
+    """
+
+
+class SnapshotContext:
+    """
+    Незмінна частина стану рівня, спільна для всіх знімків: граф лабіринту, правила привидів
+    (номер рівня, швидкість, зсуви оточення) та кеш відстаней до цілей привидів.
+    Знімки посилаються на один контекст, тож клонування не копіює ні сітку, ні граф.
+    Рядки відстаней будуються BFS лише до потрібної клітинки та дообчислюються за потреби,
+    а якщо задано deadline (time.perf_counter), BFS перериває довгу побудову винятком SearchTimeout.
+    """
+
+    def __init__(self, graph, level_number, ghost_speed, num_ghosts, cache_rows=256):
+        """
+        graph: MazeGraph рівня
+        num_ghosts: кількість привидів у рівні (для зсувів оточення)
+        cache_rows: скільки рядків відстаней до цілей тримати в LRU-кеші
+        """
+        self.graph = graph
+        self.width = graph.width
+        self.height = graph.height
+        self.level_number = level_number
+        self.ghost_speed = ghost_speed
+        self.num_ghosts = num_ghosts
+        self.offsets = attack_offsets(num_ghosts) if num_ghosts else ()
+        self.ghost_bits = max(1, (graph.size - 1).bit_length())  # Біт на id клітинки одного привида
+        self.cache_rows = cache_rows
+        self._rows = OrderedDict()  # Ціль -> (рядок відстаней, черга BFS для дообчислення)
+        self.deadline = None  # Момент time.perf_counter(), після якого пошук переривається
+
+    @classmethod
+    def from_simulation(cls, simulation):
+        maze = simulation.maze
+        graph = maze.graph if maze.graph is not None else MazeGraph(maze.grid)
+        return cls(graph, simulation.level_number, simulation.ghost_speed, len(simulation.ghosts))
+
+    def distances_to(self, target, cell=None):
+        """
+        Відстані до клітинки target (масив за id, UNREACHABLE - недосяжна або ще не досягнута).
+        BFS від цілі йде рівень за рівнем лише доти, доки не досягнуто cell (None - весь лабіринт);
+        на той момент відомі й усі клітинки, ближчі до цілі, ніж cell. Рядок разом із чергою
+        зберігається в кеші та дообчислюється наступними запитами, зокрема на наступних кроках гри.
+        """
+        entry = self._rows.get(target)
+        if entry is None:
+            # array, а не список: збирач сміття не обходить сотні великих рядків кешу
+            row = array('i', [UNREACHABLE]) * self.graph.size
+            row[target] = 0
+            entry = self._rows[target] = (row, deque([target]))
+            if len(self._rows) > self.cache_rows:
+                self._rows.popitem(last=False)
+        else:
+            self._rows.move_to_end(target)
+        row, queue = entry
+        if not queue or (cell is not None and row[cell] != UNREACHABLE):
+            return row
+
+        adjacency = self.graph.adjacency
+        deadline = self.deadline
+        pops = 0
+        while queue:
+            if cell is not None and row[cell] != UNREACHABLE:
+                break
+            pops += 1
+            if deadline is not None and pops % DEADLINE_CHECK == 0 and time.perf_counter() >= deadline:
+                # Черга і рядок узгоджені, тож побудову можна продовжити пізніше
+                raise SearchTimeout()
+            current = queue.popleft()
+            next_cost = row[current] + 1
+            for neighbor in adjacency[current]:
+                if row[neighbor] == UNREACHABLE:
+                    row[neighbor] = next_cost
+                    queue.append(neighbor)
+        return row
+
+    def ghost_target(self, index, pacman, direction):
+        """
+        Ціль привида з індексом index за правилами GhostHeuristic (id клітинки).
+        """
+        height = self.height
+        px, py = divmod(pacman, height)
+        if self.level_number >= 5:
+            dx, dy = self.offsets[index]
+            x, y = px + dx, py + dy
+            if 0 <= x < self.width and 0 <= y < height and not self.graph.cells[x * height + y]:
+                return x * height + y
+            return pacman
+        if self.level_number >= 3:
+            dx, dy = direction
+            x = max(0, min(px + dx * 2, self.width - 1))
+            y = max(0, min(py + dy * 2, height - 1))
+            return x * height + y
+        return pacman
+
+    def ghost_step(self, cell, target):
+        """
+        Наступна клітинка привида з cell до target (сусід з найменшою відстанню до цілі)
+        або None, якщо привид уже в цілі або ціль - стіна чи недосяжна.
+        """
+        if self.graph.cells[target]:
+            return None
+        row = self.distances_to(target, cell)
+        best = None
+        best_cost = row[cell]
+        if best_cost <= 0:
+            return None
+        for neighbor in self.graph.adjacency[cell]:
+            if 0 <= row[neighbor] < best_cost:
+                best = neighbor
+                best_cost = row[neighbor]
+        return best
+
+
+class GameSnapshot:
+    """
+    Компактний незмінний знімок стану гри для пошуку наперед:
+    - позиція Пакмена - id клітинки (x * height + y, як у MazeGraph);
+    - позиції привидів упаковані в одне ціле по context.ghost_bits біт на привида;
+    - точки - бітова множина в цілому числі (біт id клітинки). Ціле незмінне, тож знімки без
+      з'їдених точок ділять один об'єкт, а статична сітка лежить лише в SnapshotContext.
+    apply(move) повертає новий знімок, не змінюючи поточний. Привиди в знімку детерміновані:
+    вони йдуть найкоротшим шляхом до цілі GhostHeuristic і залишаються на місці, якщо
+    клітинка зайнята іншим привидом (у грі замість цього - випадковий крок).
+    Знімки порівнюються та хешуються за станом (без номера кроку), тож придатні як ключі кешу.
+    """
+    __slots__ = ('context', 'pacman', 'ghosts', 'num_ghosts', 'dots', 'direction', 'move_counter',
+                 'tick', 'result', '_hash')
+
+    def __init__(self, context, pacman, ghosts, num_ghosts, dots, direction=STAY, move_counter=0,
+                 tick=0, result=None):
+        """
+        pacman: id клітинки Пакмена
+        ghosts: упаковані id клітинок привидів (див. pack_ghosts)
+        dots: бітова множина точок
+        direction: останній напрямок руху Пакмена (для прогнозу привидів на рівнях 3-4)
+        move_counter: лічильник ходів привидів (у всіх привидів рівня він однаковий)
+        result: None, 'won' або 'lost'
+        """
+        self.context = context
+        self.pacman = pacman
+        self.ghosts = ghosts
+        self.num_ghosts = num_ghosts
+        self.dots = dots
+        self.direction = direction
+        self.move_counter = move_counter
+        self.tick = tick
+        self.result = result
+        self._hash = None
+
+    @classmethod
+    def capture(cls, simulation, context=None):
+        """
+        Знімок поточного стану Simulation. context можна передати, щоб перевикористати
+        кеш відстаней попередніх знімків того ж рівня.
+        """
+        if context is None:
+            context = SnapshotContext.from_simulation(simulation)
+        return cls.from_pacman(context, simulation.pacman, simulation.tick, simulation.result)
+
+    @classmethod
+    def from_pacman(cls, context, pacman, tick=0, result=None):
+        """
+        Знімок за Пакменом: його лабіринт містить точки, а pacman.ghosts - привидів рівня.
+        """
+        height = context.height
+        # Бітова карта DotStore (байт на клітинку) перетворюється на ціле одним розбором рядка
+        # двійкових цифр: старший біт - остання клітинка
+        bitmap = pacman.maze.dots.bitmap
+        dots = int(bytes(bitmap).translate(BITMAP_DIGITS)[::-1], 2) if bitmap else 0
+        ghosts = pacman.ghosts
+        x, y = pacman.position
+        cells = [gx * height + gy for gx, gy in (ghost.position for ghost in ghosts)]
+        return cls(context, x * height + y, pack_ghosts(cells, context.ghost_bits), len(ghosts), dots,
+                   pacman.direction, ghosts[0].move_counter if ghosts else 0, tick, result)
+
+    def clone(self):
+        # Поля незмінні, тож копія ділить з оригіналом контекст, точки та кеш хешу
+        copy = GameSnapshot(self.context, self.pacman, self.ghosts, self.num_ghosts, self.dots, self.direction,
+                            self.move_counter, self.tick, self.result)
+        copy._hash = self._hash
+        return copy
+
+    def legal_moves(self):
+        """
+        Ходи Пакмена (dx, dy), що не впираються в стіну, та STAY.
+        """
+        graph = self.context.graph
+        height = self.context.height
+        x, y = divmod(self.pacman, height)
+        moves = []
+        for dx, dy in DIRECTIONS:
+            if graph.is_open((x + dx, y + dy)):
+                moves.append((dx, dy))
+        moves.append(STAY)
+        return moves
+
+    def apply(self, move):
+        """
+        Новий знімок після кроку: Пакмен робить хід move (dx, dy), збирає точку, потім
+        рухаються привиди і перевіряються зіткнення та перемога - у тому ж порядку, що й Simulation.step.
+        """
+        if self.result is not None:
+            return self
+        context = self.context
+        height = context.height
+
+        pacman = self.pacman
+        direction = STAY
+        dx, dy = move
+        if move != STAY:
+            x, y = divmod(pacman, height)
+            if context.graph.is_open((x + dx, y + dy)):
+                pacman = (x + dx) * height + y + dy
+                direction = move
+        dots = self.dots
+        bit = 1 << pacman
+        if dots & bit:
+            dots ^= bit
+
+        ghosts = self.ghosts
+        move_counter = self.move_counter + context.ghost_speed
+        if move_counter >= 1:
+            move_counter = 0
+            cells = unpack_ghosts(ghosts, self.num_ghosts, context.ghost_bits)
+            for index, cell in enumerate(cells):
+                next_cell = context.ghost_step(cell, context.ghost_target(index, pacman, direction))
+                if next_cell is not None and next_cell not in cells:
+                    cells[index] = next_cell
+            ghosts = pack_ghosts(cells, context.ghost_bits)
+
+        result = None
+        if self.num_ghosts and pacman in unpack_ghosts(ghosts, self.num_ghosts, context.ghost_bits):
+            result = 'lost'
+        elif not dots:
+            result = 'won'
+        return GameSnapshot(context, pacman, ghosts, self.num_ghosts, dots, direction, move_counter,
+                            self.tick + 1, result)
+
+    @property
+    def key(self):
+        # Стан без номера кроку: однакові позиції та точки на різних кроках - той самий вузол пошуку
+        return (self.pacman, self.ghosts, self.dots, self.direction, self.move_counter, self.result)
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(self.key)
+        return self._hash
+
+    def __eq__(self, other):
+        if not isinstance(other, GameSnapshot):
+            return NotImplemented
+        return self.context is other.context and self.key == other.key
+
+    @property
+    def pacman_position(self):
+        return divmod(self.pacman, self.context.height)
+
+    @property
+    def ghost_positions(self):
+        context = self.context
+        cells = unpack_ghosts(self.ghosts, self.num_ghosts, context.ghost_bits)
+        return [divmod(cell, context.height) for cell in cells]
+
+    @property
+    def dots_left(self):
+        return popcount(self.dots)
+
+    def has_dot(self, position):
+        x, y = position
+        return bool(self.dots >> (x * self.context.height + y) & 1)
+
+    @property
+    def is_over(self):
+        return self.result is not None
+
+
+def pack_ghosts(cells, bits):
+    """
+    Упаковка id клітинок привидів в одне ціле (привид i - біти [i * bits, (i + 1) * bits)).
+    """
+    packed = 0
+    for i, cell in enumerate(cells):
+        packed |= cell << (i * bits)
+    return packed
+
+
+def unpack_ghosts(packed, count, bits):
+    mask = (1 << bits) - 1
+    return [(packed >> (i * bits)) & mask for i in range(count)]
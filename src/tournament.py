@@ -0,0 +1,293 @@
+# src/tournament.py
+
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pathfinding.stats import SearchStatsAggregator
+from src.simulation import Simulation
+
+
+SUMMARY_FIELDS = [
+    'level', 'episodes', 'wins', 'losses', 'timeouts', 'win_rate',
+    'mean_ticks_to_death', 'mean_dots_eaten', 'mean_dots_fraction',
+    'total_ticks', 'wall_clock_per_tick_us'
+]
+
+
+# Розрядність полів зерна епізоду: разом 63 біти, тож зерно вміщується в знакове 64-бітне поле пакета рівнів
+SEED_BITS = 23
+LEVEL_BITS = 16
+EPISODE_BITS = 24
+
+
+def episode_seed(base_seed, level_number, episode):
+    """
+    Детерміноване зерно епізоду: однакові (base_seed, рівень, епізод) завжди дають
+    ту саму гру незалежно від кількості процесів та порядку виконання.
+    Поля пакуються в окремі біти, тож значення поза своїм діапазоном відхиляються (ValueError),
+    а не перекривають сусіднє поле.
+    """
+    for name, value, bits in (('зерно', base_seed, SEED_BITS), ('рівень', level_number, LEVEL_BITS),
+                              ('епізод', episode, EPISODE_BITS)):
+        if not 0 <= value < 1 << bits:
+            raise ValueError(f"{name} {value} поза межами [0, {1 << bits}) для зерна епізоду")
+    return (base_seed << (LEVEL_BITS + EPISODE_BITS)) | (level_number << EPISODE_BITS) | episode
+
+
+def check_episode_seeds(base_seed, levels, episodes):
+    """
+    Перевірка, що для всіх рівнів і епізодів турніру зерна епізодів коректні (ValueError, якщо ні).
+    """
+    for level_number in (min(levels), max(levels)):
+        episode_seed(base_seed, level_number, max(episodes - 1, 0))
+
+
+_level_packs = {}  # Шлях -> LevelPack, відкритий у цьому процесі
+
+
+def open_level_pack(path):
+    """
+    Пакет рівнів відкривається (відображається у пам'ять) один раз на процес.
+    """
+    from src.level_pack import LevelPack
+    pack = _level_packs.get(path)
+    if pack is None:
+        pack = _level_packs[path] = LevelPack(path)
+    return pack
+
+
+def run_episode(task):
+    """
+    Прогін одного епізоду в headless-симуляції. Виконується в окремому процесі.
+    task: кортеж (level_number, episode, seed, max_ticks, options, collect_search_stats),
+          де options - іменовані параметри Simulation (level_pack - шлях до пакета рівнів)
+    """
+    level_number, episode, seed, max_ticks, options, collect_search_stats = task
+    if options.get('level_pack'):
+        options = dict(options, level_pack=open_level_pack(options['level_pack']))
+    search_stats = SearchStatsAggregator() if collect_search_stats else None
+    simulation = Simulation(level_number, search_stats=search_stats, **options)
+    simulation.start(seed=seed)
+    started = time.perf_counter()
+    result = simulation.run(max_ticks)
+    elapsed = time.perf_counter() - started
+    record = {
+        'level': level_number,
+        'episode': episode,
+        'seed': seed,
+        'result': result or 'timeout',
+        'ticks': simulation.tick,
+        'dots_eaten': simulation.dots_eaten,
+        'dots_total': simulation.dots_total,
+        'wall_time': elapsed,
+    }
+    if simulation.pacman.planner is not None:
+        record['planner'] = simulation.pacman.planner.summary()
+    if simulation.scheduler is not None:
+        record['scheduler'] = simulation.scheduler.summary()
+    return record, search_stats
+
+
+def summarize(episodes):
+    """
+    Агрегування результатів епізодів по рівнях.
+    """
+    by_level = {}
+    for record in episodes:
+        by_level.setdefault(record['level'], []).append(record)
+
+    summary = []
+    for level_number in sorted(by_level):
+        records = by_level[level_number]
+        wins = sum(1 for r in records if r['result'] == 'won')
+        losses = [r for r in records if r['result'] == 'lost']
+        total_ticks = sum(r['ticks'] for r in records)
+        total_time = sum(r['wall_time'] for r in records)
+        summary.append({
+            'level': level_number,
+            'episodes': len(records),
+            'wins': wins,
+            'losses': len(losses),
+            'timeouts': sum(1 for r in records if r['result'] == 'timeout'),
+            'win_rate': wins / len(records),
+            'mean_ticks_to_death': sum(r['ticks'] for r in losses) / len(losses) if losses else None,
+            'mean_dots_eaten': sum(r['dots_eaten'] for r in records) / len(records),
+            'mean_dots_fraction': sum(r['dots_eaten'] / r['dots_total'] for r in records if r['dots_total']) / len(records),
+            'total_ticks': total_ticks,
+            'wall_clock_per_tick_us': total_time / total_ticks * 1e6 if total_ticks else None,
+        })
+    return summary
+
+
+def write_report(path, summary, episodes, config, search_stats=None):
+    if path.endswith('.csv'):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+            writer.writeheader()
+            writer.writerows(summary)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            report = {'config': config, 'summary': summary, 'episodes': episodes}
+            if search_stats is not None:
+                report['search_stats'] = search_stats.summary()
+            json.dump(report, f, indent=2)
+
+
+def print_summary(summary):
+    print(f"{'рівень':>6} {'ігор':>6} {'перемоги':>9} {'сер. кроків до смерті':>22} {'сер. точок':>11} {'мкс/крок':>9}")
+    for row in summary:
+        ticks_to_death = row['mean_ticks_to_death']
+        per_tick = row['wall_clock_per_tick_us']
+        print(f"{row['level']:>6} {row['episodes']:>6} {row['win_rate']:>9.1%} "
+              f"{ticks_to_death if ticks_to_death is not None else float('nan'):>22.1f} "
+              f"{row['mean_dots_eaten']:>11.1f} {per_tick if per_tick is not None else float('nan'):>9.1f}")
+
+
+def print_planner_summary(episodes):
+    # Глибина та кількість вузлів планувальника Пакмена на крок по рівнях
+    by_level = {}
+    for record in episodes:
+        if 'planner' in record:
+            by_level.setdefault(record['level'], []).append(record['planner'])
+    for level_number in sorted(by_level):
+        rows = by_level[level_number]
+        ticks = sum(row['ticks'] for row in rows) or 1
+        mean_depth = sum(row['mean_depth'] * row['ticks'] for row in rows) / ticks
+        mean_nodes = sum(row['mean_nodes'] * row['ticks'] for row in rows) / ticks
+        print(f"Планувальник, рівень {level_number}: сер. глибина {mean_depth:.1f}, "
+              f"макс. глибина {max(row['max_depth'] for row in rows)}, сер. вузлів {mean_nodes:.0f}, "
+              f"найдовший крок {max(row['max_elapsed_ms'] for row in rows):.2f} мс")
+
+
+def print_scheduler_summary(episodes):
+    # Робота ШІ, відкладена планувальником кадру, по рівнях
+    by_level = {}
+    for record in episodes:
+        if 'scheduler' in record:
+            by_level.setdefault(record['level'], []).append(record['scheduler'])
+    for level_number in sorted(by_level):
+        rows = by_level[level_number]
+        ticks = sum(row['ticks'] for row in rows) or 1
+        mean_ms = sum(row['mean_ms'] * row['ticks'] for row in rows) / ticks
+        print(f"Планувальник ШІ, рівень {level_number}: сер. {mean_ms:.2f} мс, "
+              f"макс. {max(row['max_ms'] for row in rows):.2f} мс, "
+              f"кроків понад бюджет {sum(row['over_budget_ticks'] for row in rows)}, "
+              f"планів {sum(row['replans'] for row in rows)}, за старим шляхом {sum(row['reused'] for row in rows)}, "
+              f"відкладено {sum(row['deferred'] for row in rows)}, вимушених {sum(row['forced'] for row in rows)}, "
+              f"за таблицею {sum(row['lookups'] for row in rows)}")
+
+
+def run_tournament(levels, episodes, base_seed=0, max_ticks=5000, workers=None, options=None,
+                   collect_search_stats=False):
+    """
+    Прогін episodes епізодів для кожного рівня на пулі процесів.
+    Повертає (список результатів епізодів, SearchStatsAggregator або None).
+    """
+    options = options or {}
+    tasks = [
+        (level_number, episode, episode_seed(base_seed, level_number, episode), max_ticks, options,
+         collect_search_stats)
+        for level_number in levels
+        for episode in range(episodes)
+    ]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (workers * 8))
+    results = []
+    search_stats = SearchStatsAggregator() if collect_search_stats else None
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for record, episode_stats in executor.map(run_episode, tasks, chunksize=chunksize):
+            results.append(record)
+            if episode_stats is not None:
+                search_stats.merge(episode_stats)
+    return results, search_stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Паралельний прогін сідованих епізодів Pac-Man без вікна")
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 2, 3, 4, 5], help="Номери рівнів")
+    parser.add_argument('--episodes', type=int, default=100, help="Кількість епізодів на рівень")
+    parser.add_argument('--seed', type=int, default=0, help="Базове зерно для відтворюваності")
+    parser.add_argument('--max-ticks', type=int, default=5000, help="Ліміт кроків на епізод (далі - timeout)")
+    parser.add_argument('--workers', type=int, default=None, help="Кількість процесів (за замовчуванням - усі ядра)")
+    parser.add_argument('--distance-table', action='store_true',
+                        help="Будувати таблицю відстаней для кожного рівня замість пошуку на кожному кроці")
+    parser.add_argument('--flow-field', action='store_true',
+                        help="Привиди використовують спільні карти відстаней (один BFS на ціль)")
+    parser.add_argument('--incremental-planner', action='store_true',
+                        help="Привиди перевикористовують дерево пошуку між ходами замість нового пошуку")
+    parser.add_argument('--batched-ghosts', action='store_true',
+                        help="Усі привиди рухаються одним пакетним проходом (GhostController)")
+    parser.add_argument('--planner-budget-ms', type=float, default=None,
+                        help="Пакмен обирає хід пошуком наперед з цим лімітом часу на крок (мс)")
+    parser.add_argument('--ai-budget-ms', type=float, default=None,
+                        help="Бюджет часу ШІ на крок (мс): перепланування привидів розносяться по кроках")
+    parser.add_argument('--weighted-danger', action='store_true',
+                        help="Пакмен оцінює небезпеку в кроках гри з урахуванням швидкості привидів")
+    parser.add_argument('--maze-generator', choices=['backtracker', 'vectorized'], default=None,
+                        help="Генератор лабіринту (за замовчуванням - з конфігурації рівня)")
+    parser.add_argument('--level-pack', default=None,
+                        help="Пакет рівнів (python -m src.level_pack build ... --tournament-seed): "
+                             "рівні з пакета не генеруються")
+    parser.add_argument('--search-stats', action='store_true',
+                        help="Збирати статистику пошуків (розкриті вершини, фронт, час) по алгоритмах")
+    parser.add_argument('--output', default='tournament_report.json', help="Файл звіту (.json або .csv)")
+    args = parser.parse_args(argv)
+    try:
+        check_episode_seeds(args.seed, args.levels, args.episodes)
+    except ValueError as e:
+        parser.error(str(e))
+
+    started = time.perf_counter()
+    options = {
+        'use_distance_table': args.distance_table,
+        'use_flow_field': args.flow_field,
+        'use_incremental_planner': args.incremental_planner,
+        'use_batched_ghosts': args.batched_ghosts,
+        'planner_budget_ms': args.planner_budget_ms,
+        'ai_budget_ms': args.ai_budget_ms,
+        'weighted_danger': args.weighted_danger,
+        'maze_generator': args.maze_generator,
+        'level_pack': args.level_pack,
+    }
+    episodes, search_stats = run_tournament(args.levels, args.episodes, args.seed, args.max_ticks, args.workers,
+                                            options, args.search_stats)
+    elapsed = time.perf_counter() - started
+
+    summary = summarize(episodes)
+    config = {
+        'levels': args.levels,
+        'episodes': args.episodes,
+        'seed': args.seed,
+        'max_ticks': args.max_ticks,
+        'distance_table': args.distance_table,
+        'flow_field': args.flow_field,
+        'incremental_planner': args.incremental_planner,
+        'batched_ghosts': args.batched_ghosts,
+        'planner_budget_ms': args.planner_budget_ms,
+        'ai_budget_ms': args.ai_budget_ms,
+        'weighted_danger': args.weighted_danger,
+        'maze_generator': args.maze_generator,
+        'level_pack': args.level_pack,
+        'search_stats': args.search_stats,
+        'workers': args.workers or os.cpu_count(),
+        'wall_time': elapsed,
+    }
+    write_report(args.output, summary, episodes, config, search_stats)
+    print_summary(summary)
+    if args.planner_budget_ms is not None:
+        print_planner_summary(episodes)
+    if args.ai_budget_ms is not None:
+        print_scheduler_summary(episodes)
+    if search_stats is not None:
+        for algorithm, row in search_stats.summary().items():
+            print(f"{algorithm}: пошуків {row['searches']}, сер. розкрито {row['mean_nodes_expanded']:.1f}, "
+                  f"пік фронту {row['peak_frontier']}, сер. час {row['mean_elapsed_ms']:.3f} мс")
+    print(f"Зіграно {len(episodes)} ігор за {elapsed:.1f} с, звіт: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,49 @@
 
 import pygame
 import os
+from collections import OrderedDict
+
+
+class AssetManager:
+    """
+    Зображення гри з кешем масштабованих копій.
+    assets['name'] повертає зображення базового розміру (30x30), як і раніше;
+    scaled('name', size) - копію розміру size x size, масштабовану з оригіналу один раз
+    і збережену в LRU-кеші на cache_size поверхонь.
+    """
+
+    def __init__(self, originals, base_size=(30, 30), cache_size=64):
+        self.originals = originals  # Зображення в оригінальному розмірі файлу
+        self.base = {name: pygame.transform.scale(image, base_size) for name, image in originals.items()}
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+
+    def __getitem__(self, name):
+        return self.base[name]
+
+    def __contains__(self, name):
+        return name in self.base
+
+    def get(self, name, default=None):
+        return self.base.get(name, default)
+
+    def keys(self):
+        return self.base.keys()
+
+    def scaled(self, name, size):
+        """
+        Зображення name розміром size x size пікселів.
+        """
+        key = (name, int(size))
+        image = self.cache.get(key)
+        if image is not None:
+            self.cache.move_to_end(key)
+            return image
+        image = pygame.transform.scale(self.originals[name], (key[1], key[1]))
+        self.cache[key] = image
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return image
 
 
 def load_assets():
@@ -12,30 +55,14 @@ def load_assets():
         # Формуємо шлях до папки з зображеннями
         images_path = os.path.join(base_path, '..', 'assets', 'images')
 
-        # Бажаний розмір зображень
-        image_size = (30, 30)
-
-        # Завантаження та масштабування зображень
+        # Завантаження зображень (масштабування - в AssetManager)
         assets['pacman'] = pygame.image.load(os.path.join(images_path, 'pacman.png')).convert_alpha()
-        assets['pacman'] = pygame.transform.scale(assets['pacman'], image_size)
-
         assets['ghost_red'] = pygame.image.load(os.path.join(images_path, 'ghost_red.png')).convert_alpha()
-        assets['ghost_red'] = pygame.transform.scale(assets['ghost_red'], image_size)
-
         assets['ghost_pink'] = pygame.image.load(os.path.join(images_path, 'ghost_pink.png')).convert_alpha()
-        assets['ghost_pink'] = pygame.transform.scale(assets['ghost_pink'], image_size)
-
         assets['ghost_blue'] = pygame.image.load(os.path.join(images_path, 'ghost_blue.png')).convert_alpha()
-        assets['ghost_blue'] = pygame.transform.scale(assets['ghost_blue'], image_size)
-
         assets['ghost_orange'] = pygame.image.load(os.path.join(images_path, 'ghost_orange.png')).convert_alpha()
-        assets['ghost_orange'] = pygame.transform.scale(assets['ghost_orange'], image_size)
-
         assets['maze_tiles'] = pygame.image.load(os.path.join(images_path, 'maze_tiles.png')).convert_alpha()
-        assets['maze_tiles'] = pygame.transform.scale(assets['maze_tiles'], image_size)
-
         assets['dot'] = pygame.image.load(os.path.join(images_path, 'dot.png')).convert_alpha()
-        assets['dot'] = pygame.transform.scale(assets['dot'], image_size)
 
         # Завантаження звуків та інших ресурсів за потреби
         # Приклад:
@@ -44,4 +71,4 @@ def load_assets():
         print(f"Помилка завантаження ресурсу: {e}")
     except FileNotFoundError as e:
         print(f"Файл не знайдено: {e}")
-    return assets
+    return AssetManager(assets)
@@ -0,0 +1,361 @@
+# src/vec_env.py
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from ai.heuristics import attack_offsets
+from pathfinding.distance_table import DIRECTIONS, UNREACHABLE
+from src.simulation import Simulation
+
+# Дії Пакмена: індекси DIRECTIONS (вліво, вправо, вгору, вниз) та STAY - залишитися на місці
+STAY = len(DIRECTIONS)
+ACTION_DELTAS = np.array(DIRECTIONS + [(0, 0)], dtype=np.int64)
+
+# Результати епізодів (results після step)
+PLAYING, WON, LOST, TIMEOUT = 0, 1, 2, 3
+
+DOT_REWARD = 1.0
+WIN_REWARD = 10.0
+LOSE_REWARD = -10.0
+
+DEFAULT_POOL_SIZE = 64  # Найбільша кількість різних рівнів пулу за замовчуванням (ігри ділять рівні пулу)
+POOL_MEMORY_LIMIT = 1024 * 1024 * 1024  # Бюджет пам'яті на складені таблиці відстаней пулу (байти)
+
+
+class LevelPool:
+    """
+    Набір згенерованих рівнів одного номера, складених у масиви NumPy однакової форми:
+    сітки, точки, стартові позиції та таблиці відстаней (доповнені до найбільшої кількості клітинок).
+    Рівні будуються тим самим LevelGenerator, що й у грі (через Simulation.prepare).
+    Складені таблиці відстаней займають count * max_cells² * 2 байти; якщо це більше за
+    memory_limit, пул не будується (ValueError) - варто зменшити кількість рівнів.
+    """
+
+    def __init__(self, level_number, seeds, maze_generator=None, memory_limit=POOL_MEMORY_LIMIT):
+        """
+        seeds: зерна рівнів пулу (по одному рівню на зерно)
+        memory_limit: найбільший розмір складених таблиць відстаней у байтах
+        """
+        levels = []
+        max_cells = 0
+        for seed in seeds:
+            simulation = Simulation(level_number, use_distance_table=True, maze_generator=maze_generator)
+            prepared = simulation.prepare(level_number, seed)
+            table = prepared.maze.distance_table
+            if not table.is_full:
+                raise ValueError(f"Таблиця відстаней рівня {level_number} не вміщується в пам'ять, "
+                                 f"векторне середовище підтримує лише повні таблиці")
+            # Перевірка до побудови решти рівнів: розмір пулу за найбільшою таблицею лише зростатиме
+            max_cells = max(max_cells, table.size)
+            required = len(seeds) * max_cells * max_cells * np.dtype(np.uint16).itemsize
+            if required > memory_limit:
+                raise ValueError(f"Таблиці відстаней {len(seeds)} рівнів {level_number} потребують "
+                                 f"{required / 2 ** 20:.0f} МБ (ліміт {memory_limit / 2 ** 20:.0f} МБ), "
+                                 f"зменште розмір пулу")
+            levels.append(prepared)
+
+        count = len(levels)
+        maze = levels[0].maze
+        self.level_number = level_number
+        self.width = maze.width
+        self.height = maze.height
+        self.max_ghosts = max(len(level.ghosts) for level in levels)
+        self.max_cells = max(level.maze.distance_table.size for level in levels)
+
+        self.walls = np.zeros((count, self.height, self.width), dtype=np.uint8)  # [рівень, y, x]: 1 - стіна
+        self.dots = np.zeros((count, self.height, self.width), dtype=np.uint8)  # 1 - у клітинці є точка
+        self.dots_total = np.zeros(count, dtype=np.int64)
+        self.cell_ids = np.empty((count, self.height, self.width), dtype=np.int32)  # -1 - стіна
+        self.neighbors = np.full((count, self.max_cells, len(DIRECTIONS)), -1, dtype=np.int32)
+        self.dist = np.full((count, self.max_cells, self.max_cells), UNREACHABLE, dtype=np.uint16)
+        self.pacman_positions = np.empty((count, 2), dtype=np.int64)
+        self.ghost_positions = np.zeros((count, self.max_ghosts, 2), dtype=np.int64)
+        self.ghost_mask = np.zeros((count, self.max_ghosts), dtype=bool)  # False - привида немає
+        self.attack_offsets = np.zeros((count, self.max_ghosts, 2), dtype=np.int64)
+        self.ghost_speeds = np.empty(count, dtype=np.float64)
+
+        for i, level in enumerate(levels):
+            maze = level.maze
+            table = maze.distance_table
+            self.walls[i] = np.asarray(maze.grid, dtype=np.uint8)
+            # Бітова карта DotStore індексується як x * height + y
+            self.dots[i] = np.frombuffer(bytes(maze.dots.bitmap), dtype=np.uint8).reshape(self.width, self.height).T
+            self.dots_total[i] = len(maze.dots)
+            self.cell_ids[i] = table.cell_ids
+            self.neighbors[i, :table.size] = table.neighbors
+            self.dist[i, :table.size, :table.size] = table.dist
+            self.pacman_positions[i] = level.pacman.position
+            ghosts = level.ghosts
+            if ghosts:
+                self.ghost_positions[i, :len(ghosts)] = [ghost.position for ghost in ghosts]
+                self.ghost_mask[i, :len(ghosts)] = True
+                self.attack_offsets[i, :len(ghosts)] = attack_offsets(len(ghosts))
+            self.ghost_speeds[i] = level.ghost_speed
+
+    def __len__(self):
+        return len(self.dots_total)
+
+
+class VecEnv:
+    """
+    Векторне середовище в стилі Gym: num_envs незалежних ігор одного рівня, стан яких зберігається
+    в пакетних масивах NumPy, а один виклик step(actions) просуває всі ігри на крок.
+    Пакмен керується діями агента, привиди - правилами GhostHeuristic (ціль за номером рівня,
+    крок до неї за таблицею відстаней, заборона повертатися на попередню клітинку та ставати
+    на зайняту, інакше - випадковий крок). Привиди рухаються по черзі за індексом, як у Simulation,
+    але кожен крок привида векторизовано по всіх середовищах.
+    Ігри ділять рівні пулу (pool_size рівнів на num_envs ігор), тож пам'ять на таблиці відстаней
+    не зростає з кількістю ігор. Завершені ігри одразу починаються заново з випадкового рівня пулу.
+    """
+
+    def __init__(self, num_envs, level_number=1, seed=None, pool_size=None, max_steps=1000,
+                 maze_generator=None):
+        """
+        num_envs: кількість одночасних ігор
+        level_number: номер рівня (усі ігри мають однакові розміри лабіринту)
+        seed: зерно для генерації рівнів пулу та випадкових рішень (None - недетерміновано)
+        pool_size: скільки різних рівнів згенерувати заздалегідь
+                   (None - min(num_envs, DEFAULT_POOL_SIZE); кілька ігор можуть грати той самий рівень)
+        max_steps: ліміт кроків епізоду (епізод завершується з результатом TIMEOUT)
+        maze_generator: 'backtracker' або 'vectorized' (None - як задано в конфігурації рівня)
+        """
+        self.num_envs = num_envs
+        self.max_steps = max_steps
+        seeds_rng = random.Random(seed)
+        if pool_size is None:
+            pool_size = min(num_envs, DEFAULT_POOL_SIZE)
+        level_seeds = [seeds_rng.getrandbits(63) if seed is not None else None
+                       for _ in range(pool_size)]
+        self.pool = LevelPool(level_number, level_seeds, maze_generator)
+        self.rng = np.random.default_rng(seed)
+        self.level_number = level_number
+        self.width = self.pool.width
+        self.height = self.pool.height
+        self.env_indices = np.arange(num_envs)
+
+        shape = (num_envs, self.height, self.width)
+        ghosts = self.pool.max_ghosts
+        self.levels = np.zeros(num_envs, dtype=np.int64)  # Індекс рівня пулу для кожної гри
+        self.walls = np.zeros(shape, dtype=np.uint8)
+        self.dots = np.zeros(shape, dtype=np.uint8)
+        self.dots_left = np.zeros(num_envs, dtype=np.int64)
+        self.pacman_positions = np.zeros((num_envs, 2), dtype=np.int64)
+        self.pacman_directions = np.zeros((num_envs, 2), dtype=np.int64)
+        self.ghost_positions = np.zeros((num_envs, ghosts, 2), dtype=np.int64)
+        self.ghost_mask = np.zeros((num_envs, ghosts), dtype=bool)
+        self.ghost_counters = np.zeros((num_envs, ghosts), dtype=np.float64)  # move_counter привидів
+        # Передостання записана позиція привида (-1 - ще немає): остання - це поточна позиція,
+        # тож заборона "двох останніх позицій" з Ghost.update зводиться до неї
+        self.ghost_trails = np.full((num_envs, ghosts, 2), -1, dtype=np.int64)
+        self.ghost_moved = np.zeros((num_envs, ghosts), dtype=bool)  # Чи є записана поточна позиція
+        self.attack_offsets = np.zeros((num_envs, ghosts, 2), dtype=np.int64)
+        self.ghost_speeds = np.zeros(num_envs, dtype=np.float64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        self.results = np.zeros(num_envs, dtype=np.int8)  # Результат кроку: PLAYING, WON, LOST або TIMEOUT
+
+        # Спостереження - ті самі масиви, що й стан: step() оновлює їх на місці, без копіювання
+        self.observations = {
+            'walls': self.walls,
+            'dots': self.dots,
+            'pacman': self.pacman_positions,
+            'ghosts': self.ghost_positions,
+            'ghost_mask': self.ghost_mask,
+        }
+
+    def reset(self):
+        """
+        Початок нових епізодів у всіх іграх. Повертає спостереження.
+        """
+        self.reset_envs(self.env_indices)
+        return self.observations
+
+    def reset_envs(self, envs):
+        # Кожна гра отримує випадковий рівень пулу
+        pool = self.pool
+        levels = self.rng.integers(len(pool), size=len(envs))
+        self.levels[envs] = levels
+        self.walls[envs] = pool.walls[levels]
+        self.dots[envs] = pool.dots[levels]
+        self.dots_left[envs] = pool.dots_total[levels]
+        self.pacman_positions[envs] = pool.pacman_positions[levels]
+        self.pacman_directions[envs] = 0
+        self.ghost_positions[envs] = pool.ghost_positions[levels]
+        self.ghost_mask[envs] = pool.ghost_mask[levels]
+        self.ghost_counters[envs] = 0
+        self.ghost_trails[envs] = -1
+        self.ghost_moved[envs] = False
+        self.attack_offsets[envs] = pool.attack_offsets[levels]
+        self.ghost_speeds[envs] = pool.ghost_speeds[levels]
+        self.steps[envs] = 0
+
+    def step(self, actions):
+        """
+        Один крок усіх ігор.
+        actions: масив num_envs дій (індекс DIRECTIONS або STAY)
+        Повертає (observations, rewards, dones). Масиви перезаписуються наступним кроком;
+        для завершених ігор results містить результат, а спостереження - вже новий епізод.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f"Очікується {self.num_envs} дій, отримано масив форми {actions.shape}")
+        if actions.size and (actions.min() < 0 or actions.max() > STAY):
+            raise ValueError(f"Дії мають бути в діапазоні 0..{STAY}")
+
+        envs = self.env_indices
+        self.rewards[:] = 0
+        self.steps += 1
+
+        # Пакмен: крок у вибраному напрямку, якщо там не стіна, і збір точки
+        deltas = ACTION_DELTAS[actions]
+        xs = self.pacman_positions[:, 0] + deltas[:, 0]
+        ys = self.pacman_positions[:, 1] + deltas[:, 1]
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        xs = np.where(inside, xs, 0)
+        ys = np.where(inside, ys, 0)
+        moved = inside & (self.walls[envs, ys, xs] == 0)
+        self.pacman_positions[moved, 0] = xs[moved]
+        self.pacman_positions[moved, 1] = ys[moved]
+        self.pacman_directions[:] = np.where(moved[:, None], deltas, 0)
+        px = self.pacman_positions[:, 0]
+        py = self.pacman_positions[:, 1]
+        eaten = self.dots[envs, py, px] == 1
+        self.dots[envs[eaten], py[eaten], px[eaten]] = 0
+        self.dots_left -= eaten
+        self.rewards += eaten * DOT_REWARD
+
+        # Привиди по черзі за індексом: зайнятість бачить уже зроблені цього кроку ходи
+        for ghost in range(self.ghost_positions.shape[1]):
+            self.step_ghost(ghost)
+
+        # Зіткнення перевіряється після ходу привидів, перемога - лише якщо Пакмена не спіймано
+        caught = (self.ghost_mask & (self.ghost_positions == self.pacman_positions[:, None, :]).all(axis=2)).any(axis=1)
+        won = ~caught & (self.dots_left == 0)
+        timeout = ~caught & ~won & (self.steps >= self.max_steps)
+        self.results[:] = PLAYING
+        self.results[won] = WON
+        self.results[caught] = LOST
+        self.results[timeout] = TIMEOUT
+        self.rewards += won * WIN_REWARD + caught * LOSE_REWARD
+        np.not_equal(self.results, PLAYING, out=self.dones)
+
+        finished = np.flatnonzero(self.dones)
+        if finished.size:
+            self.reset_envs(finished)
+        return self.observations, self.rewards, self.dones
+
+    def ghost_targets(self, ghost):
+        """
+        Цілі привида з індексом ghost у всіх іграх (правила GhostHeuristic.get_target).
+        """
+        px = self.pacman_positions[:, 0]
+        py = self.pacman_positions[:, 1]
+        if self.level_number >= 5:
+            # Оточення: зсув навколо Пакмена за індексом привида, якщо там не стіна
+            xs = px + self.attack_offsets[:, ghost, 0]
+            ys = py + self.attack_offsets[:, ghost, 1]
+            inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+            valid = inside & (self.walls[self.env_indices, np.where(inside, ys, 0), np.where(inside, xs, 0)] == 0)
+            return np.where(valid, xs, px), np.where(valid, ys, py)
+        if self.level_number >= 3:
+            # Прогноз на два кроки вперед у напрямку руху Пакмена
+            xs = np.clip(px + self.pacman_directions[:, 0] * 2, 0, self.width - 1)
+            ys = np.clip(py + self.pacman_directions[:, 1] * 2, 0, self.height - 1)
+            return xs, ys
+        return px, py
+
+    def step_ghost(self, ghost):
+        self.ghost_counters[:, ghost] += self.ghost_speeds
+        movers = self.ghost_mask[:, ghost] & (self.ghost_counters[:, ghost] >= 1)
+        envs = np.flatnonzero(movers)
+        if not envs.size:
+            return
+        self.ghost_counters[envs, ghost] = 0
+
+        pool = self.pool
+        levels = self.levels[envs]
+        xs = self.ghost_positions[envs, ghost, 0]
+        ys = self.ghost_positions[envs, ghost, 1]
+        target_xs, target_ys = self.ghost_targets(ghost)
+        own_cells = pool.cell_ids[levels, ys, xs]
+        targets = pool.cell_ids[levels, target_ys[envs], target_xs[envs]]
+
+        # Наступний крок - сусід, найближчий до цілі за таблицею відстаней рівня
+        valid = (own_cells >= 0) & (targets >= 0)
+        cells = np.where(valid, own_cells, 0)
+        targets = np.where(valid, targets, 0)
+        neighbors = pool.neighbors[levels, cells]
+        distances = np.where(neighbors >= 0,
+                             pool.dist[levels[:, None], targets[:, None], np.maximum(neighbors, 0)], UNREACHABLE)
+        best = distances.argmin(axis=1)
+        own_distance = pool.dist[levels, targets, cells]
+        chasing = valid & (own_distance != UNREACHABLE) & (own_distance > 0) \
+            & (distances[np.arange(len(envs)), best] < own_distance)
+        deltas = ACTION_DELTAS[best]
+        next_xs = xs + deltas[:, 0]
+        next_ys = ys + deltas[:, 1]
+
+        # Інші привиди тієї ж гри (для перевірки зайнятості)
+        others = self.ghost_mask[envs].copy()
+        others[:, ghost] = False
+        other_positions = self.ghost_positions[envs]
+
+        occupied = (others & (other_positions[:, :, 0] == next_xs[:, None])
+                    & (other_positions[:, :, 1] == next_ys[:, None])).any(axis=1)
+        returning = (self.ghost_trails[envs, ghost, 0] == next_xs) & (self.ghost_trails[envs, ghost, 1] == next_ys)
+        chasing &= ~occupied & ~returning
+
+        # Інакше - випадковий крок у вільну прохідну клітинку (або залишитися на місці)
+        neighbor_xs = xs[:, None] + ACTION_DELTAS[None, :STAY, 0]
+        neighbor_ys = ys[:, None] + ACTION_DELTAS[None, :STAY, 1]
+        free = (pool.neighbors[levels, np.maximum(own_cells, 0)] >= 0) & (own_cells >= 0)[:, None]
+        free &= ~(others[:, None, :] & (other_positions[:, None, :, 0] == neighbor_xs[:, :, None])
+                  & (other_positions[:, None, :, 1] == neighbor_ys[:, :, None])).any(axis=2)
+        priorities = np.where(free, self.rng.random((len(envs), STAY)), -1.0)
+        choice = priorities.argmax(axis=1)
+        wandering = ~chasing & free[np.arange(len(envs)), choice]
+
+        moving = chasing | wandering
+        new_xs = np.where(chasing, next_xs, neighbor_xs[np.arange(len(envs)), choice])
+        new_ys = np.where(chasing, next_ys, neighbor_ys[np.arange(len(envs)), choice])
+        moved_envs = envs[moving]
+        self.ghost_trails[moved_envs, ghost] = np.where(self.ghost_moved[moved_envs, ghost][:, None],
+                                                        self.ghost_positions[moved_envs, ghost], -1)
+        self.ghost_moved[moved_envs, ghost] = True
+        self.ghost_positions[moved_envs, ghost, 0] = new_xs[moving]
+        self.ghost_positions[moved_envs, ghost, 1] = new_ys[moving]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Вимірювання швидкості векторного середовища з випадковими діями")
+    parser.add_argument('--envs', type=int, default=1024, help="Кількість одночасних ігор")
+    parser.add_argument('--level', type=int, default=1)
+    parser.add_argument('--steps', type=int, default=1000, help="Кількість викликів step")
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE, help="Кількість різних рівнів у пулі")
+    parser.add_argument('--max-steps', type=int, default=1000, help="Ліміт кроків епізоду")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    env = VecEnv(args.envs, args.level, args.seed, args.pool_size, args.max_steps)
+    env.reset()
+    print(f"Пул з {len(env.pool)} рівнів побудовано за {time.perf_counter() - started:.2f} с")
+
+    rng = np.random.default_rng(args.seed)
+    counts = np.zeros(4, dtype=np.int64)
+    started = time.perf_counter()
+    for _ in range(args.steps):
+        _, _, dones = env.step(rng.integers(STAY + 1, size=args.envs))
+        counts += np.bincount(env.results[dones], minlength=4)
+    elapsed = time.perf_counter() - started
+    total = args.envs * args.steps
+    print(f"{total} кроків за {elapsed:.2f} с: {total / elapsed:,.0f} кроків/с")
+    print(f"Завершено епізодів: перемог {counts[WON]}, поразок {counts[LOST]}, за лімітом {counts[TIMEOUT]}")
+
+
+if __name__ == "__main__":
+    main()
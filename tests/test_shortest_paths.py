@@ -0,0 +1,71 @@
+# tests/test_shortest_paths.py
+
+import random
+
+import pytest
+
+from pathfinding.bfs import bfs_search
+from pathfinding.bidirectional_bfs import bidirectional_bfs_search
+from pathfinding.jps import jps_search
+from pathfinding.maze_graph import MazeGraph
+
+SEEDS = range(300)
+
+
+def random_grid(rng):
+    """
+    Випадкова сітка (0 - прохідна клітинка, 1 - стіна) зі щільністю стін від 0 до 45%.
+    """
+    width = rng.randint(1, 16)
+    height = rng.randint(1, 16)
+    density = rng.uniform(0, 0.45)
+    return [[1 if rng.random() < density else 0 for _ in range(width)] for _ in range(height)]
+
+
+def random_case(seed):
+    """
+    Сітка, старт на вільній клітинці та ціль: вільна клітинка, стіна або відрізана стінами клітинка.
+    """
+    rng = random.Random(seed)
+    grid = random_grid(rng)
+    width, height = len(grid[0]), len(grid)
+    cells = [(x, y) for y in range(height) for x in range(width)]
+    start = rng.choice(cells)
+    grid[start[1]][start[0]] = 0
+    goal = rng.choice(cells)
+    kind = seed % 4  # 0, 3 - довільна ціль, 1 - стіна, 2 - відрізана клітинка
+    if kind == 1 and goal != start:
+        grid[goal[1]][goal[0]] = 1  # Ціль - стіна
+    elif kind == 2 and goal != start:
+        # Ціль відрізана: усі її сусіди - стіни (крім старту, інакше шлях був би в один крок)
+        grid[goal[1]][goal[0]] = 0
+        gx, gy = goal
+        for nx, ny in ((gx + 1, gy), (gx - 1, gy), (gx, gy + 1), (gx, gy - 1)):
+            if 0 <= nx < width and 0 <= ny < height and (nx, ny) != start:
+                grid[ny][nx] = 1
+    return grid, start, goal
+
+
+def assert_valid_path(grid, path, start, goal):
+    assert path[0] == start
+    assert path[-1] == goal
+    for x, y in path:
+        assert grid[y][x] == 0
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        assert abs(x1 - x2) + abs(y1 - y2) == 1
+
+
+@pytest.mark.parametrize('search', [bidirectional_bfs_search, jps_search])
+@pytest.mark.parametrize('use_graph', [False, True], ids=['grid', 'graph'])
+@pytest.mark.parametrize('seed', SEEDS)
+def test_same_length_as_bfs(search, use_graph, seed):
+    grid, start, goal = random_case(seed)
+    maze = MazeGraph(grid) if use_graph else grid
+    expected = bfs_search(maze, start, goal)
+    path = search(maze, start, goal)
+    if expected is None:
+        assert path is None
+    else:
+        assert path is not None
+        assert len(path) == len(expected)
+        assert_valid_path(grid, path, start, goal)